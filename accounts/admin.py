@@ -55,3 +55,4 @@ admin.site.register(models.UserLocation)
 admin.site.register(models.OrganizationProfile)
 admin.site.register(models.ProviderLocation)
 admin.site.register(models.ProviderAffiliation)
+admin.site.register(models.OrphanedAsset)
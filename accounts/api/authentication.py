@@ -0,0 +1,103 @@
+"""
+JWT authentication that resolves users from the cache instead of the database.
+
+``JWTAuthentication`` loads the ``User`` row on every request. Here the
+fields API views need are cached per user for ``USER_CACHE_TIMEOUT`` seconds
+and turned into a ``User`` instance with the remaining fields deferred, so
+it still works as a foreign key value and loads anything else on access.
+Tokens issued by ``ClaimsTokenObtainPairSerializer`` also carry
+``user_type`` and ``is_active``. On a cache miss those claims stand in for
+the row only while they are no older than a cache entry could be, i.e.
+issued within ``USER_CACHE_TIMEOUT``; otherwise the row is read. A missing
+entry is never taken to mean the user is still active, since the cache may
+be per process (LocMem) or evict entries.
+
+Saving a user drops its entry. Deactivating or deleting a user replaces it
+with a marker so even fresh claims are refused at once where the marker is
+seen.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_TIMEOUT = 60
+CACHED_FIELDS = ('id', 'email', 'first_name', 'last_name', 'user_type', 'is_active', 'is_staff', 'is_superuser')
+# Claims embedded in access tokens, enough to authenticate without a lookup
+TOKEN_CLAIMS = ('user_type', 'is_active')
+REVOKED = 'revoked'
+
+
+def user_cache_key(user_id):
+    return f'jwt-user:{user_id}'
+
+
+def forget_user(user_id):
+    """Drop a user's cached entry so the next request reloads it."""
+    cache.delete(user_cache_key(user_id))
+
+
+def revoke_user(user_id):
+    """Reject the user's tokens, including freshly embedded claims."""
+    # Past this, claims are too old to be trusted and the row is read instead
+    cache.set(user_cache_key(user_id), REVOKED, timeout=USER_CACHE_TIMEOUT)
+
+
+def deferred_user(values):
+    """Build a ``User`` from some of its fields, deferring the rest."""
+    User = get_user_model()
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Authenticate JWTs against cached user fields or the token's own claims."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        values = cache.get(user_cache_key(user_id))
+        if values == REVOKED:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if values is None and self.fresh_claims(validated_token):
+            values = {'id': user_id, **{claim: validated_token[claim] for claim in TOKEN_CLAIMS}}
+        elif values is None:
+            values = self.load_values(user_id)
+
+        if not values['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != values['password_hash']
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return deferred_user({name: values[name] for name in CACHED_FIELDS if name in values})
+
+    def fresh_claims(self, validated_token):
+        """True if the token's embedded claims are recent enough to trust."""
+        if api_settings.CHECK_REVOKE_TOKEN or not all(claim in validated_token for claim in TOKEN_CLAIMS):
+            return False
+        # Refreshed access tokens keep the "iat" of the refresh token the claims came from
+        issued_at = validated_token.get('iat')
+        return issued_at is not None and time.time() - issued_at < USER_CACHE_TIMEOUT
+
+    def load_values(self, user_id):
+        """Read and cache the user's fields."""
+        fields = CACHED_FIELDS + (('password',) if api_settings.CHECK_REVOKE_TOKEN else ())
+        values = self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values(*fields).first()
+        if values is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Only the digest the token is compared with is cached
+            values['password_hash'] = get_md5_hash_password(values.pop('password'))
+        cache.set(user_cache_key(user_id), values, timeout=USER_CACHE_TIMEOUT)
+        return values
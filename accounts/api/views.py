@@ -1,12 +1,13 @@
 """
 Views for the user API.
 """
+from django.contrib.auth import get_user_model
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics, permissions
+from accounts.api.authentication import CachedJWTAuthentication
 from accounts.api.serializers import (
     UserSerializer,
 )
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework import serializers
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -37,9 +38,13 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return the authenticated user."""
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # The authenticated user may come from the cache or token claims;
+        # saving it would write those possibly stale values back
+        return get_user_model().objects.get(pk=self.request.user.pk)
@@ -0,0 +1,57 @@
+"""
+Deferred deletion of orphaned Cloudinary files.
+
+Profiles queue replaced or deleted pictures and logos as OrphanedAsset rows
+(see AssetFieldsMixin) instead of calling the CDN during the request. The
+worker here claims queued rows with ``SELECT ... FOR UPDATE SKIP LOCKED``
+and deletes them from Cloudinary with one Admin API call per batch.
+"""
+import logging
+
+import cloudinary.api
+from django.db import transaction
+from django.db.models import F
+
+from accounts.models import OrphanedAsset
+
+logger = logging.getLogger(__name__)
+
+# The Admin API accepts at most 100 public ids per delete_resources call
+MAX_BATCH_SIZE = 100
+# Assets failing this many times are left for someone to look at
+MAX_ATTEMPTS = 5
+
+
+def purge_orphaned_assets(batch_size=MAX_BATCH_SIZE, client=cloudinary.api):
+    """Delete one batch of orphaned assets from Cloudinary.
+
+    ``client`` is anything with a ``delete_resources(public_ids)`` method
+    returning Cloudinary's ``{'deleted': {public_id: status}}`` response.
+    Returns ``(deleted, failed)`` counts; failed rows stay queued and are
+    retried by later runs.
+    """
+    batch_size = min(batch_size, MAX_BATCH_SIZE)
+    with transaction.atomic():
+        batch = list(
+            OrphanedAsset.objects.select_for_update(skip_locked=True)
+            .filter(attempts__lt=MAX_ATTEMPTS)
+            .order_by('created_at')[:batch_size]
+        )
+        if not batch:
+            return 0, 0
+
+        public_ids = sorted({asset.public_id for asset in batch})
+        try:
+            statuses = client.delete_resources(public_ids).get('deleted', {})
+        except Exception as error:
+            logger.exception("Failed to delete %s orphaned assets", len(public_ids))
+            statuses, failure = {}, str(error)
+        else:
+            failure = "Not deleted by Cloudinary"
+
+        # A file that is already gone counts as deleted
+        done = {asset.pk for asset in batch if statuses.get(asset.public_id) in ('deleted', 'not_found')}
+        failed = [asset.pk for asset in batch if asset.pk not in done]
+        OrphanedAsset.objects.filter(pk__in=done).delete()
+        OrphanedAsset.objects.filter(pk__in=failed).update(attempts=F('attempts') + 1, last_error=failure)
+    return len(done), len(failed)
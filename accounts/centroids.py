@@ -0,0 +1,107 @@
+"""
+Offline ZIP code centroids for locations saved without coordinates.
+
+The table is a flat little-endian file built by ``build_zip_centroids``:
+
+    b'ZIPC', uint32 count
+    count x uint32      ZIP codes, sorted
+    count x float32[2]  (latitude, longitude) of each ZIP, in the same order
+
+It is memory-mapped read-only, so lookups are a binary search over the
+mapped ZIP array without parsing or copying the file, and worker processes
+share the same pages through the OS page cache.
+"""
+import bisect
+import logging
+import mmap
+import re
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ZIPC'
+HEADER = struct.Struct('<4sI')
+ZIP_RE = re.compile(r'^(\d{5})(?:-?\d{4})?$')
+# Countries whose postal codes are in the table
+COUNTRIES = {'', 'US', 'USA', 'UNITED STATES'}
+
+
+class CentroidTable:
+    """Read-only view of a mapped centroid file."""
+
+    def __init__(self, path):
+        _check_platform()
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a ZIP centroid table")
+        view = memoryview(self._map)
+        zips_end = HEADER.size + 4 * self.count
+        self._zips = view[HEADER.size:zips_end].cast('I')
+        self._coords = view[zips_end:zips_end + 8 * self.count].cast('f')
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, zip_code):
+        """Return ``(lat, lng)`` of an integer ZIP code, or None."""
+        index = bisect.bisect_left(self._zips, zip_code)
+        if index == self.count or self._zips[index] != zip_code:
+            return None
+        return self._coords[2 * index], self._coords[2 * index + 1]
+
+
+def _check_platform():
+    # The arrays are read and written in native order and sizes
+    if sys.byteorder != 'little' or array('I').itemsize != 4:
+        raise RuntimeError("ZIP centroid tables need a little-endian platform with 4-byte ints")
+
+
+def write_table(path, centroids):
+    """Write ``{zip: (lat, lng)}`` as a centroid table file."""
+    _check_platform()
+    zips = array('I', sorted(centroids))
+    coords = array('f')
+    for zip_code in zips:
+        coords.extend(centroids[zip_code])
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(zips)))
+        f.write(zips.tobytes())
+        f.write(coords.tobytes())
+
+
+@lru_cache(maxsize=None)
+def _table(path):
+    try:
+        return CentroidTable(path)
+    except FileNotFoundError:
+        logger.warning("ZIP centroid table %s not found; locations will not be geocoded", path)
+        return None
+
+
+def parse_zip(zip_code):
+    """Return the five-digit ZIP of a postal code as an int, or None."""
+    match = ZIP_RE.match((zip_code or '').strip())
+    return int(match.group(1)) if match else None
+
+
+def zip_centroid(zip_code, country=''):
+    """Return the centroid Point of a US ZIP code, or None if unknown."""
+    if str(country or '').upper() not in COUNTRIES:
+        return None
+    zip_code = parse_zip(zip_code)
+    table = _table(str(settings.ZIP_CENTROIDS_PATH))
+    if zip_code is None or table is None:
+        return None
+    found = table.lookup(zip_code)
+    if found is None:
+        return None
+    lat, lng = found
+    return Point(lng, lat, srid=4326)
@@ -0,0 +1,133 @@
+"""
+Spatial helpers for provider search.
+
+ProviderLocation.location is a geography column with a GiST index, so
+``dwithin`` radius filters and ``<->`` nearest-neighbour ordering are both
+answered from the index instead of scanning every location.
+"""
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import D
+from django.db.models import Exists, FloatField, Func, OuterRef, Value
+
+from accounts.models import ProviderLocation, UserLocation
+
+DEFAULT_SEARCH_RADIUS_KM = 25
+MAX_SEARCH_RADIUS_KM = 250
+
+
+class KNNDistance(Func):
+    """PostGIS ``<->`` operator; ORDER BY on it walks the GiST index."""
+
+    arg_joiner = ' <-> '
+    template = '%(expressions)s'
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        point = Value(point, output_field=PointField(srid=point.srid, geography=True))
+        super().__init__(expression, point, **extra)
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def search_origin(params, user):
+    """Resolve the ``lat``/``lng``/``radius`` search mode from query params.
+
+    Returns ``(point, radius_km)``, or ``(None, None)`` when the request is
+    not a spatial search. Spatial mode is on when coordinates or a radius are
+    given or results are sorted by distance; without explicit coordinates
+    the user's primary UserLocation is used as the origin.
+    """
+    lat = _parse_float(params.get('lat'))
+    lng = _parse_float(params.get('lng'))
+    radius = _parse_float(params.get('radius'))
+
+    if lat is not None and lng is not None:
+        origin = Point(lng, lat, srid=4326)
+    elif radius is not None or params.get('sort') == 'distance':
+        origin = UserLocation.objects.filter(
+            user=user,
+            is_primary=True,
+            location__isnull=False,
+        ).values_list('location', flat=True).first()
+    else:
+        origin = None
+
+    if origin is None:
+        return None, None
+
+    if radius is None or radius <= 0:
+        radius = DEFAULT_SEARCH_RADIUS_KM
+    return origin, min(radius, MAX_SEARCH_RADIUS_KM)
+
+
+def _locations_near(origin, radius_km):
+    return ProviderLocation.objects.filter(
+        is_active=True,
+        location__dwithin=(origin, D(km=radius_km)),
+    )
+
+
+def within_radius(providers, origin, radius_km):
+    """Keep providers with an active location within ``radius_km``."""
+    return providers.filter(
+        Exists(_locations_near(origin, radius_km).filter(individual_provider=OuterRef('pk')))
+    )
+
+
+def nearest_providers(providers, origin, radius_km, limit):
+    """Return up to ``limit`` providers ordered by their nearest location.
+
+    Locations are read in ``<->`` order and the scan stops as soon as
+    ``limit`` distinct providers have been seen. Each returned provider has
+    ``distance_km`` set.
+    """
+    locations = _locations_near(origin, radius_km).filter(
+        individual_provider__in=providers.values('pk'),
+    ).annotate(
+        distance=Distance('location', origin),
+    ).order_by(
+        KNNDistance('location', origin),
+    ).values_list('individual_provider_id', 'distance')
+
+    distances = {}
+    for provider_id, distance in locations.iterator(chunk_size=limit * 2):
+        if provider_id not in distances:
+            distances[provider_id] = distance
+            if len(distances) >= limit:
+                break
+
+    found = providers.order_by().in_bulk(list(distances))
+    results = []
+    for provider_id, distance in distances.items():
+        provider = found[provider_id]
+        provider.distance_km = distance.km
+        results.append(provider)
+    return results
+
+
+def attach_distances(providers, origin):
+    """Set ``distance_km`` on each provider from its nearest active location."""
+    nearest = ProviderLocation.objects.filter(
+        individual_provider__in=[provider.pk for provider in providers],
+        is_active=True,
+        location__isnull=False,
+    ).annotate(
+        distance=Distance('location', origin),
+    ).order_by(
+        'individual_provider_id', 'distance',
+    ).distinct(
+        'individual_provider_id',
+    ).values_list('individual_provider_id', 'distance')
+
+    distances = dict(nearest)
+    for provider in providers:
+        distance = distances.get(provider.pk)
+        provider.distance_km = distance.km if distance is not None else None
+    return providers
@@ -0,0 +1,50 @@
+"""
+Django command to fill missing location points from ZIP centroids.
+"""
+from django.core.management.base import BaseCommand
+
+from accounts.centroids import zip_centroid
+from accounts.models import ProviderLocation, UserLocation
+
+
+class Command(BaseCommand):
+    """Set ``location`` from the ZIP code centroid where it is missing.
+
+    Only rows without a point are touched, so it is safe to rerun, e.g.
+    from cron after imports or once a new centroid table is deployed.
+    """
+
+    help = "Fill missing provider and user location points from ZIP code centroids"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Locations updated per query",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        for model in (ProviderLocation, UserLocation):
+            filled, missing = self.backfill(model, options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__}: filled {filled} points ({missing} ZIP codes not found)."
+            ))
+
+    def backfill(self, model, batch_size):
+        filled = missing = 0
+        last_pk = 0
+        pending = model.objects.filter(location__isnull=True).exclude(zip_code__isnull=True).exclude(zip_code='')
+        while batch := list(pending.filter(pk__gt=last_pk).order_by('pk').only('pk', 'zip_code', 'country')[:batch_size]):
+            last_pk = batch[-1].pk
+            updated = []
+            for location in batch:
+                location.location = zip_centroid(location.zip_code, location.country)
+                if location.location is None:
+                    missing += 1
+                else:
+                    updated.append(location)
+            model.objects.bulk_update(updated, ['location'])
+            filled += len(updated)
+        return filled, missing
@@ -0,0 +1,68 @@
+"""
+Django command to build the ZIP centroid table.
+"""
+import csv
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.centroids import parse_zip, write_table
+
+# Census gazetteer column names first, then plain ones
+ZIP_COLUMNS = ('GEOID', 'zip', 'zip_code')
+LAT_COLUMNS = ('INTPTLAT', 'lat', 'latitude')
+LNG_COLUMNS = ('INTPTLONG', 'lng', 'lon', 'longitude')
+
+
+def _column(header, names, path):
+    for name in names:
+        if name in header:
+            return name
+    raise CommandError(f"{path} has none of the columns {', '.join(names)}.")
+
+
+class Command(BaseCommand):
+    """Convert a ZCTA gazetteer file into the memory-mapped centroid table.
+
+    Takes the Census Bureau's national ZCTA gazetteer (tab separated) or any
+    CSV with zip, lat and lng columns. Rerun when a new gazetteer is
+    published; running processes pick the new file up on restart.
+    """
+
+    help = "Build the offline ZIP code centroid table from a gazetteer file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Gazetteer .txt (tab separated) or .csv file")
+        parser.add_argument(
+            "--output",
+            default=str(settings.ZIP_CENTROIDS_PATH),
+            help="Table to write (default: ZIP_CENTROIDS_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        source = Path(options["source"])
+        delimiter = "," if source.suffix.lower() == ".csv" else "\t"
+        centroids = {}
+        with open(source, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f, delimiter=delimiter)
+            # Gazetteer headers carry trailing whitespace
+            reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+            zip_column = _column(reader.fieldnames, ZIP_COLUMNS, source)
+            lat_column = _column(reader.fieldnames, LAT_COLUMNS, source)
+            lng_column = _column(reader.fieldnames, LNG_COLUMNS, source)
+            for row in reader:
+                zip_code = parse_zip(row[zip_column])
+                try:
+                    centroids[zip_code] = (float(row[lat_column]), float(row[lng_column]))
+                except (TypeError, ValueError):
+                    continue
+        centroids.pop(None, None)
+        if not centroids:
+            raise CommandError(f"No centroids read from {source}.")
+
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        write_table(output, centroids)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(centroids)} ZIP centroids to {output}."))
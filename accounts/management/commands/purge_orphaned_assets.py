@@ -0,0 +1,58 @@
+"""
+Django command to delete orphaned Cloudinary assets.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.assets import MAX_BATCH_SIZE, purge_orphaned_assets
+
+
+class Command(BaseCommand):
+    """Delete queued OrphanedAsset files from Cloudinary in batches.
+
+    Safe to run as several processes at once; each claims different rows.
+    Without --loop it drains the queue once and exits, for use from cron.
+    """
+
+    help = "Delete replaced and deleted profile images from Cloudinary"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=MAX_BATCH_SIZE,
+            help=f"Assets deleted per API call (at most {MAX_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling for queued assets",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds to sleep between polls when idle (with --loop)",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        total_deleted = total_failed = 0
+        try:
+            while True:
+                deleted, failed = purge_orphaned_assets(options["batch_size"])
+                total_deleted += deleted
+                total_failed += failed
+                if deleted:
+                    self.stdout.write(f"  deleted {deleted}, failed {failed}")
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {total_deleted} orphaned assets ({total_failed} failed)."
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def populate_search_vectors(apps, schema_editor):
+    from accounts.search import update_provider_search_vectors
+
+    IndividualProviderProfile = apps.get_model('accounts', 'IndividualProviderProfile')
+    ProviderAffiliation = apps.get_model('accounts', 'ProviderAffiliation')
+    update_provider_search_vectors(
+        IndividualProviderProfile.objects.all(),
+        affiliation_model=ProviderAffiliation,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='individualproviderprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='individualproviderprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='provider_search_vector_idx'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
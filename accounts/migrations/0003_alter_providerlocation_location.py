@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-17 10:03
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_individualproviderprofile_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='providerlocation',
+            name='location',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, srid=4326),
+        ),
+    ]
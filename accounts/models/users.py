@@ -1,17 +1,20 @@
 """
 Database Models for Users and Providers.
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import (
 	AbstractBaseUser,
 	BaseUserManager,
 	PermissionsMixin,
 )
 from phonenumber_field.modelfields import PhoneNumberField
-from cloudinary.uploader import destroy
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django_countries.fields import CountryField
 
+from core.mixins import LoadedValuesMixin
+
 
 class UserManager(BaseUserManager):
 	"""Manager for users."""
@@ -36,7 +39,7 @@ class UserManager(BaseUserManager):
 		return user
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(LoadedValuesMixin, AbstractBaseUser, PermissionsMixin):
 	"""User database model."""
 
 	email = models.EmailField(
@@ -65,6 +68,8 @@ class User(AbstractBaseUser, PermissionsMixin):
 		default='PATIENT'
 	)
 	date_joined = models.DateTimeField(auto_now_add=True)
+	# Part of the signed calendar feed URL; bumping it revokes old links
+	calendar_feed_version = models.PositiveIntegerField(default=0)
 
 	objects = UserManager()
 
@@ -91,9 +96,39 @@ class PatientProfile(models.Model):
 	profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
 
 
-class IndividualProviderProfile(models.Model):
+class AssetFieldsMixin(LoadedValuesMixin):
+	"""Queue the Cloudinary files of ``ASSET_FIELDS`` for deletion once orphaned.
+
+	The loaded row is remembered so a save can tell which files it replaced
+	without reading the row again. Replaced and deleted files are recorded
+	as OrphanedAsset rows in the same transaction and removed from
+	Cloudinary later by a worker (see accounts.assets).
+	"""
+
+	ASSET_FIELDS = ()
+
+	def save(self, *args, **kwargs):
+		loaded = getattr(self, '_loaded_values', {})
+		replaced = [
+			loaded[name] for name in self.ASSET_FIELDS
+			if loaded.get(name) and loaded[name] != getattr(self, name).name
+		]
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+			OrphanedAsset.queue(replaced)
+
+	def delete(self, *args, **kwargs):
+		with transaction.atomic():
+			result = super().delete(*args, **kwargs)
+			OrphanedAsset.queue(getattr(self, name).name for name in self.ASSET_FIELDS)
+		return result
+
+
+class IndividualProviderProfile(AssetFieldsMixin, models.Model):
 	"""Individual healthcare provider profile (doctors, nurses, therapists, etc.)"""
 
+	ASSET_FIELDS = ('profile_picture', 'logo')
+
 	user = models.OneToOneField(
 		'accounts.User',
 		on_delete=models.CASCADE,
@@ -167,66 +202,29 @@ class IndividualProviderProfile(models.Model):
 		help_text="Minimum hours notice required for booking"
 	)
 
-	# Add this method to the model
-	def get_next_available_slot(self, appointment_type='IN_PERSON'):
-		"""Get the next available appointment slot for this provider"""
-		from appointments.models import OfficeHours, Appointment
-		from datetime import datetime, timedelta
-		from django.utils import timezone
-
-		today = timezone.now().date()
-		end_date = today + timedelta(days=self.advance_booking_days)
-
-		# Get all office hours for this provider
-		office_hours = OfficeHours.objects.filter(
-			doctor=self,
-			is_active=True
-		).order_by('day_of_week', 'start_time')
-
-		current_date = today
-		while current_date <= end_date:
-			weekday = current_date.weekday()
-
-			# Get office hours for this day
-			day_hours = office_hours.filter(day_of_week=weekday)
-
-			for hours in day_hours:
-				available_slots = hours.get_available_slots(current_date)
-				if available_slots:
-					return {
-						'date': current_date,
-						'time': available_slots[0]['start_time'],
-						'location': hours.location
-					}
-
-			current_date += timedelta(days=1)
+	# Full-text search document, maintained by accounts.signals
+	search_vector = SearchVectorField(null=True, editable=False)
 
-		return None
-
-	def save(self, *args, **kwargs):
-		if self.pk:
-			old = IndividualProviderProfile.objects.get(pk=self.pk)
-			if old.profile_picture and old.profile_picture != self.profile_picture:
-				destroy(old.profile_picture.name)
-			if old.logo and old.logo != self.logo:
-				destroy(old.logo.name)
+	class Meta:
+		indexes = [
+			GinIndex(fields=['search_vector'], name='provider_search_vector_idx'),
+		]
 
-		super().save(*args, **kwargs)
+	def get_next_available_slot(self, appointment_type='IN_PERSON'):
+		"""Get the next available appointment slot for this provider"""
+		from appointments.availability import next_available_slots
 
-	def delete(self, *args, **kwargs):
-		if self.profile_picture:
-			destroy(self.profile_picture.name)
-		if self.logo:
-			destroy(self.logo.name)
-		super().delete(*args, **kwargs)
+		return next_available_slots([self]).get(self.pk)
 
 	def __str__(self):
 		return f"{self.get_provider_type_display()} {self.user.full_name}"
 
 
-class OrganizationProfile(models.Model):
+class OrganizationProfile(AssetFieldsMixin, models.Model):
 	"""Healthcare organization profile (hospitals, clinics, pharmacies, etc.)"""
 
+	ASSET_FIELDS = ('logo',)
+
 	user = models.OneToOneField(
 		'accounts.User',
 		on_delete=models.CASCADE,
@@ -280,18 +278,6 @@ class OrganizationProfile(models.Model):
 	is_verified = models.BooleanField(default=False)
 	verification_date = models.DateTimeField(null=True, blank=True)
 
-	def save(self, *args, **kwargs):
-		if self.pk:
-			old = OrganizationProfile.objects.get(pk=self.pk)
-			if old.logo and old.logo != self.logo:
-				destroy(old.logo.name)
-		super().save(*args, **kwargs)
-
-	def delete(self, *args, **kwargs):
-		if self.logo:
-			destroy(self.logo.name)
-		super().delete(*args, **kwargs)
-
 	def __str__(self):
 		return self.name
 
@@ -331,7 +317,8 @@ class ProviderLocation(models.Model):
 
 	# Address information
 	address = models.CharField(max_length=255, null=True, blank=True)
-	location = gis_models.PointField(null=True, blank=True)
+	# Geography so radius filters and distances work in metres off the GiST index
+	location = gis_models.PointField(geography=True, null=True, blank=True)
 	city = models.CharField(max_length=100, null=True, blank=True)
 	state = models.CharField(max_length=100, null=True, blank=True)
 	zip_code = models.CharField(max_length=20, null=True, blank=True)
@@ -437,4 +424,23 @@ class ProviderAffiliation(models.Model):
 		unique_together = ['individual_provider', 'organization', 'location']
 
 	def __str__(self):
-		return f"{self.individual_provider} at {self.organization}"
\ No newline at end of file
+		return f"{self.individual_provider} at {self.organization}"
+
+
+class OrphanedAsset(models.Model):
+	"""A Cloudinary file no longer referenced by any row, waiting to be deleted"""
+
+	public_id = models.CharField(max_length=255)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	last_error = models.TextField(blank=True, null=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self):
+		return self.public_id
+
+	@classmethod
+	def queue(cls, public_ids):
+		"""Record ``public_ids`` (empty values are skipped) for deletion."""
+		assets = [cls(public_id=public_id) for public_id in public_ids if public_id]
+		if assets:
+			cls.objects.bulk_create(assets)
@@ -0,0 +1,270 @@
+"""
+Bulk provider onboarding from registry files.
+
+Rows (one provider each, NPI-registry style) are processed in chunks with a
+fixed number of queries per chunk: one lookup of the chunk's existing users
+and licenses, upserts of users and provider profiles with
+``bulk_create(update_conflicts=True)``, and inserts of the new locations and
+affiliations. Organizations and their locations are resolved through
+in-memory maps filled as the import goes, and affiliations are checked
+against a map of the chunk's providers. Nothing is kept per row between
+chunks and rejected rows go straight to a RejectLog, so memory stays flat
+however large the file is.
+
+``bulk_create`` skips ``save()`` and signals, so search documents and
+platform counters are updated here for each chunk.
+"""
+import re
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.centroids import zip_centroid
+from accounts.models import IndividualProviderProfile, OrganizationProfile, ProviderAffiliation, ProviderLocation
+from accounts.search import update_provider_search_vectors
+from core.counters import apply_deltas
+from core.importing import RejectLog, RowError, parse_value, row_value
+
+PROVIDER_TYPES = {value for value, _ in IndividualProviderProfile._meta.get_field('provider_type').choices}
+# Profile columns overwritten when a provider is imported again
+PROFILE_FIELDS = ['provider_type', 'specialty', 'npi_number', 'license_number', 'years_of_experience']
+NPI_RE = re.compile(r'^\d{10}$')
+
+
+def _address_key(fields):
+    return tuple((fields[name] or '').lower() for name in ('address', 'city', 'state', 'zip_code'))
+
+
+class ProviderImporter:
+    """Validate and upsert provider rows chunk by chunk."""
+
+    def __init__(self, organization=None, dry_run=False, rejects=None):
+        self.organization = organization
+        self.dry_run = dry_run
+        # Organization account email -> OrganizationProfile id (None if unknown)
+        self.organizations = {}
+        # Organization id -> {address key: location id}
+        self.locations = {}
+        self.created = 0
+        self.updated = 0
+        self.rejected = rejects if rejects is not None else RejectLog()
+
+    def import_chunk(self, rows):
+        """Import ``[(line_number, row)]``; returns the number of rows written."""
+        parsed = []
+        emails, licenses = set(), set()
+        for line_number, row in rows:
+            try:
+                fields = self.parse_row(row)
+                if fields['email'] in emails:
+                    raise RowError("Duplicate email in file.")
+                if fields['license_number'] and fields['license_number'] in licenses:
+                    raise RowError("Duplicate license_number in file.")
+            except RowError as error:
+                self.reject(line_number, row, str(error))
+                continue
+            emails.add(fields['email'])
+            licenses.add(fields['license_number'])
+            parsed.append((line_number, row, fields))
+
+        User = get_user_model()
+        existing = {
+            email: (user_type, profile_id)
+            for email, user_type, profile_id in User.objects.filter(email__in=emails).values_list(
+                'email', 'user_type', 'individual_provider_profile',
+            )
+        }
+        license_owners = dict(
+            IndividualProviderProfile.objects.filter(license_number__in=licenses - {None}).values_list(
+                'license_number', 'user__email',
+            )
+        )
+        self.resolve_organizations({fields['organization'] for _, _, fields in parsed} - {None})
+
+        accepted = []
+        for line_number, row, fields in parsed:
+            try:
+                self.check(fields, existing, license_owners)
+            except RowError as error:
+                self.reject(line_number, row, str(error))
+                continue
+            accepted.append(fields)
+
+        if not self.dry_run and accepted:
+            with transaction.atomic():
+                self.write(accepted, existing)
+        new = sum(1 for fields in accepted if fields['email'] not in existing)
+        self.created += new
+        self.updated += len(accepted) - new
+        return len(accepted)
+
+    def parse_row(self, row):
+        if '_error' in row:
+            raise RowError(row['_error'])
+
+        npi = row_value(row, 'npi', required=False) or None
+        if npi and not NPI_RE.match(str(npi)):
+            raise RowError(f"Invalid npi: {npi!r}")
+        provider_type = (row_value(row, 'provider_type', required=False) or 'PHYSICIAN').upper()
+        if provider_type not in PROVIDER_TYPES:
+            raise RowError(f"Invalid provider_type: {provider_type!r}")
+        organization = row_value(row, 'organization', required=False)
+
+        return {
+            'email': get_user_model().objects.normalize_email(row_value(row, 'email')),
+            'first_name': row_value(row, 'first_name'),
+            'last_name': row_value(row, 'last_name'),
+            'npi_number': npi and str(npi),
+            'provider_type': provider_type,
+            'specialty': row_value(row, 'specialty', required=False) or None,
+            'license_number': row_value(row, 'license_number', required=False) or None,
+            'years_of_experience': parse_value(row, int, 'years_of_experience', required=False) or 0,
+            'organization': get_user_model().objects.normalize_email(organization) if organization else None,
+            'location_name': row_value(row, 'location_name', required=False) or None,
+            'address': row_value(row, 'address', required=False) or None,
+            'city': row_value(row, 'city', required=False) or None,
+            'state': row_value(row, 'state', required=False) or None,
+            'zip_code': row_value(row, 'zip_code', required=False) or None,
+            'position': row_value(row, 'position', required=False) or None,
+            'department': row_value(row, 'department', required=False) or None,
+        }
+
+    def check(self, fields, existing, license_owners):
+        if fields['email'] in existing and existing[fields['email']][0] != 'INDIVIDUAL_PROVIDER':
+            raise RowError("Email belongs to an account that is not a provider.")
+        owner = license_owners.get(fields['license_number'])
+        if owner and owner != fields['email']:
+            raise RowError("license_number belongs to another provider.")
+        if fields['organization'] and self.organizations.get(fields['organization']) is None:
+            raise RowError(f"Unknown organization: {fields['organization']}")
+
+    def resolve_organizations(self, emails):
+        """Map organization account emails not seen yet to profile ids, in one query."""
+        missing = emails - self.organizations.keys()
+        if not missing:
+            return
+        self.organizations.update(dict.fromkeys(missing))
+        self.organizations.update(
+            (email, pk)
+            for email, pk in OrganizationProfile.objects.filter(user__email__in=missing).values_list('user__email', 'pk')
+        )
+
+    def load_locations(self, organization_id):
+        """Fill the location map of an organization once."""
+        if organization_id in self.locations:
+            return
+        self.locations[organization_id] = {
+            _address_key(location): location['pk']
+            for location in ProviderLocation.objects.filter(organization_id=organization_id).values(
+                'pk', 'address', 'city', 'state', 'zip_code',
+            )
+        }
+
+    def organization_id(self, fields):
+        if fields['organization']:
+            return self.organizations[fields['organization']]
+        return self.organization.pk if self.organization else None
+
+    def write(self, accepted, existing):
+        User = get_user_model()
+        users = []
+        for fields in accepted:
+            user = User(
+                email=fields['email'],
+                first_name=fields['first_name'],
+                last_name=fields['last_name'],
+                user_type='INDIVIDUAL_PROVIDER',
+            )
+            user.set_unusable_password()
+            users.append(user)
+        users = User.objects.bulk_create(
+            users,
+            update_conflicts=True,
+            unique_fields=['email'],
+            update_fields=['first_name', 'last_name'],
+        )
+        user_ids = {user.email: user.pk for user in users}
+
+        profiles = IndividualProviderProfile.objects.bulk_create(
+            [
+                IndividualProviderProfile(
+                    user_id=user_ids[fields['email']],
+                    **{name: fields[name] for name in PROFILE_FIELDS},
+                )
+                for fields in accepted
+            ],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=PROFILE_FIELDS,
+        )
+        profile_ids = {profile.user_id: profile.pk for profile in profiles}
+        update_provider_search_vectors(IndividualProviderProfile.objects.filter(pk__in=profile_ids.values()))
+
+        self.write_affiliations(accepted, {
+            fields['email']: profile_ids[user_ids[fields['email']]] for fields in accepted
+        })
+        self.count(accepted, existing)
+
+    def write_affiliations(self, accepted, provider_ids):
+        """Create the organizations' missing locations, then missing affiliations."""
+        rows = []
+        new_locations = {}
+        for fields in accepted:
+            organization_id = self.organization_id(fields)
+            if organization_id is None:
+                continue
+            self.load_locations(organization_id)
+            key = _address_key(fields) if fields['address'] else None
+            if key and key not in self.locations[organization_id] and (organization_id, key) not in new_locations:
+                new_locations[organization_id, key] = ProviderLocation(
+                    organization_id=organization_id,
+                    name=fields['location_name'],
+                    address=fields['address'],
+                    city=fields['city'],
+                    state=fields['state'],
+                    zip_code=fields['zip_code'],
+                    location=zip_centroid(fields['zip_code']),
+                )
+            rows.append((fields, organization_id, key))
+
+        ProviderLocation.objects.bulk_create(new_locations.values())
+        for (organization_id, key), location in new_locations.items():
+            self.locations[organization_id][key] = location.pk
+
+        # Only this chunk's providers are looked up, so nothing grows with the file
+        existing = set(
+            ProviderAffiliation.objects.filter(individual_provider_id__in=provider_ids.values()).values_list(
+                'individual_provider_id', 'organization_id', 'location_id',
+            )
+        )
+        affiliations = []
+        for fields, organization_id, key in rows:
+            provider_id = provider_ids[fields['email']]
+            location_id = self.locations[organization_id][key] if key else None
+            if (provider_id, organization_id, location_id) in existing:
+                continue
+            existing.add((provider_id, organization_id, location_id))
+            affiliations.append(ProviderAffiliation(
+                individual_provider_id=provider_id,
+                organization_id=organization_id,
+                location_id=location_id,
+                position=fields['position'],
+                department=fields['department'],
+            ))
+        ProviderAffiliation.objects.bulk_create(affiliations, ignore_conflicts=True)
+
+    def count(self, accepted, existing):
+        """Add new users and profiles to the platform counters."""
+        new_users = sum(1 for fields in accepted if fields['email'] not in existing)
+        new_profiles = sum(1 for fields in accepted if not existing.get(fields['email'], (None, None))[1])
+        apply_deltas(Counter({
+            ('users', None): new_users,
+            ('new_users', timezone.localdate()): new_users,
+            ('providers', None): new_profiles,
+            ('pending_provider_verifications', None): new_profiles,
+        }))
+
+    def reject(self, line_number, row, reason):
+        self.rejected.add(line_number, row, reason)
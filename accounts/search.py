@@ -0,0 +1,98 @@
+"""
+Full-text search for individual providers.
+
+Each IndividualProviderProfile stores a weighted ``search_vector`` document
+built from the provider's name, specialty, affiliations, education and bio.
+The column is GIN indexed and refreshed by the signals in accounts.signals.
+"""
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+
+SEARCH_CONFIG = 'english'
+
+SEARCH_TERM_RE = re.compile(r'\w+')
+
+
+def provider_search_document(affiliation_model=None):
+    """Return the weighted tsvector expression for a provider row.
+
+    ``affiliation_model`` lets data migrations pass their historical
+    ProviderAffiliation model; regular callers can omit it.
+    """
+    if affiliation_model is None:
+        from accounts.models import ProviderAffiliation
+        affiliation_model = ProviderAffiliation
+
+    affiliation_names = affiliation_model.objects.filter(
+        individual_provider=OuterRef('pk'),
+        is_active=True,
+    ).values('individual_provider').annotate(
+        names=StringAgg(
+            Concat(
+                'organization__name',
+                Value(' '),
+                Coalesce('department', Value('')),
+            ),
+            delimiter=' ',
+        )
+    ).values('names')
+
+    return (
+        SearchVector('user__first_name', 'user__last_name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('specialty', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Subquery(affiliation_names), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('education', weight='C', config=SEARCH_CONFIG)
+        + SearchVector('bio', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_provider_search_vectors(queryset, affiliation_model=None):
+    """Recompute ``search_vector`` for every provider in ``queryset``.
+
+    Runs as a single UPDATE, so it does not fire model signals.
+    """
+    document = queryset.model.objects.filter(
+        pk=OuterRef('pk')
+    ).annotate(
+        document=provider_search_document(affiliation_model)
+    ).values('document')[:1]
+
+    return queryset.update(search_vector=Subquery(document))
+
+
+def build_search_query(text):
+    """Turn free text into a prefix-matching tsquery, or None if empty.
+
+    Every term becomes ``term:*`` so partial words typed into the search
+    box still hit the index.
+    """
+    terms = SEARCH_TERM_RE.findall(text or '')
+    if not terms:
+        return None
+
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=SEARCH_CONFIG,
+    )
+
+
+def search_providers(queryset, text):
+    """Filter ``queryset`` by ``text`` and annotate each row with ``rank``.
+
+    When ``text`` has no searchable terms nothing is filtered and every row
+    gets a rank of zero.
+    """
+    search_query = build_search_query(text)
+    if search_query is None:
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+    return queryset.filter(
+        search_vector=search_query
+    ).annotate(
+        rank=SearchRank(F('search_vector'), search_query)
+    )
@@ -0,0 +1,85 @@
+"""
+Signal handlers for the accounts app.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.api.authentication import CACHED_FIELDS, forget_user, revoke_user
+
+from accounts.models import (
+    IndividualProviderProfile,
+    OrganizationProfile,
+    ProviderAffiliation,
+    User,
+)
+from accounts.search import update_provider_search_vectors
+
+PROVIDER_SEARCH_FIELDS = {'specialty', 'bio', 'education'}
+USER_SEARCH_FIELDS = {'first_name', 'last_name'}
+ORGANIZATION_SEARCH_FIELDS = {'name'}
+JWT_USER_FIELDS = set(CACHED_FIELDS) | {'password'}
+
+
+def _touches(update_fields, fields):
+    """Return True unless the save was limited to unrelated fields."""
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+@receiver(post_save, sender=IndividualProviderProfile)
+def provider_saved(sender, instance, update_fields=None, **kwargs):
+    """Refresh the search document when a provider's own text changes."""
+    if _touches(update_fields, PROVIDER_SEARCH_FIELDS):
+        update_provider_search_vectors(
+            IndividualProviderProfile.objects.filter(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """Refresh the search document when a provider's name changes."""
+    if instance.user_type != 'INDIVIDUAL_PROVIDER':
+        return
+    if _touches(update_fields, USER_SEARCH_FIELDS):
+        update_provider_search_vectors(
+            IndividualProviderProfile.objects.filter(user_id=instance.pk)
+        )
+
+
+@receiver(post_save, sender=ProviderAffiliation)
+@receiver(post_delete, sender=ProviderAffiliation)
+def affiliation_changed(sender, instance, **kwargs):
+    """Refresh the affiliated provider's search document."""
+    update_provider_search_vectors(
+        IndividualProviderProfile.objects.filter(pk=instance.individual_provider_id)
+    )
+
+
+@receiver(post_save, sender=OrganizationProfile)
+def organization_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    """Refresh every provider affiliated with a renamed organization."""
+    if created or not _touches(update_fields, ORGANIZATION_SEARCH_FIELDS):
+        return
+    update_provider_search_vectors(
+        IndividualProviderProfile.objects.filter(
+            organization_affiliations__organization=instance
+        )
+    )
+
+
+@receiver(post_save, sender=User)
+def user_auth_changed(sender, instance, update_fields=None, **kwargs):
+    """Drop the cached JWT user, or revoke it when deactivated."""
+    if not _touches(update_fields, JWT_USER_FIELDS):
+        return
+    if instance.is_active:
+        transaction.on_commit(partial(forget_user, instance.pk))
+    else:
+        transaction.on_commit(partial(revoke_user, instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def user_auth_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(revoke_user, instance.pk))
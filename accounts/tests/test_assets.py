@@ -0,0 +1,128 @@
+"""
+Tests for the orphaned asset queue.
+"""
+from django.db import transaction
+from django.test import TestCase
+
+from accounts.assets import MAX_ATTEMPTS, purge_orphaned_assets
+from accounts.models import IndividualProviderProfile, OrganizationProfile, OrphanedAsset, User
+
+
+class FakeCloudinary:
+    """Stands in for ``cloudinary.api``, recording delete calls."""
+
+    def __init__(self, statuses=None, error=None):
+        self.statuses = statuses or {}
+        self.error = error
+        self.calls = []
+
+    def delete_resources(self, public_ids):
+        self.calls.append(list(public_ids))
+        if self.error:
+            raise self.error
+        return {'deleted': {public_id: self.statuses.get(public_id, 'deleted') for public_id in public_ids}}
+
+
+def queued():
+    return sorted(OrphanedAsset.objects.values_list('public_id', flat=True))
+
+
+class AssetQueueTests(TestCase):
+    """Test that replaced and deleted files are queued, not deleted inline."""
+
+    def setUp(self):
+        user = User.objects.create_user(email="doc@example.com", password="testpass123", user_type="INDIVIDUAL_PROVIDER")
+        profile = IndividualProviderProfile.objects.create(
+            user=user,
+            profile_picture='provider_pictures/old.jpg',
+            logo='provider_logos/logo.png',
+        )
+        self.profile = IndividualProviderProfile.objects.get(pk=profile.pk)
+
+    def test_replaced_picture_is_queued(self):
+        """Test that replacing a picture queues the old file."""
+        self.profile.profile_picture = 'provider_pictures/new.jpg'
+        self.profile.save()
+
+        self.assertEqual(queued(), ['provider_pictures/old.jpg'])
+
+    def test_unchanged_save_queues_nothing(self):
+        """Test that saving other fields leaves the files alone."""
+        self.profile.bio = "Updated"
+        self.profile.save()
+
+        self.assertEqual(queued(), [])
+
+    def test_replacement_is_detected_after_create(self):
+        """Test that an instance that was never loaded still knows its files."""
+        user = User.objects.create_user(email="org@example.com", password="testpass123", user_type="ORGANIZATION")
+        organization = OrganizationProfile.objects.create(user=user, name="Clinic", logo='organization_logos/a.png')
+
+        organization.logo = 'organization_logos/b.png'
+        organization.save()
+
+        self.assertEqual(queued(), ['organization_logos/a.png'])
+
+    def test_save_leaves_deferred_fields_unloaded(self):
+        """Test that saving a partly loaded profile does not fetch its deferred fields."""
+        profile = IndividualProviderProfile.objects.only('id', 'bio', 'profile_picture').get(pk=self.profile.pk)
+        profile.profile_picture = 'provider_pictures/new.jpg'
+        profile.save()
+
+        self.assertIn('specialty', profile.get_deferred_fields())
+        self.assertEqual(queued(), ['provider_pictures/old.jpg'])
+
+    def test_delete_queues_all_files(self):
+        """Test that deleting a profile queues its picture and logo."""
+        self.profile.delete()
+
+        self.assertEqual(queued(), ['provider_logos/logo.png', 'provider_pictures/old.jpg'])
+
+    def test_rolled_back_save_queues_nothing(self):
+        """Test that the queue entry is part of the profile's transaction."""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.profile.profile_picture = 'provider_pictures/new.jpg'
+                self.profile.save()
+                raise RuntimeError
+
+        self.assertEqual(queued(), [])
+
+
+class PurgeOrphanedAssetsTests(TestCase):
+    """Test the batch deletion worker."""
+
+    def setUp(self):
+        OrphanedAsset.queue(['a', 'b', 'c'])
+
+    def test_deletes_batch_in_one_call(self):
+        """Test that a batch is deleted with one API call and dequeued."""
+        client = FakeCloudinary(statuses={'b': 'not_found'})
+
+        self.assertEqual(purge_orphaned_assets(client=client), (3, 0))
+        self.assertEqual(client.calls, [['a', 'b', 'c']])
+        self.assertEqual(queued(), [])
+
+    def test_failures_stay_queued(self):
+        """Test that assets Cloudinary did not delete are retried later."""
+        client = FakeCloudinary(statuses={'c': 'error'})
+
+        self.assertEqual(purge_orphaned_assets(client=client), (2, 1))
+        asset = OrphanedAsset.objects.get()
+        self.assertEqual(asset.public_id, 'c')
+        self.assertEqual(asset.attempts, 1)
+
+    def test_api_error(self):
+        """Test that an API error keeps the whole batch queued."""
+        client = FakeCloudinary(error=RuntimeError("timeout"))
+
+        self.assertEqual(purge_orphaned_assets(client=client), (0, 3))
+        self.assertEqual(set(OrphanedAsset.objects.values_list('last_error', flat=True)), {'timeout'})
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that assets past the attempt limit are no longer claimed."""
+        OrphanedAsset.objects.update(attempts=MAX_ATTEMPTS)
+        client = FakeCloudinary()
+
+        self.assertEqual(purge_orphaned_assets(client=client), (0, 0))
+        self.assertEqual(client.calls, [])
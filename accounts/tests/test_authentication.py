@@ -0,0 +1,113 @@
+"""
+Tests for cached JWT authentication.
+"""
+import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.api.authentication import CachedJWTAuthentication
+from accounts.api.serializers import ClaimsTokenObtainPairSerializer
+from accounts.models import User
+
+PROFILE_URL = reverse('accounts_api:profile')
+
+
+def authenticate(token):
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    return CachedJWTAuthentication().authenticate(request)[0]
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test resolving tokens to cached users."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="pat@example.com", password="testpass123", first_name="Pat", last_name="Doe",
+        )
+        self.token = AccessToken.for_user(self.user)
+
+    def test_user_is_cached(self):
+        """Test that only the first request reads the user row."""
+        with self.assertNumQueries(1):
+            authenticate(self.token)
+        with self.assertNumQueries(0):
+            user = authenticate(self.token)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, "pat@example.com")
+        self.assertEqual(user.user_type, "PATIENT")
+
+    def test_embedded_claims_skip_the_database(self):
+        """Test that tokens with claims authenticate without any query."""
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+
+        with self.assertNumQueries(0):
+            user = authenticate(token)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.user_type, "PATIENT")
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "pat@example.com")
+
+    def test_save_invalidates(self):
+        """Test that saving a user drops the cached fields."""
+        with self.captureOnCommitCallbacks(execute=True):
+            authenticate(self.token)
+            self.user.first_name = "Patricia"
+            self.user.save()
+
+        self.assertEqual(authenticate(self.token).first_name, "Patricia")
+
+    def test_deactivated_user_is_rejected_despite_claims(self):
+        """Test that deactivation revokes tokens carrying is_active."""
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_old_claims_are_checked_against_the_database(self):
+        """Test that a cache miss with stale claims reads the row, not the claims."""
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        token['iat'] = int(time.time()) - 3600
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_profile_update_keeps_newer_changes(self):
+        """Test that a PATCH with claims older than an admin change does not undo it."""
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        User.objects.filter(pk=self.user.pk).update(user_type="ADMIN", is_staff=True)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        res = client.patch(PROFILE_URL, {'first_name': 'Patricia'})
+
+        self.assertEqual(res.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Patricia")
+        self.assertEqual(self.user.user_type, "ADMIN")
+        self.assertTrue(self.user.is_staff)
+
+    def test_profile_update(self):
+        """Test that the profile endpoint reads and updates the cached user."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        res = client.patch(PROFILE_URL, {'first_name': 'Patricia'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['email'], "pat@example.com")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Patricia")
+        self.assertTrue(self.user.check_password("testpass123"))
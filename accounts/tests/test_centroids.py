@@ -0,0 +1,64 @@
+"""
+Tests for the offline ZIP centroid table.
+"""
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from accounts.centroids import _table, zip_centroid
+from accounts.models import IndividualProviderProfile, ProviderLocation, User
+
+GAZETTEER = "GEOID\tALAND\tINTPTLAT\tINTPTLONG   \n" \
+    "60601\t1000\t41.886\t-87.622\n" \
+    "10001\t1000\t40.750\t-73.997\n" \
+    "00501\t1000\t40.813\t-73.046\n"
+
+
+class ZipCentroidTests(TestCase):
+    """Test building the table and filling points from it."""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        source = os.path.join(tmpdir.name, "gazetteer.txt")
+        with open(source, "w") as f:
+            f.write(GAZETTEER)
+        path = os.path.join(tmpdir.name, "zip_centroids.bin")
+        call_command("build_zip_centroids", source, output=path, stdout=StringIO())
+
+        settings = override_settings(ZIP_CENTROIDS_PATH=path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(_table.cache_clear)
+
+    def test_lookup(self):
+        """Test that known ZIP codes resolve and others do not."""
+        point = zip_centroid("60601-1234", "US")
+        self.assertAlmostEqual(point.y, 41.886, places=3)
+        self.assertAlmostEqual(point.x, -87.622, places=3)
+        self.assertIsNotNone(zip_centroid("00501"))
+        self.assertIsNone(zip_centroid("99999"))
+        self.assertIsNone(zip_centroid("SW1A 1AA", "GB"))
+        self.assertIsNone(zip_centroid(None))
+
+    def test_missing_table(self):
+        """Test that a missing table disables lookups instead of failing."""
+        with override_settings(ZIP_CENTROIDS_PATH="/nonexistent/zip_centroids.bin"):
+            self.assertIsNone(zip_centroid("60601"))
+
+    def test_backfill(self):
+        """Test that only locations without a point are filled."""
+        user = User.objects.create_user(email="doc@example.com", password="testpass123", user_type="INDIVIDUAL_PROVIDER")
+        provider = IndividualProviderProfile.objects.create(user=user)
+        missing = ProviderLocation.objects.create(individual_provider=provider, zip_code="10001")
+        unknown = ProviderLocation.objects.create(individual_provider=provider, zip_code="99999")
+
+        call_command("backfill_zip_centroids", batch_size=1, stdout=StringIO())
+
+        missing.refresh_from_db()
+        unknown.refresh_from_db()
+        self.assertAlmostEqual(missing.location.y, 40.750, places=3)
+        self.assertIsNone(unknown.location)
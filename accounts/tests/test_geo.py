@@ -0,0 +1,87 @@
+"""
+Tests for spatial provider search.
+"""
+import json
+
+from django.contrib.gis.geos import Point
+from django.test import RequestFactory, TestCase
+
+from accounts.geo import nearest_providers, search_origin, within_radius
+from accounts.models import (
+    IndividualProviderProfile,
+    ProviderLocation,
+    User,
+    UserLocation,
+)
+from core.views import search_doctors_v2
+
+
+def create_provider(email, lng, lat):
+    """Create a provider with one location at the given coordinates."""
+    user = User.objects.create_user(
+        email=email, password="testpass123", user_type="INDIVIDUAL_PROVIDER",
+    )
+    provider = IndividualProviderProfile.objects.create(user=user)
+    ProviderLocation.objects.create(
+        individual_provider=provider,
+        location=Point(lng, lat, srid=4326),
+        is_primary=True,
+    )
+    return provider
+
+
+class SpatialSearchTests(TestCase):
+    """Test radius filtering and distance ordering."""
+
+    def setUp(self):
+        self.origin = Point(-87.6298, 41.8781, srid=4326)  # Chicago
+        self.near = create_provider("near@example.com", -87.6500, 41.8800)
+        self.far = create_provider("far@example.com", -87.9073, 41.9742)
+        self.out_of_range = create_provider("nyc@example.com", -74.0060, 40.7128)
+        self.providers = IndividualProviderProfile.objects.all()
+
+    def test_within_radius_excludes_distant_providers(self):
+        """Test that the radius filter drops providers outside it."""
+        results = within_radius(self.providers, self.origin, 50)
+
+        self.assertCountEqual(results, [self.near, self.far])
+
+    def test_nearest_providers_sorted_with_distance(self):
+        """Test that results come back nearest first with distances."""
+        results = nearest_providers(self.providers, self.origin, 50, limit=10)
+
+        self.assertEqual(results, [self.near, self.far])
+        self.assertLess(results[0].distance_km, 5)
+        self.assertGreater(results[1].distance_km, 20)
+
+    def test_search_origin_defaults_to_primary_location(self):
+        """Test that the user's primary location is used without lat/lng."""
+        patient = User.objects.create_user(email="patient@example.com", password="testpass123")
+        UserLocation.objects.create(user=patient, location=self.origin, is_primary=True)
+
+        origin, radius_km = search_origin({'sort': 'distance'}, patient)
+
+        self.assertEqual(origin.coords, self.origin.coords)
+        self.assertEqual(radius_km, 25)
+
+    def test_search_origin_off_without_spatial_params(self):
+        """Test that plain searches are not spatial."""
+        patient = User.objects.create_user(email="patient@example.com", password="testpass123")
+
+        self.assertEqual(search_origin({}, patient), (None, None))
+
+    def test_search_v2_sorts_by_distance(self):
+        """Test that the v2 search endpoint honours sort=distance too."""
+        patient = User.objects.create_user(email="patient@example.com", password="testpass123")
+        request = RequestFactory().get('/', {
+            'sort': 'distance', 'lat': self.origin.y, 'lng': self.origin.x, 'radius': 50,
+        })
+        request.user = patient
+
+        html = json.loads(search_doctors_v2(request).content)['html']
+
+        self.assertNotIn(f"viewDoctorProfile({self.out_of_range.id})", html)
+        self.assertLess(
+            html.index(f"viewDoctorProfile({self.near.id})"),
+            html.index(f"viewDoctorProfile({self.far.id})"),
+        )
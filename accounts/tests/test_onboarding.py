@@ -0,0 +1,113 @@
+"""
+Tests for the provider onboarding command.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import IndividualProviderProfile, OrganizationProfile, ProviderAffiliation, ProviderLocation, User
+from accounts.onboarding import ProviderImporter
+from core.counters import platform_counters
+from core.importing import RejectLog
+
+HEADER = "email,first_name,last_name,npi,specialty,license_number,organization,address,city,state,zip_code"
+
+
+class ImportProvidersTests(TestCase):
+    """Test bulk onboarding providers from registry files."""
+
+    def setUp(self):
+        org_user = User.objects.create_user(email="clinic@example.com", password="testpass123", user_type="ORGANIZATION")
+        self.organization = OrganizationProfile.objects.create(user=org_user, name="Clinic")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, **options):
+        out = StringIO()
+        call_command("import_providers", path, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_csv_import_creates_providers_and_affiliations(self):
+        """Test that rows become users, profiles, shared locations and affiliations."""
+        path = self.write("registry.csv", "\n".join([
+            HEADER,
+            "ann@example.com,Ann,Lee,1234567890,Cardiology,LIC1,clinic@example.com,1 Main St,Springfield,IL,62701",
+            "bob@example.com,Bob,Ray,1234567891,Dermatology,LIC2,clinic@example.com,1 Main St,Springfield,IL,62701",
+            "cy@example.com,Cy,Fox,,,,,,,,",
+        ]))
+
+        out = self.run_import(path, chunk_size=2)
+
+        self.assertIn("rows/s", out)
+        self.assertEqual(IndividualProviderProfile.objects.count(), 3)
+        ann = IndividualProviderProfile.objects.get(user__email="ann@example.com")
+        self.assertEqual(ann.specialty, "Cardiology")
+        self.assertEqual(ann.user.user_type, "INDIVIDUAL_PROVIDER")
+        self.assertFalse(ann.user.has_usable_password())
+        self.assertEqual(ProviderLocation.objects.filter(organization=self.organization).count(), 1)
+        self.assertEqual(ProviderAffiliation.objects.filter(organization=self.organization).count(), 2)
+        self.assertEqual(platform_counters()['providers'], 3)
+
+    def test_reimport_updates_in_place(self):
+        """Test that importing a provider again updates rather than duplicates."""
+        row = "ann@example.com,Ann,Lee,1234567890,Cardiology,LIC1,clinic@example.com,1 Main St,Springfield,IL,62701"
+        self.run_import(self.write("first.csv", f"{HEADER}\n{row}"))
+
+        self.run_import(self.write("second.csv", f"{HEADER}\n{row.replace('Cardiology', 'Neurology')}"))
+
+        profile = IndividualProviderProfile.objects.get()
+        self.assertEqual(profile.specialty, "Neurology")
+        self.assertEqual(User.objects.filter(user_type="INDIVIDUAL_PROVIDER").count(), 1)
+        self.assertEqual(ProviderAffiliation.objects.count(), 1)
+        self.assertEqual(platform_counters()['providers'], 1)
+
+    def test_ndjson_rejects(self):
+        """Test that invalid rows are reported and the rest imported."""
+        User.objects.create_user(email="patient@example.com", password="testpass123")
+        rows = [
+            {"email": "ann@example.com", "first_name": "Ann", "last_name": "Lee", "license_number": "LIC1"},
+            {"email": "ann@example.com", "first_name": "Ann", "last_name": "Lee"},
+            {"email": "bob@example.com", "first_name": "Bob", "last_name": "Ray", "license_number": "LIC1"},
+            {"email": "patient@example.com", "first_name": "Pat", "last_name": "Doe"},
+            {"email": "cy@example.com", "first_name": "Cy", "last_name": "Fox", "npi": "12"},
+            {"email": "di@example.com", "first_name": "Di", "last_name": "Li", "organization": "none@example.com"},
+        ]
+        path = self.write("registry.ndjson", "\n".join(json.dumps(row) for row in rows))
+        rejects = os.path.join(self.tmpdir.name, "rejects.ndjson")
+
+        self.run_import(path, rejects=rejects)
+
+        self.assertEqual(list(IndividualProviderProfile.objects.values_list('user__email', flat=True)), ["ann@example.com"])
+        with open(rejects) as f:
+            lines = [json.loads(line)["line"] for line in f]
+        self.assertEqual(lines, [2, 3, 4, 5, 6])
+
+    def test_dry_run_writes_nothing(self):
+        """Test that a dry run validates without inserting."""
+        path = self.write("registry.csv", f"{HEADER}\nann@example.com,Ann,Lee,,,,,,,,")
+
+        out = self.run_import(path, dry_run=True)
+
+        self.assertIn("Validated 1 of 1 rows", out)
+        self.assertFalse(IndividualProviderProfile.objects.exists())
+
+    def test_rejects_are_streamed_not_kept(self):
+        """Test that rejected rows are written out and only a sample is held."""
+        stream = StringIO()
+        importer = ProviderImporter(rejects=RejectLog(stream, sample_size=2))
+
+        importer.import_chunk([(line, {"email": f"p{line}@example.com"}) for line in range(2, 7)])
+
+        self.assertEqual(len(importer.rejected), 5)
+        self.assertEqual([reject["line"] for reject in importer.rejected.sample], [2, 3])
+        self.assertEqual(len(stream.getvalue().splitlines()), 5)
@@ -0,0 +1,85 @@
+"""
+Tests for provider full-text search.
+"""
+from django.test import TestCase
+
+from accounts.models import (
+    IndividualProviderProfile,
+    OrganizationProfile,
+    ProviderAffiliation,
+    User,
+)
+from accounts.search import build_search_query, search_providers
+
+
+def create_provider(email, first_name, last_name, **params):
+    """Create and return an individual provider profile."""
+    user = User.objects.create_user(
+        email=email,
+        password="testpass123",
+        first_name=first_name,
+        last_name=last_name,
+        user_type="INDIVIDUAL_PROVIDER",
+    )
+    return IndividualProviderProfile.objects.create(user=user, **params)
+
+
+class ProviderSearchTests(TestCase):
+    """Test the provider search document and ranking."""
+
+    def setUp(self):
+        self.cardiologist = create_provider(
+            "heart@example.com", "Ada", "Okafor", specialty="Cardiology",
+        )
+        self.dermatologist = create_provider(
+            "skin@example.com", "Ben", "Stone", specialty="Dermatology",
+            bio="Interested in cardiology research.",
+        )
+
+    def search(self, text):
+        return list(
+            search_providers(IndividualProviderProfile.objects.all(), text)
+            .order_by('-rank')
+        )
+
+    def test_empty_text_builds_no_query(self):
+        """Test that text without terms produces no tsquery."""
+        self.assertIsNone(build_search_query("  ?! "))
+
+    def test_search_matches_prefix(self):
+        """Test that partially typed words match."""
+        self.assertEqual(self.search("okaf"), [self.cardiologist])
+
+    def test_specialty_outranks_bio(self):
+        """Test that a specialty match ranks above a bio match."""
+        results = self.search("cardiology")
+
+        self.assertEqual(results, [self.cardiologist, self.dermatologist])
+
+    def test_document_follows_name_change(self):
+        """Test that renaming the user refreshes the document."""
+        user = self.dermatologist.user
+        user.last_name = "Whitfield"
+        user.save()
+
+        self.assertEqual(self.search("whitfield"), [self.dermatologist])
+
+    def test_document_includes_affiliations(self):
+        """Test that organization names are searchable and kept in sync."""
+        org_user = User.objects.create_user(
+            email="org@example.com", password="testpass123", user_type="ORGANIZATION",
+        )
+        organization = OrganizationProfile.objects.create(
+            user=org_user, name="Lakeside Clinic", organization_type="CLINIC",
+        )
+        ProviderAffiliation.objects.create(
+            individual_provider=self.cardiologist, organization=organization,
+        )
+
+        self.assertEqual(self.search("lakeside"), [self.cardiologist])
+
+        organization.name = "Harbor Hospital"
+        organization.save()
+
+        self.assertEqual(self.search("lakeside"), [])
+        self.assertEqual(self.search("harbor"), [self.cardiologist])
@@ -1,6 +1,7 @@
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth import login, logout
 
+from accounts.centroids import zip_centroid
 from accounts.models.users import IndividualProviderProfile, OrganizationProfile, PatientProfile, ProviderLocation
 from .forms import CustomUserCreationForm
 from django.contrib.auth.views import LoginView
@@ -123,6 +124,16 @@ class SignUpView(FormView):
 
         return super().form_invalid(form)
 
+    def _location_point(self, cleaned_data):
+        """Use the browser's coordinates, else the ZIP code's centroid"""
+        if cleaned_data.get('latitude') and cleaned_data.get('longitude'):
+            return Point(
+                float(cleaned_data['longitude']),
+                float(cleaned_data['latitude']),
+                srid=4326
+            )
+        return zip_centroid(cleaned_data.get('postal_code'), cleaned_data.get('country'))
+
     def _create_patient_profile(self, user, cleaned_data):
         """Create a patient profile"""
         # Create PatientProfile
@@ -144,7 +155,7 @@ class SignUpView(FormView):
         # Create provider location if address is provided
         address = cleaned_data.get('address')
         if address:
-            location = ProviderLocation.objects.create(
+            ProviderLocation.objects.create(
                 individual_provider=individual_provider_profile,
                 name=cleaned_data.get('practice_name', 'Main Practice'),
                 location_type='PRIVATE_PRACTICE',
@@ -153,17 +164,9 @@ class SignUpView(FormView):
                 state=cleaned_data.get('state', ''),
                 zip_code=cleaned_data.get('postal_code', ''),
                 country=cleaned_data.get('country', ''),
+                location=self._location_point(cleaned_data),
                 is_primary=True
             )
-            # If we have latitude and longitude, save them
-            if cleaned_data.get('latitude') and cleaned_data.get('longitude'):
-                point = Point(
-                    float(cleaned_data['longitude']),
-                    float(cleaned_data['latitude']),
-                    srid=4326
-                )
-                location.location = point
-                location.save()
 
     def _create_organization_profile(self, user, cleaned_data):
         """Create an organization profile and location"""
@@ -198,7 +201,7 @@ class SignUpView(FormView):
         # Create organization location if address is provided
         address = cleaned_data.get('address')
         if address:
-            location = ProviderLocation.objects.create(
+            ProviderLocation.objects.create(
                 organization=organization_profile,
                 name="Main Location",
                 location_type="MAIN",
@@ -207,16 +210,9 @@ class SignUpView(FormView):
                 state=cleaned_data.get('state', ''),
                 zip_code=cleaned_data.get('postal_code', ''),
                 country=cleaned_data.get('country', ''),
+                location=self._location_point(cleaned_data),
                 is_primary=True
             )
-            if cleaned_data.get('latitude') and cleaned_data.get('longitude'):
-                point = Point(
-                    float(cleaned_data['longitude']),
-                    float(cleaned_data['latitude']),
-                    srid=4326
-                )
-                location.location = point
-                location.save()
 
     def form_invalid(self, form):
         for field, errors in form.errors.items():
@@ -0,0 +1,37 @@
+"""
+Serializers for the appointments API.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+from appointments.booking import BookingConflict, book_appointment
+from appointments.models import Appointment
+
+
+class BookingSerializer(serializers.ModelSerializer):
+    """Serializer for booking an appointment as the requesting patient."""
+
+    class Meta:
+        model = Appointment
+        fields = [
+            'id', 'doctor', 'location', 'date', 'start_time', 'end_time',
+            'appointment_type', 'reason_for_visit', 'symptoms', 'status',
+        ]
+        read_only_fields = ['id', 'status']
+
+    def create(self, validated_data):
+        """Book and return the appointment."""
+        try:
+            return book_appointment(patient=self.context['request'].user, **validated_data)
+        except BookingConflict:
+            raise
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(serializers.as_serializer_error(error))
+
+
+class WeekScheduleQuerySerializer(serializers.Serializer):
+    """Query parameters for the schedule endpoint."""
+
+    start = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=31, default=7)
+    doctor = serializers.IntegerField(required=False)
@@ -0,0 +1,13 @@
+"""
+URL mappings for the appointments API.
+"""
+from django.urls import path
+from appointments.api import views
+
+
+app_name = 'appointments_api'
+
+urlpatterns = [
+    path('book/', views.BookAppointmentView.as_view(), name='book'),
+    path('schedule/', views.WeekScheduleView.as_view(), name='schedule'),
+]
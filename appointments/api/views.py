@@ -0,0 +1,97 @@
+"""
+Views for the appointments API.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.api.authentication import CachedJWTAuthentication
+from accounts.models import IndividualProviderProfile
+from appointments.api.serializers import BookingSerializer, WeekScheduleQuerySerializer
+from appointments.booking import BookingConflict
+from appointments.idempotency import IDEMPOTENCY_HEADER, claim_key, store_response
+from appointments.schedule import provider_schedule
+
+
+@extend_schema(
+    tags=["appointments"],
+    parameters=[
+        OpenApiParameter(
+            IDEMPOTENCY_HEADER,
+            str,
+            OpenApiParameter.HEADER,
+            description="Client-generated key; retries with the same key replay the first response.",
+        ),
+    ],
+)
+class BookAppointmentView(generics.CreateAPIView):
+    """Book an appointment for the authenticated patient."""
+
+    serializer_class = BookingSerializer
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        """Book once per Idempotency-Key, replaying the result on retries."""
+        if request.user.user_type != 'PATIENT':
+            raise PermissionDenied("Only patients can book appointments.")
+
+        with transaction.atomic():
+            record, replay = claim_key(request)
+            if replay is not None:
+                return replay
+            response = self.book(request)
+            store_response(record, response)
+        return response
+
+    def book(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            serializer.save()
+        except BookingConflict as error:
+            return Response({'detail': error.message}, status=status.HTTP_409_CONFLICT)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(tags=["appointments"], parameters=[WeekScheduleQuerySerializer])
+class WeekScheduleView(APIView):
+    """Appointments, office hours and free slots of a provider, column-wise.
+
+    Defaults to the requesting provider and the current week. Staff may
+    pass ``doctor`` to view another provider.
+    """
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return the schedule for the requested range."""
+        params = WeekScheduleQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        doctor_id = params.validated_data.get('doctor')
+        if doctor_id is None:
+            doctor_id = IndividualProviderProfile.objects.filter(
+                user=request.user,
+            ).values_list('id', flat=True).first()
+            if doctor_id is None:
+                raise PermissionDenied("Only providers have a schedule.")
+        elif not request.user.is_staff and not IndividualProviderProfile.objects.filter(
+            id=doctor_id, user=request.user,
+        ).exists():
+            raise PermissionDenied("You can only view your own schedule.")
+
+        start = params.validated_data.get('start')
+        if start is None:
+            today = timezone.now().date()
+            start = today - timedelta(days=today.weekday())
+
+        return Response(provider_schedule(doctor_id, start, params.validated_data['days']))
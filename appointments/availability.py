@@ -0,0 +1,230 @@
+"""
+Availability calculations for providers.
+
+Slot generation is kept free of queries so callers can load office hours
+and appointments for many providers at once and group them in memory.
+Free time is combined as DayAvailability bitmaps (see appointments.bitmap);
+slots are only turned into ``datetime.time`` pairs at the edge.
+
+The generated slots are materialized as AvailabilitySlot rows covering each
+provider's ``advance_booking_days`` window. Appointment and OfficeHours
+changes update them through signals, and ``rebuild_availability_slots``
+runs nightly to roll the windows forward, so search, next-slot lookups and
+schedules read free slots with an indexed range query instead of
+recomputing them.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from appointments.bitmap import DayAvailability, office_hours_availability
+from appointments.models import Appointment, AvailabilitySlot, OfficeHours
+
+
+def slot_grid(office_hours, date):
+    """Return every ``(start_time, end_time)`` slot of ``office_hours`` on ``date``.
+
+    Slots overlapping the break are left out; bookings are not considered.
+    """
+    if date.weekday() != office_hours.day_of_week:
+        return []
+
+    slots = []
+    current_time = datetime.combine(date, office_hours.start_time)
+    end_time = datetime.combine(date, office_hours.end_time)
+    slot_duration = timedelta(minutes=office_hours.slot_duration)
+    step = slot_duration + timedelta(minutes=office_hours.buffer_time)
+
+    while current_time + slot_duration <= end_time:
+        slot_start = current_time.time()
+        slot_end = (current_time + slot_duration).time()
+        current_time += step
+
+        if office_hours.break_start and office_hours.break_end:
+            if slot_start < office_hours.break_end and slot_end > office_hours.break_start:
+                continue
+
+        slots.append((slot_start, slot_end))
+
+    return slots
+
+
+def day_availability(office_hours, date, busy, now):
+    """Return the bookable time of ``office_hours`` on ``date``.
+
+    ``busy`` is a DayAvailability of the provider's bookings that day; time
+    that has already passed is removed when ``date`` is today.
+    """
+    day = office_hours_availability(office_hours, date) - busy
+    if day and date == now.date():
+        day -= DayAvailability.until(now.time())
+    return day
+
+
+def free_slots(office_hours, date, booked, now=None):
+    """Return the free ``(start_time, end_time)`` slots of ``office_hours`` on ``date``.
+
+    ``booked`` is an iterable of ``(start_time, end_time)`` pairs for the
+    provider's active appointments that day. Slots overlapping the break or
+    a booking are skipped, as are slots that already started when ``date``
+    is today.
+    """
+    day = day_availability(office_hours, date, DayAvailability.busy_all(booked), now or timezone.now())
+    if not day:
+        return []
+    return [
+        (slot_start, slot_end)
+        for slot_start, slot_end in slot_grid(office_hours, date)
+        if day.covers(slot_start, slot_end)
+    ]
+
+
+def providers_available_on(provider_ids, date):
+    """Return the ids in ``provider_ids`` with at least one free slot on ``date``.
+
+    ``provider_ids`` may be a list or a ``values('pk')`` queryset. Answered
+    from the materialized slots with one indexed query, however many
+    providers are checked.
+    """
+    return set(
+        AvailabilitySlot.objects.free()
+        .filter(doctor_id__in=provider_ids, date=date)
+        .values_list('doctor_id', flat=True)
+        .distinct()
+    )
+
+
+def next_available_slots(providers, today=None):
+    """Return each provider's earliest free slot, keyed by provider id.
+
+    The first free materialized slot of every provider is read in one
+    ``DISTINCT ON`` query. Values are ``{'date', 'time', 'location'}`` dicts
+    as returned by IndividualProviderProfile.get_next_available_slot;
+    providers without a free slot in their window are left out.
+    """
+    now = timezone.now()
+    today = today or now.date()
+    windows = {
+        provider.pk: today + timedelta(days=provider.advance_booking_days)
+        for provider in providers
+    }
+    if not windows:
+        return {}
+
+    first_slots = (
+        AvailabilitySlot.objects.free(now)
+        .filter(doctor_id__in=list(windows), date__gte=today)
+        .select_related('location')
+        .order_by('doctor_id', 'date', 'start_time')
+        .distinct('doctor_id')
+    )
+    return {
+        slot.doctor_id: {
+            'date': slot.date,
+            'time': slot.start_time,
+            'location': slot.location,
+        }
+        for slot in first_slots
+        if slot.date <= windows[slot.doctor_id]
+    }
+
+
+def dates_on_weekday(weekday, start, end):
+    """Yield every date between ``start`` and ``end`` inclusive on ``weekday``."""
+    day = start + timedelta(days=(weekday - start.weekday()) % 7)
+    while day <= end:
+        yield day
+        day += timedelta(days=7)
+
+
+def _materialize(office_hours, start, end, busy_by_day):
+    """Build unsaved AvailabilitySlot rows for ``office_hours`` between two dates."""
+    return [
+        AvailabilitySlot(
+            doctor_id=office_hours.doctor_id,
+            office_hours=office_hours,
+            location_id=office_hours.location_id,
+            date=day,
+            start_time=slot_start,
+            end_time=slot_end,
+            is_booked=busy_by_day[day].overlaps(slot_start, slot_end),
+        )
+        for day in dates_on_weekday(office_hours.day_of_week, start, end)
+        for slot_start, slot_end in slot_grid(office_hours, day)
+    ]
+
+
+def busy_by_provider_day(provider_ids, start, end):
+    """Return ``{provider_id: {date: DayAvailability}}`` of active bookings."""
+    booked = Appointment.objects.filter(
+        doctor_id__in=provider_ids,
+        date__range=(start, end),
+        status__in=Appointment.ACTIVE_STATUSES,
+    ).values_list('doctor_id', 'date', 'start_time', 'end_time')
+
+    busy_by_provider = defaultdict(lambda: defaultdict(DayAvailability))
+    for doctor_id, date, start_time, end_time in booked:
+        busy_by_provider[doctor_id][date] |= DayAvailability.busy(start_time, end_time)
+    return busy_by_provider
+
+
+def rebuild_availability_slots(providers, today=None):
+    """Regenerate the materialized slots of ``providers`` from scratch.
+
+    Each provider gets slots from ``today`` through its
+    ``advance_booking_days`` window; older slots are dropped. Returns the
+    number of slots written.
+    """
+    today = today or timezone.now().date()
+    windows = {
+        provider.pk: today + timedelta(days=provider.advance_booking_days)
+        for provider in providers
+    }
+    if not windows:
+        return 0
+
+    busy_by_provider = busy_by_provider_day(list(windows), today, max(windows.values()))
+    slots = []
+    for hours in OfficeHours.objects.filter(doctor_id__in=list(windows), is_active=True):
+        slots.extend(_materialize(
+            hours, today, windows[hours.doctor_id], busy_by_provider[hours.doctor_id]
+        ))
+
+    with transaction.atomic():
+        AvailabilitySlot.objects.filter(doctor_id__in=list(windows)).delete()
+        AvailabilitySlot.objects.bulk_create(slots, batch_size=1000)
+    return len(slots)
+
+
+def sync_office_hours_slots(office_hours, today=None):
+    """Replace the materialized slots generated by one OfficeHours row."""
+    today = today or timezone.now().date()
+
+    with transaction.atomic():
+        AvailabilitySlot.objects.filter(office_hours=office_hours).delete()
+        if not office_hours.is_active:
+            return 0
+
+        end = today + timedelta(days=office_hours.doctor.advance_booking_days)
+        busy_by_provider = busy_by_provider_day([office_hours.doctor_id], today, end)
+        slots = _materialize(office_hours, today, end, busy_by_provider[office_hours.doctor_id])
+        AvailabilitySlot.objects.bulk_create(slots, batch_size=1000)
+    return len(slots)
+
+
+def sync_booked_slots(doctor_id, date):
+    """Re-flag a provider's materialized slots on ``date`` in one UPDATE."""
+    overlapping = Appointment.objects.filter(
+        doctor_id=OuterRef('doctor_id'),
+        date=OuterRef('date'),
+        status__in=Appointment.ACTIVE_STATUSES,
+        start_time__lt=OuterRef('end_time'),
+        end_time__gt=OuterRef('start_time'),
+    )
+    return AvailabilitySlot.objects.filter(
+        doctor_id=doctor_id,
+        date=date,
+    ).update(is_booked=Exists(overlapping))
@@ -0,0 +1,150 @@
+"""
+Compact bitmap encoding of a provider's day.
+
+A day is split into 5-minute units and stored as a single int: bit ``n``
+set means minutes ``[5n, 5n + 5)`` are free. Office hours, breaks and
+bookings become masks, so combining them is one ``&`` or ``& ~`` on a
+288-bit int instead of comparing lists of ``datetime.time`` pairs.
+
+Free time is rounded inwards to whole units and busy time outwards, so
+times off the 5-minute grid can only ever make a slot look taken, never
+free. Office hours are the exception: slots are laid out from their exact
+edges by ``slot_grid``, so their mask spans every unit they touch and only
+bookings and elapsed time are checked against the grid.
+"""
+from datetime import time
+
+UNIT_MINUTES = 5
+UNITS_PER_DAY = 24 * 60 // UNIT_MINUTES
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute + value.second / 60 + value.microsecond / 60_000_000
+
+
+def _units_floor(value):
+    return int(_minutes(value) // UNIT_MINUTES)
+
+
+def _units_ceil(value):
+    return -int(-_minutes(value) // UNIT_MINUTES)
+
+
+def _mask(first, last):
+    """Bits ``first`` up to but not including ``last``."""
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def unit_to_time(unit):
+    """Return the start time of ``unit``."""
+    return time(*divmod(unit * UNIT_MINUTES, 60))
+
+
+class DayAvailability:
+    """Free time of one provider on one day as a bitmask of 5-minute units."""
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def free(cls, start_time, end_time):
+        """Free between two times, shrunk to whole units."""
+        return cls(_mask(_units_ceil(start_time), _units_floor(end_time)))
+
+    @classmethod
+    def spanning(cls, start_time, end_time):
+        """Free in every unit the two times touch, grown to whole units."""
+        return cls(_mask(_units_floor(start_time), _units_ceil(end_time)))
+
+    @classmethod
+    def busy(cls, start_time, end_time):
+        """Taken between two times, grown to whole units."""
+        return cls(_mask(_units_floor(start_time), _units_ceil(end_time)))
+
+    @classmethod
+    def busy_all(cls, spans):
+        """Union of ``busy`` over ``(start_time, end_time)`` pairs."""
+        bits = 0
+        for start_time, end_time in spans:
+            bits |= _mask(_units_floor(start_time), _units_ceil(end_time))
+        return cls(bits)
+
+    @classmethod
+    def until(cls, moment):
+        """Every unit up to and including the one ``moment`` falls in."""
+        return cls(_mask(0, _units_floor(moment) + 1))
+
+    def __and__(self, other):
+        return DayAvailability(self.bits & other.bits)
+
+    def __or__(self, other):
+        return DayAvailability(self.bits | other.bits)
+
+    def __sub__(self, other):
+        return DayAvailability(self.bits & ~other.bits)
+
+    def __bool__(self):
+        return bool(self.bits)
+
+    def __eq__(self, other):
+        return isinstance(other, DayAvailability) and self.bits == other.bits
+
+    def __repr__(self):
+        return f"DayAvailability({self.free_minutes()} free minutes)"
+
+    def free_minutes(self):
+        return self.bits.bit_count() * UNIT_MINUTES
+
+    def covers(self, start_time, end_time):
+        """True if every unit touched by ``[start_time, end_time)`` is free."""
+        needed = _mask(_units_floor(start_time), _units_ceil(end_time))
+        return needed != 0 and self.bits & needed == needed
+
+    def overlaps(self, start_time, end_time):
+        """True if any unit touched by ``[start_time, end_time)`` is set."""
+        return self.bits & _mask(_units_floor(start_time), _units_ceil(end_time)) != 0
+
+    def run_starts(self, minutes):
+        """Mask of units where a free run of ``minutes`` begins."""
+        length = -(-minutes // UNIT_MINUTES)
+        runs = self.bits
+        span = 1
+        # Doubling shifts: after each step bit n means units n..n+span-1 are free
+        while span < length:
+            step = min(span, length - span)
+            runs &= runs >> step
+            span += step
+        return runs
+
+    def first_free_run(self, minutes, after=None):
+        """Return the start time of the earliest free run of ``minutes``.
+
+        Runs starting before ``after`` are ignored. Returns None if there is
+        no such run.
+        """
+        runs = self.run_starts(minutes)
+        if after is not None:
+            runs &= ~_mask(0, _units_ceil(after))
+        if not runs:
+            return None
+        return unit_to_time((runs & -runs).bit_length() - 1)
+
+
+def office_hours_availability(office_hours, date):
+    """Return the free time ``office_hours`` gives on ``date``, minus its break.
+
+    Edges off the 5-minute grid are kept, not rounded away: the hours span
+    every unit they touch and only whole units of the break are removed.
+    ``slot_grid`` already keeps slots inside the exact hours and out of the
+    exact break, so the mask must not reject its first or last slot.
+    """
+    if date.weekday() != office_hours.day_of_week:
+        return DayAvailability()
+    day = DayAvailability.spanning(office_hours.start_time, office_hours.end_time)
+    if office_hours.break_start and office_hours.break_end:
+        day -= DayAvailability.free(office_hours.break_start, office_hours.break_end)
+    return day
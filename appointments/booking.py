@@ -0,0 +1,63 @@
+"""
+Transactional appointment booking.
+
+Overlaps are enforced by the ``appointment_no_overlap`` exclusion
+constraint, so two concurrent requests for the same slot cannot both
+succeed: the loser is blocked on the winner's row until it commits and then
+fails with an exclusion violation, which is reported as BookingConflict.
+"""
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, transaction
+
+from appointments.models import Appointment, WaitListOffer
+
+OVERLAP_ERROR_CODE = 'appointment_overlap'
+
+# PostgreSQL SQLSTATEs for a booking that lost a race
+EXCLUSION_VIOLATION = '23P01'
+UNIQUE_VIOLATION = '23505'
+
+
+class BookingConflict(ValidationError):
+    """The requested time overlaps another active appointment."""
+
+    def __init__(self, message="Doctor already has an appointment at this time."):
+        super().__init__(message, code=OVERLAP_ERROR_CODE)
+
+
+def _is_overlap_error(error):
+    if hasattr(error, 'error_dict'):
+        errors = error.error_dict.get(NON_FIELD_ERRORS, [])
+    else:
+        errors = error.error_list
+    return any(e.code == OVERLAP_ERROR_CODE for e in errors)
+
+
+def book_appointment(**fields):
+    """Create and return an Appointment from ``fields``.
+
+    Raises BookingConflict when the doctor already has an active
+    appointment overlapping the requested time, whether that is found by
+    validation or by the constraint at insert time, or when the time is
+    held for another patient by a waitlist offer. Other validation errors
+    are raised unchanged.
+    """
+    appointment = Appointment(**fields)
+    held = WaitListOffer.objects.holding(
+        appointment.doctor_id, appointment.date, appointment.start_time, appointment.end_time,
+    ).exclude(waitlist__patient_id=appointment.patient_id)
+    if held.exists():
+        raise BookingConflict("This time is being held for a patient on the waitlist.")
+
+    try:
+        with transaction.atomic():
+            appointment.save()
+    except ValidationError as error:
+        if _is_overlap_error(error):
+            raise BookingConflict() from error
+        raise
+    except IntegrityError as error:
+        if getattr(error.__cause__, 'pgcode', None) in (EXCLUSION_VIOLATION, UNIQUE_VIOLATION):
+            raise BookingConflict() from error
+        raise
+    return appointment
@@ -0,0 +1,197 @@
+"""
+iCalendar feeds of a user's appointments and events.
+
+Feeds are served from signed, unguessable URLs so calendar apps can poll
+them without a session. The token carries the user's
+``calendar_feed_version``, so regenerating the link (``rotate_feed``)
+revokes every earlier URL without touching SECRET_KEY. A cheap aggregate (latest ``updated_at`` and row
+count) provides the ETag and Last-Modified, so an unchanged calendar is
+answered with 304 before the feed query runs; otherwise rows are streamed
+from ``.iterator()`` querysets.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.db.models import Count, F, Max, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from appointments.models import Appointment
+from bulletins.models import Event
+
+FEED_SALT = 'appointments.ics-feed'
+PRODID = '-//UrbanMD Health Network//Appointments//EN'
+# Past appointments older than this are left out of feeds
+HISTORY = timedelta(days=90)
+
+
+def feed_token(user):
+    """Return the signed token identifying the current version of ``user``'s feed."""
+    return signing.Signer(salt=FEED_SALT).sign(f'{user.pk}:{user.calendar_feed_version}')
+
+
+def feed_owner(token):
+    """Return ``(user_id, version)`` from ``token``, or None if the signature is bad."""
+    try:
+        value = signing.Signer(salt=FEED_SALT).unsign(token)
+        # Links issued before versioning signed the bare id
+        user_id, _, version = value.partition(':')
+        return int(user_id), int(version or 0)
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def rotate_feed(user):
+    """Invalidate ``user``'s feed links; ``feed_token`` then issues a new one."""
+    User.objects.filter(pk=user.pk).update(calendar_feed_version=F('calendar_feed_version') + 1)
+    user.refresh_from_db(fields=['calendar_feed_version'])
+
+
+def feed_url(request, user):
+    """Absolute URL of ``user``'s calendar feed."""
+    return request.build_absolute_uri(
+        reverse('appointments:calendar_feed', kwargs={'token': feed_token(user)})
+    )
+
+
+def feed_querysets(user_id):
+    """Return the appointment and event querysets making up a user's feed."""
+    since = timezone.now().date() - HISTORY
+    appointments = Appointment.objects.filter(
+        Q(patient_id=user_id) | Q(doctor__user_id=user_id),
+        date__gte=since,
+    )
+    events = Event.objects.filter(
+        Q(created_by_id=user_id) | Q(registrations__user_id=user_id),
+        is_published=True,
+        start_date__gte=since,
+    ).distinct()
+    return appointments, events
+
+
+def feed_version(user_id):
+    """Return ``(etag, last_modified)`` for a user's feed from two aggregates."""
+    appointments, events = feed_querysets(user_id)
+    appointment_stats = appointments.order_by().aggregate(last=Max('updated_at'), count=Count('id'))
+    event_stats = Event.objects.filter(pk__in=events.values('pk')).aggregate(
+        last=Max('updated_at'), count=Count('id'),
+    )
+
+    stamps = [stamp for stamp in (appointment_stats['last'], event_stats['last']) if stamp]
+    last_modified = max(stamps) if stamps else None
+    version = f"{user_id}:{appointment_stats['count']}:{appointment_stats['last']}:{event_stats['count']}:{event_stats['last']}"
+    return f'"{hashlib.md5(version.encode()).hexdigest()}"', last_modified
+
+
+def _escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Fold a content line to 75 octets as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        # Continuation lines start with a space, leaving 74 octets of content
+        cut = min(75 if not parts else 74, len(encoded))
+        # Do not split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _local(day, at):
+    """Floating local date-time; schedules are stored as wall-clock times."""
+    return datetime.combine(day, at).strftime('%Y%m%dT%H%M%S')
+
+
+def _utc(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _event(uid, stamp, start, end, summary, location=None, status=None, all_day=False):
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{_utc(stamp)}']
+    if all_day:
+        lines += [f'DTSTART;VALUE=DATE:{start}', f'DTEND;VALUE=DATE:{end}']
+    else:
+        lines += [f'DTSTART:{start}', f'DTEND:{end}']
+    lines.append(f'SUMMARY:{_escape(summary)}')
+    if location:
+        lines.append(f'LOCATION:{_escape(location)}')
+    if status:
+        lines.append(f'STATUS:{status}')
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) for line in lines)
+
+
+def _appointment_events(appointments, user_id):
+    rows = appointments.order_by('date', 'start_time').values_list(
+        'id', 'date', 'start_time', 'end_time', 'status', 'updated_at', 'patient_id',
+        'patient__first_name', 'patient__last_name',
+        'doctor__user__first_name', 'doctor__user__last_name',
+        'location__name', 'location__address',
+    )
+    for (pk, day, start_time, end_time, status, updated_at, patient_id,
+         patient_first, patient_last, doctor_first, doctor_last,
+         location_name, location_address) in rows.iterator(chunk_size=500):
+        if patient_id == user_id:
+            summary = f"Appointment with Dr. {doctor_first} {doctor_last}"
+        else:
+            summary = f"Appointment: {patient_first} {patient_last}"
+        yield _event(
+            uid=f'appointment-{pk}@urbanmdhealthnetwork.com',
+            stamp=updated_at,
+            start=_local(day, start_time),
+            end=_local(day, end_time),
+            summary=summary,
+            location=location_name or location_address,
+            status='CANCELLED' if status == 'CANCELLED' else 'CONFIRMED',
+        )
+
+
+def _bulletin_events(events):
+    rows = events.order_by('start_date', 'start_time').values_list(
+        'id', 'title', 'start_date', 'end_date', 'start_time', 'end_time', 'updated_at',
+        'is_online', 'location__name', 'location__address',
+    )
+    for (pk, title, start_date, end_date, start_time, end_time, updated_at,
+         is_online, location_name, location_address) in rows.iterator(chunk_size=500):
+        end_date = end_date or start_date
+        if start_time and end_time:
+            start, end, all_day = _local(start_date, start_time), _local(end_date, end_time), False
+        else:
+            start, end, all_day = start_date.strftime('%Y%m%d'), (end_date + timedelta(days=1)).strftime('%Y%m%d'), True
+        yield _event(
+            uid=f'event-{pk}@urbanmdhealthnetwork.com',
+            stamp=updated_at,
+            start=start,
+            end=end,
+            summary=title,
+            location='Online' if is_online else (location_name or location_address),
+            all_day=all_day,
+        )
+
+
+def stream_feed(user_id):
+    """Yield the iCalendar document for ``user_id`` piece by piece."""
+    appointments, events = feed_querysets(user_id)
+    yield ''.join(_fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:UrbanMD',
+    ])
+    yield from _appointment_events(appointments, user_id)
+    yield from _bulletin_events(events)
+    yield _fold('END:VCALENDAR')
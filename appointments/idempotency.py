@@ -0,0 +1,88 @@
+"""
+Idempotency-Key handling for write endpoints.
+
+The first request with a key claims an IdempotencyKey row and stores its
+response; retries with the same key and body get that response replayed.
+Claiming happens inside the caller's transaction, so a concurrent retry
+blocks on the row until the original request commits.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from appointments.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+class IdempotencyKeyReused(APIException):
+    """The key was already used for a different request."""
+
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "Idempotency-Key was already used with a different request."
+    default_code = 'idempotency_key_reused'
+
+
+def request_fingerprint(request):
+    """Return a SHA-256 hex digest of the request method, path and body."""
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    digest = hashlib.sha256()
+    for part in (request.method, request.path, payload):
+        digest.update(part.encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def claim_key(request):
+    """Claim the request's idempotency key.
+
+    Must run inside a transaction. Returns ``(record, None)`` when the
+    request should be processed, or ``(record, response)`` with the stored
+    response to replay. Returns ``(None, None)`` when no key was sent.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return None, None
+    if len(key) > 255:
+        raise ValidationError({IDEMPOTENCY_HEADER: "Must be at most 255 characters."})
+
+    now = timezone.now()
+    fingerprint = request_fingerprint(request)
+    record, created = IdempotencyKey.objects.get_or_create(
+        user=request.user,
+        key=key,
+        defaults={
+            'fingerprint': fingerprint,
+            'expires_at': now + settings.IDEMPOTENCY_KEY_TTL,
+        },
+    )
+    if created:
+        return record, None
+
+    # Wait for a concurrent request holding the key to finish
+    record = IdempotencyKey.objects.select_for_update().get(pk=record.pk)
+    if record.expires_at <= now:
+        record.fingerprint = fingerprint
+        record.response_status = None
+        record.response_body = None
+        record.expires_at = now + settings.IDEMPOTENCY_KEY_TTL
+        record.save(update_fields=['fingerprint', 'response_status', 'response_body', 'expires_at'])
+        return record, None
+
+    if record.fingerprint != fingerprint:
+        raise IdempotencyKeyReused()
+    return record, Response(record.response_body, status=record.response_status)
+
+
+def store_response(record, response):
+    """Save ``response`` against a claimed key so retries can replay it."""
+    if record is None:
+        return
+    record.response_status = response.status_code
+    record.response_body = response.data
+    record.save(update_fields=['response_status', 'response_body'])
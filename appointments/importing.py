@@ -0,0 +1,168 @@
+"""
+Bulk appointment import.
+
+Rows are validated in chunks: doctors, patients and the active bookings of
+every doctor-day in the chunk are loaded with one query each, overlaps are
+checked in memory against both the database and rows accepted earlier in
+the same import, and accepted rows are written with ``bulk_create``. This
+skips ``Appointment.save()`` (and its per-row ``full_clean()``), so signals
+do not fire; platform counters are adjusted here and callers rebuild
+availability slots afterwards.
+"""
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from accounts.models import IndividualProviderProfile
+from appointments.models import Appointment
+from core.counters import count_appointments
+from core.importing import RejectLog, RowError, parse_value, row_value
+
+STATUSES = {value for value, _ in Appointment.STATUS_CHOICES}
+APPOINTMENT_TYPES = {value for value, _ in Appointment.APPOINTMENT_TYPE_CHOICES}
+
+
+class AppointmentImporter:
+    """Validate and write appointment rows chunk by chunk."""
+
+    def __init__(self, dry_run=False, rejects=None):
+        self.dry_run = dry_run
+        # (doctor_id, date) -> [(start_time, end_time)] of active bookings
+        self.busy = {}
+        self.doctor_days = set()
+        self.created = 0
+        self.rejected = rejects if rejects is not None else RejectLog()
+
+    def import_chunk(self, rows):
+        """Import ``[(line_number, row)]``; returns the number of rows created."""
+        parsed = []
+        for line_number, row in rows:
+            try:
+                parsed.append((line_number, row, self.parse_row(row)))
+            except RowError as error:
+                self.reject(line_number, row, str(error))
+
+        doctors = set(IndividualProviderProfile.objects.filter(
+            id__in={fields['doctor_id'] for _, _, fields in parsed},
+        ).values_list('id', flat=True))
+        patients = self.resolve_patients({fields['patient'] for _, _, fields in parsed})
+        self.load_busy({(fields['doctor_id'], fields['date']) for _, _, fields in parsed})
+
+        accepted = []
+        for line_number, row, fields in parsed:
+            try:
+                accepted.append((line_number, row, self.build(fields, doctors, patients)))
+            except RowError as error:
+                self.reject(line_number, row, str(error))
+
+        created = len(accepted) if self.dry_run else self.write(accepted)
+        self.created += created
+        return created
+
+    def parse_row(self, row):
+        if '_error' in row:
+            raise RowError(row['_error'])
+
+        start_time = parse_value(row, time.fromisoformat, 'start_time')
+        end_time = parse_value(row, time.fromisoformat, 'end_time')
+        if start_time >= end_time:
+            raise RowError("End time must be after start time.")
+
+        status = (row_value(row, 'status', required=False) or 'SCHEDULED').upper()
+        if status not in STATUSES:
+            raise RowError(f"Invalid status: {status!r}")
+        appointment_type = (row_value(row, 'appointment_type', required=False) or 'IN_PERSON').upper()
+        if appointment_type not in APPOINTMENT_TYPES:
+            raise RowError(f"Invalid appointment_type: {appointment_type!r}")
+
+        return {
+            'doctor_id': parse_value(row, int, 'doctor'),
+            'patient': str(row_value(row, 'patient')).lower(),
+            'location_id': parse_value(row, int, 'location', required=False),
+            'date': parse_value(row, date.fromisoformat, 'date'),
+            'start_time': start_time,
+            'end_time': end_time,
+            'status': status,
+            'appointment_type': appointment_type,
+            'reason_for_visit': row_value(row, 'reason_for_visit', required=False) or "Imported appointment",
+            'notes': row_value(row, 'notes', required=False) or None,
+        }
+
+    def resolve_patients(self, references):
+        """Map patient ids and emails in ``references`` to user ids."""
+        ids = {int(ref) for ref in references if ref.isdigit()}
+        emails = {ref for ref in references if not ref.isdigit()}
+        users = get_user_model().objects.filter(user_type='PATIENT')
+        patients = {
+            str(pk): pk for pk in users.filter(id__in=ids).values_list('id', flat=True)
+        }
+        patients.update(
+            (email.lower(), pk)
+            for pk, email in users.filter(email__in=emails).values_list('id', 'email')
+        )
+        return patients
+
+    def load_busy(self, doctor_days):
+        """Fetch active bookings for doctor-days not seen yet, in one query."""
+        missing = doctor_days - self.busy.keys()
+        if not missing:
+            return
+        for key in missing:
+            self.busy[key] = []
+        existing = Appointment.objects.filter(
+            doctor_id__in={doctor_id for doctor_id, _ in missing},
+            date__in={day for _, day in missing},
+            status__in=Appointment.ACTIVE_STATUSES,
+        ).values_list('doctor_id', 'date', 'start_time', 'end_time')
+        for doctor_id, day, start_time, end_time in existing:
+            if (doctor_id, day) in missing:
+                self.busy[doctor_id, day].append((start_time, end_time))
+
+    def build(self, fields, doctors, patients):
+        if fields['doctor_id'] not in doctors:
+            raise RowError(f"Unknown doctor: {fields['doctor_id']}")
+        patient_id = patients.get(fields.pop('patient'))
+        if patient_id is None:
+            raise RowError("Unknown patient")
+
+        key = (fields['doctor_id'], fields['date'])
+        if fields['status'] in Appointment.ACTIVE_STATUSES:
+            busy = self.busy[key]
+            if any(fields['start_time'] < end and fields['end_time'] > start for start, end in busy):
+                raise RowError("Doctor already has an appointment at this time.")
+            busy.append((fields['start_time'], fields['end_time']))
+        self.doctor_days.add(key)
+        return Appointment(patient_id=patient_id, **fields)
+
+    def write(self, accepted):
+        """Bulk insert ``accepted``, falling back to row inserts on a conflict.
+
+        The exclusion constraint still guards against bookings made while
+        the import runs; only the rows it rejects are reported.
+        """
+        try:
+            with transaction.atomic():
+                Appointment.objects.bulk_create([appointment for _, _, appointment in accepted])
+                count_appointments([appointment for _, _, appointment in accepted])
+            return len(accepted)
+        except IntegrityError:
+            pass
+
+        created = 0
+        for line_number, row, appointment in accepted:
+            appointment.pk = None
+            try:
+                with transaction.atomic():
+                    Appointment.objects.bulk_create([appointment])
+                    count_appointments([appointment])
+                created += 1
+            except IntegrityError:
+                self.reject(line_number, row, "Conflicts with an existing appointment.")
+        return created
+
+    def reject(self, line_number, row, reason):
+        self.rejected.add(line_number, row, reason)
+
+    def affected_doctor_ids(self):
+        return {doctor_id for doctor_id, _ in self.doctor_days}
@@ -0,0 +1,31 @@
+"""
+Django command to expire lapsed waitlist holds.
+"""
+from django.core.management.base import BaseCommand
+
+from appointments.waitlist import expire_offers
+
+
+class Command(BaseCommand):
+    """Expire pending waitlist offers past their hold and re-offer the slots.
+
+    Meant to run from cron every few minutes.
+    """
+
+    help = "Expire lapsed waitlist offers and pass the slots to the next patient"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Offers expired per transaction",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        total = 0
+        while expired := expire_offers(batch_size=options["batch_size"]):
+            total += expired
+
+        self.stdout.write(self.style.SUCCESS(f"Expired {total} waitlist offers."))
@@ -0,0 +1,93 @@
+"""
+Django command to bulk import appointments from CSV or NDJSON.
+"""
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import IndividualProviderProfile
+from appointments.availability import rebuild_availability_slots
+from appointments.importing import AppointmentImporter
+from core.importing import RejectLog, read_rows
+
+
+class Command(BaseCommand):
+    """Stream appointments into the database in validated chunks.
+
+    Columns (CSV header or NDJSON keys): doctor, patient (id or email),
+    date, start_time, end_time, and optionally location, status,
+    appointment_type, reason_for_visit and notes.
+    """
+
+    help = "Import appointments from a CSV or newline-delimited JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Input format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Rows validated and inserted per batch",
+        )
+        parser.add_argument(
+            "--rejects",
+            help="Write rejected rows as NDJSON to this file",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        path = options["path"]
+        fmt = options["format"]
+        if fmt is None:
+            if path == "-":
+                raise CommandError("--format is required when reading stdin.")
+            fmt = "csv" if Path(path).suffix.lower() == ".csv" else "ndjson"
+
+        # Rejects are written as they happen, never collected in memory
+        rejects_file = open(options["rejects"], "w", encoding="utf-8") if options["rejects"] else None
+        rejects = RejectLog(rejects_file)
+        importer = AppointmentImporter(dry_run=options["dry_run"], rejects=rejects)
+        started = time.monotonic()
+        total = 0
+
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            rows = read_rows(stream, fmt)
+            while chunk := list(islice(rows, options["chunk_size"])):
+                importer.import_chunk(chunk)
+                total += len(chunk)
+                self.stdout.write(f"  {total} rows read, {importer.created} imported")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if rejects_file is not None:
+                rejects_file.close()
+
+        for reject in rejects.sample:
+            self.stderr.write(f"Line {reject['line']}: {reject['error']}")
+
+        if importer.created and not options["dry_run"]:
+            # bulk_create skips signals, so refresh the materialized slots
+            rebuild_availability_slots(
+                IndividualProviderProfile.objects.filter(id__in=importer.affected_doctor_ids())
+            )
+
+        elapsed = time.monotonic() - started
+        rate = total / elapsed if elapsed else total
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Validated' if options['dry_run'] else 'Imported'} {importer.created} of {total} rows "
+            f"({rejects.count} rejected) in {elapsed:.1f}s, {rate:.0f} rows/s."
+        ))
@@ -0,0 +1,37 @@
+"""
+Django command to delete expired idempotency keys.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from appointments.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    """Delete IdempotencyKey rows past their expiry in batches.
+
+    Meant to run from cron, e.g. hourly.
+    """
+
+    help = "Delete expired booking API idempotency keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Keys deleted per statement",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        expired = IdempotencyKey.objects.filter(expires_at__lte=timezone.now())
+        batch_size = options["batch_size"]
+        deleted = 0
+        while True:
+            batch = list(expired.values_list("pk", flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
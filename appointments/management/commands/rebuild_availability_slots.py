@@ -0,0 +1,52 @@
+"""
+Django command to rebuild the materialized availability slots.
+"""
+from django.core.management.base import BaseCommand
+
+from accounts.models import IndividualProviderProfile
+from appointments.availability import rebuild_availability_slots
+
+
+class Command(BaseCommand):
+    """Regenerate AvailabilitySlot rows for providers' booking windows.
+
+    Run nightly so every window rolls forward by a day.
+    """
+
+    help = "Rebuild precomputed availability slots from office hours and appointments"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--doctor",
+            type=int,
+            action="append",
+            dest="doctor_ids",
+            help="Only rebuild this provider id (repeatable)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Providers rebuilt per transaction",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        providers = IndividualProviderProfile.objects.only("id", "advance_booking_days").order_by("id")
+        if options["doctor_ids"]:
+            providers = providers.filter(id__in=options["doctor_ids"])
+
+        batch_size = options["batch_size"]
+        provider_count = slot_count = 0
+        last_id = 0
+        while True:
+            batch = list(providers.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            slot_count += rebuild_availability_slots(batch)
+            provider_count += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {slot_count} slots for {provider_count} providers."
+        ))
@@ -0,0 +1,61 @@
+"""
+Django command to send due appointment reminders.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from appointments.reminders import dispatch_due_reminders
+
+
+class Command(BaseCommand):
+    """Send due reminders in locked batches.
+
+    Safe to run as several processes at once; each claims different rows.
+    Without --loop it drains what is due and exits, for use from cron.
+    """
+
+    help = "Send due, unsent appointment reminders"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Reminders claimed per transaction",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling for due reminders",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Seconds to sleep between polls when idle (with --loop)",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        failed = set()
+        total_sent = 0
+        try:
+            while True:
+                sent, batch_failed = dispatch_due_reminders(options["batch_size"], exclude=failed)
+                failed.update(batch_failed)
+                total_sent += len(sent)
+                if sent or batch_failed:
+                    self.stdout.write(f"  sent {len(sent)}, failed {len(batch_failed)}")
+                    continue
+                if not options["loop"]:
+                    break
+                # Give failures another chance after an idle pass
+                failed.clear()
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {total_sent} reminders ({len(failed)} failed)."
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-17 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_providerlocation_location'),
+        ('appointments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilitySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('is_booked', models.BooleanField(default=False)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_slots', to='accounts.individualproviderprofile')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='availability_slots', to='accounts.providerlocation')),
+                ('office_hours', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='appointments.officehours')),
+            ],
+            options={
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(condition=models.Q(('is_booked', False)), fields=['doctor', 'date', 'start_time'], name='availability_free_slot_idx')],
+                'unique_together': {('office_hours', 'date', 'start_time')},
+            },
+        ),
+    ]
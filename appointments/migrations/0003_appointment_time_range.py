@@ -0,0 +1,53 @@
+# Generated by Django 5.2.10 on 2026-10-17 12:05
+
+import appointments.models.appointments
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_providerlocation_location'),
+        ('appointments', '0002_availabilityslot'),
+    ]
+
+    operations = [
+        # GiST needs btree_gist to compare doctor ids with equality
+        BtreeGistExtension(),
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='time_range',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Func(
+                    models.ExpressionWrapper(
+                        models.F('date') + models.F('start_time'),
+                        output_field=models.DateTimeField(),
+                    ),
+                    models.ExpressionWrapper(
+                        models.F('date') + models.F('end_time'),
+                        output_field=models.DateTimeField(),
+                    ),
+                    function='TSRANGE',
+                    output_field=appointments.models.appointments.TimestampRangeField(),
+                ),
+                output_field=appointments.models.appointments.TimestampRangeField(),
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(('status__in', ['SCHEDULED', 'CONFIRMED', 'IN_PROGRESS'])),
+                expressions=[('doctor', '='), ('time_range', '&&')],
+                name='appointment_no_overlap',
+                violation_error_code='appointment_overlap',
+                violation_error_message='Doctor already has an appointment at this time.',
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-17 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointmentreminder',
+            index=models.Index(fields=['is_sent', 'scheduled_for'], name='reminder_due_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.10 on 2026-10-17 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def expand_existing_preferences(apps, schema_editor):
+    from appointments.waitlist import expand_preferences
+
+    WaitList = apps.get_model('appointments', 'WaitList')
+    WaitListPreference = apps.get_model('appointments', 'WaitListPreference')
+    rows = []
+    for entry in WaitList.objects.filter(is_active=True).iterator():
+        rows.extend(
+            WaitListPreference(
+                waitlist_id=entry.pk,
+                doctor_id=entry.doctor_id,
+                date=day,
+                start_time=start_time,
+                end_time=end_time,
+            )
+            for day, start_time, end_time in expand_preferences(entry.preferred_dates, entry.preferred_times)
+        )
+    WaitListPreference.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_providerlocation_location'),
+        ('appointments', '0005_appointmentreminder_reminder_due_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitListPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(blank=True, null=True)),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.individualproviderprofile')),
+                ('waitlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preferences', to='appointments.waitlist')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doctor', 'date', 'start_time'], name='waitlist_pref_match_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WaitListOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('DECLINED', 'Declined'), ('EXPIRED', 'Expired')], default='PENDING', max_length=10)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_offers', to='accounts.individualproviderprofile')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.providerlocation')),
+                ('waitlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='appointments.waitlist')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'PENDING')), fields=['expires_at'], name='waitlist_offer_pending_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('doctor', 'date', 'start_time'), name='waitlist_one_pending_offer_per_slot')],
+            },
+        ),
+        migrations.RunPython(expand_existing_preferences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+def mark_existing_offers_notified(apps, schema_editor):
+    # Offers made before the queue were notified when they were created
+    WaitListOffer = apps.get_model('appointments', 'WaitListOffer')
+    WaitListOffer.objects.update(notified_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_waitlistpreference_waitlistoffer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='waitlistoffer',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistoffer',
+            index=models.Index(condition=models.Q(('notified_at__isnull', True), ('status', 'PENDING')), fields=['created_at'], name='waitlist_offer_unsent_idx'),
+        ),
+        migrations.RunPython(mark_existing_offers_notified, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,27 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
 from django.core.exceptions import ValidationError
 
+from core.mixins import LoadedValuesMixin
+
+
+class TimestampRangeField(DateTimeRangeField):
+    """A ``tsrange`` column; appointment times are wall-clock, not zoned."""
+
+    def db_type(self, connection):
+        return 'tsrange'
+
+
+def _timestamp(time_field):
+    return models.ExpressionWrapper(
+        models.F('date') + models.F(time_field),
+        output_field=models.DateTimeField(),
+    )
+
 
 # class OfficeHours(models.Model):
 #     """Doctor's office hours schedule."""
@@ -40,7 +59,7 @@ from django.core.exceptions import ValidationError
 #         return f"{self.get_day_of_week_display()}: {self.start_time.strftime('%I:%M %p')} - {self.end_time.strftime('%I:%M %p')}"
 
 
-class Appointment(models.Model):
+class Appointment(LoadedValuesMixin, models.Model):
     """Appointment between patient and doctor."""
 
     STATUS_CHOICES = [
@@ -52,6 +71,9 @@ class Appointment(models.Model):
         ('NO_SHOW', 'No Show'),
     ]
 
+    # Statuses that occupy the doctor's time
+    ACTIVE_STATUSES = ['SCHEDULED', 'CONFIRMED', 'IN_PROGRESS']
+
     APPOINTMENT_TYPE_CHOICES = [
         ('IN_PERSON', 'In-Person'),
         ('VIDEO', 'Video Consultation'),
@@ -81,6 +103,17 @@ class Appointment(models.Model):
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
+    # [start, end) as a range column so overlaps can be enforced by the database
+    time_range = models.GeneratedField(
+        expression=models.Func(
+            _timestamp('start_time'),
+            _timestamp('end_time'),
+            function='TSRANGE',
+            output_field=TimestampRangeField(),
+        ),
+        output_field=TimestampRangeField(),
+        db_persist=True,
+    )
     appointment_type = models.CharField(
         max_length=20,
         choices=APPOINTMENT_TYPE_CHOICES,
@@ -113,7 +146,19 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ['date', 'start_time']
-        unique_together = [['doctor', 'date', 'start_time']]
+        constraints = [
+            ExclusionConstraint(
+                name='appointment_no_overlap',
+                expressions=[
+                    ('doctor', RangeOperators.EQUAL),
+                    ('time_range', RangeOperators.OVERLAPS),
+                ],
+                # Same statuses as Appointment.ACTIVE_STATUSES
+                condition=models.Q(status__in=['SCHEDULED', 'CONFIRMED', 'IN_PROGRESS']),
+                violation_error_code='appointment_overlap',
+                violation_error_message="Doctor already has an appointment at this time.",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.patient.full_name} - Dr. {self.doctor.user.full_name} on {self.date} at {self.start_time}"
@@ -124,22 +169,11 @@ class Appointment(models.Model):
             raise ValidationError("Cannot schedule appointments in the past.")
 
         if self.start_time >= self.end_time:
-            raise ValidationError("End time must be after start time.")
+            # Keyed to the field so constraint validation skips the bad range
+            raise ValidationError({'end_time': "End time must be after start time."})
 
-        # Check if doctor is available at this time
-        if self.doctor and self.date and self.start_time and self.end_time:
-            conflicting_appointments = Appointment.objects.filter(
-                doctor=self.doctor,
-                date=self.date,
-                status__in=['SCHEDULED', 'CONFIRMED', 'IN_PROGRESS']
-            ).exclude(pk=self.pk)
-
-            for appointment in conflicting_appointments:
-                if (self.start_time < appointment.end_time and
-                    self.end_time > appointment.start_time):
-                    raise ValidationError(
-                        "Doctor already has an appointment at this time."
-                    )
+        # Overlapping bookings are rejected by the appointment_no_overlap
+        # constraint, which full_clean() also checks before saving.
 
     def save(self, *args, **kwargs):
         self.full_clean()
@@ -258,55 +292,96 @@ class OfficeHours(models.Model):
 
     def get_available_slots(self, date):
         """Get available appointment slots for a specific date."""
+        from appointments.availability import free_slots
+
         # Check if the date matches this office hour's day of week
         if date.weekday() != self.day_of_week:
             return []
 
         # Get all appointments for this doctor on this date
         existing_appointments = Appointment.objects.filter(
-            doctor=self.doctor,
+            doctor_id=self.doctor_id,
             date=date,
-            status__in=['SCHEDULED', 'CONFIRMED']
+            status__in=Appointment.ACTIVE_STATUSES
         ).values_list('start_time', 'end_time')
 
-        # Generate all possible slots
-        slots = []
-        current_time = datetime.combine(date, self.start_time)
-        end_time = datetime.combine(date, self.end_time)
-        slot_duration = timedelta(minutes=self.slot_duration)
-        buffer_duration = timedelta(minutes=self.buffer_time)
-
-        while current_time + slot_duration <= end_time:
-            slot_start = current_time.time()
-            slot_end = (current_time + slot_duration).time()
-
-            # Check if slot is during break time
-            if self.break_start and self.break_end:
-                if not (slot_end <= self.break_start or slot_start >= self.break_end):
-                    current_time += slot_duration + buffer_duration
-                    continue
+        return [
+            {
+                'start_time': slot_start,
+                'end_time': slot_end,
+                'is_available': True
+            }
+            for slot_start, slot_end in free_slots(self, date, existing_appointments)
+        ]
+
+
+class AvailabilitySlotQuerySet(models.QuerySet):
+    """Queries over materialized availability slots."""
+
+    def free(self, now=None):
+        """Unbooked slots that have not started yet."""
+        now = now or timezone.now()
+        return self.filter(is_booked=False).filter(
+            models.Q(date__gt=now.date()) |
+            models.Q(date=now.date(), start_time__gt=now.time())
+        )
+
+    def unheld(self, now=None):
+        """Slots no pending waitlist offer is holding for someone."""
+        held = WaitListOffer.objects.holding(
+            models.OuterRef('doctor_id'),
+            models.OuterRef('date'),
+            models.OuterRef('start_time'),
+            models.OuterRef('end_time'),
+            now,
+        )
+        return self.exclude(models.Exists(held))
+
+
+class AvailabilitySlot(models.Model):
+    """Precomputed appointment slot within a provider's booking window.
+
+    Rows are generated from OfficeHours and flagged as booked when an active
+    appointment overlaps them (see appointments.availability).
+    """
 
-            # Check if slot conflicts with existing appointments
-            is_available = True
-            for apt_start, apt_end in existing_appointments:
-                if not (slot_end <= apt_start or slot_start >= apt_end):
-                    is_available = False
-                    break
-
-            if is_available:
-                # Check if slot is in the past for today
-                if date == timezone.now().date() and slot_start <= timezone.now().time():
-                    is_available = False
+    doctor = models.ForeignKey(
+        'accounts.IndividualProviderProfile',
+        on_delete=models.CASCADE,
+        related_name='availability_slots'
+    )
+    office_hours = models.ForeignKey(
+        OfficeHours,
+        on_delete=models.CASCADE,
+        related_name='slots'
+    )
+    location = models.ForeignKey(
+        'accounts.ProviderLocation',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='availability_slots'
+    )
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    is_booked = models.BooleanField(default=False)
 
-                slots.append({
-                    'start_time': slot_start,
-                    'end_time': slot_end,
-                    'is_available': is_available
-                })
+    objects = AvailabilitySlotQuerySet.as_manager()
 
-            current_time += slot_duration + buffer_duration
+    class Meta:
+        ordering = ['date', 'start_time']
+        unique_together = [['office_hours', 'date', 'start_time']]
+        indexes = [
+            models.Index(
+                fields=['doctor', 'date', 'start_time'],
+                condition=models.Q(is_booked=False),
+                name='availability_free_slot_idx'
+            ),
+        ]
 
-        return slots
+    def __str__(self):
+        return f"{self.doctor_id} on {self.date} at {self.start_time}"
 
 
 class AppointmentReminder(models.Model):
@@ -333,13 +408,18 @@ class AppointmentReminder(models.Model):
 
     class Meta:
         ordering = ['scheduled_for']
+        indexes = [
+            models.Index(fields=['is_sent', 'scheduled_for'], name='reminder_due_idx'),
+        ]
 
     def __str__(self):
         return f"{self.reminder_type} reminder for {self.appointment}"
 
     def send(self):
-        """Send the reminder (placeholder for actual implementation)."""
-        # TODO: Implement actual sending logic based on reminder_type
+        """Send the reminder through the backend for its type."""
+        from appointments.reminders import send_reminder
+
+        send_reminder(self)
         self.is_sent = True
         self.sent_at = timezone.now()
         self.save()
@@ -387,12 +467,154 @@ class WaitList(models.Model):
         return f"Waitlist: {self.patient.full_name} waiting for Dr. {self.doctor.user.full_name}"
 
     def notify_availability(self, available_slot):
-        """Notify patient about available slot."""
-        # TODO: Implement notification logic
+        """Notify patient about a slot held for them (a WaitListOffer)."""
+        from appointments.waitlist import send_offer_notification
+
+        send_offer_notification(self, available_slot)
         self.notified_at = timezone.now()
-        self.save()
+        self.save(update_fields=['notified_at'])
 
     def deactivate(self):
         """Deactivate waitlist entry."""
         self.is_active = False
-        self.save()
\ No newline at end of file
+        self.save()
+
+
+class WaitListPreference(models.Model):
+    """One date/time window a waitlist entry accepts, expanded for indexed matching.
+
+    Rows are derived from WaitList.preferred_dates and preferred_times (see
+    appointments.waitlist); a null date means any date.
+    """
+
+    waitlist = models.ForeignKey(
+        WaitList,
+        on_delete=models.CASCADE,
+        related_name='preferences'
+    )
+    doctor = models.ForeignKey(
+        'accounts.IndividualProviderProfile',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    date = models.DateField(null=True, blank=True)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['doctor', 'date', 'start_time'], name='waitlist_pref_match_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.waitlist_id}: {self.date or 'any date'} {self.start_time}-{self.end_time}"
+
+
+class WaitListOfferQuerySet(models.QuerySet):
+    """Queries over waitlist offers."""
+
+    def holding(self, doctor_id, date, start_time, end_time, now=None):
+        """Pending, unexpired offers holding time that overlaps the given slot."""
+        return self.filter(
+            doctor_id=doctor_id,
+            date=date,
+            status='PENDING',
+            expires_at__gt=now or timezone.now(),
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        )
+
+
+class WaitListOffer(models.Model):
+    """A freed slot held for a waitlisted patient until it is taken or expires."""
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('ACCEPTED', 'Accepted'),
+        ('DECLINED', 'Declined'),
+        ('EXPIRED', 'Expired'),
+    ]
+
+    waitlist = models.ForeignKey(
+        WaitList,
+        on_delete=models.CASCADE,
+        related_name='offers'
+    )
+    doctor = models.ForeignKey(
+        'accounts.IndividualProviderProfile',
+        on_delete=models.CASCADE,
+        related_name='waitlist_offers'
+    )
+    location = models.ForeignKey(
+        'accounts.ProviderLocation',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='PENDING'
+    )
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set once the patient has been told; unset offers are queued for sending
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    objects = WaitListOfferQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['doctor', 'date', 'start_time'],
+                condition=models.Q(status='PENDING'),
+                name='waitlist_one_pending_offer_per_slot'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='PENDING'),
+                name='waitlist_offer_pending_idx'
+            ),
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='PENDING', notified_at__isnull=True),
+                name='waitlist_offer_unsent_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Offer to {self.waitlist_id} for {self.date} at {self.start_time}"
+
+
+class IdempotencyKey(models.Model):
+    """Response stored for a client-supplied ``Idempotency-Key`` header.
+
+    A retried request with the same key and body replays the stored
+    response instead of acting twice (see appointments.idempotency).
+    """
+
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request method, path and body
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = [['user', 'key']]
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id})"
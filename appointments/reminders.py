@@ -0,0 +1,108 @@
+"""
+Appointment reminder dispatch.
+
+Due reminders are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any
+number of workers can run side by side: each batch is locked by the worker
+that claimed it until it is marked sent, and other workers skip past those
+rows instead of waiting on them. Delivery goes through the backend
+configured for the reminder type in ``APPOINTMENT_REMINDER_BACKENDS``.
+"""
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from appointments.models import Appointment, AppointmentReminder
+from email_campaign.functions import send_styled_email
+
+logger = logging.getLogger(__name__)
+
+
+class BaseReminderBackend:
+    """Deliver one reminder; raise to leave it unsent for a later retry."""
+
+    def send(self, reminder):
+        raise NotImplementedError
+
+
+class EmailReminderBackend(BaseReminderBackend):
+    """Email the patient using the styled reminder template."""
+
+    def send(self, reminder):
+        appointment = reminder.appointment
+        patient = appointment.patient
+        location = appointment.location
+        send_styled_email(
+            subject="Reminder: your upcoming UrbanMD appointment",
+            context={
+                'first_name': patient.first_name or 'Valued Patient',
+                'doctor_name': appointment.doctor.user.full_name,
+                'date': appointment.date,
+                'start_time': appointment.start_time,
+                'location': (location.name or location.address) if location else None,
+                'portal_url': settings.PORTAL_URL,
+            },
+            recipient_list=[patient.email],
+            template='appointment_reminder.html',
+        )
+
+
+class LoggingReminderBackend(BaseReminderBackend):
+    """Stand-in for channels without a provider yet (SMS, push)."""
+
+    def send(self, reminder):
+        logger.info(
+            "%s reminder for appointment %s (not delivered, no provider configured)",
+            reminder.reminder_type, reminder.appointment_id,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_backend(reminder_type):
+    """Return the backend instance configured for ``reminder_type``."""
+    return import_string(settings.APPOINTMENT_REMINDER_BACKENDS[reminder_type])()
+
+
+def send_reminder(reminder):
+    """Deliver ``reminder`` through its backend without marking it sent."""
+    get_backend(reminder.reminder_type).send(reminder)
+
+
+def dispatch_due_reminders(batch_size=100, now=None, exclude=()):
+    """Claim, send and mark one batch of due reminders.
+
+    Reminders whose appointment is no longer active are left alone.
+    Returns ``(sent_ids, failed_ids)``; failures stay unsent so the next
+    run retries them, and callers can pass them back as ``exclude`` to
+    avoid retrying within the same run.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        batch = list(
+            AppointmentReminder.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(
+                is_sent=False,
+                scheduled_for__lte=now,
+                appointment__status__in=Appointment.ACTIVE_STATUSES,
+            )
+            .exclude(pk__in=exclude)
+            .select_related('appointment__patient', 'appointment__doctor__user', 'appointment__location')
+            .order_by('scheduled_for')[:batch_size]
+        )
+
+        sent, failed = [], []
+        for reminder in batch:
+            try:
+                send_reminder(reminder)
+            except Exception:
+                logger.exception("Failed to send reminder %s", reminder.pk)
+                failed.append(reminder.pk)
+            else:
+                sent.append(reminder.pk)
+
+        if sent:
+            AppointmentReminder.objects.filter(pk__in=sent).update(is_sent=True, sent_at=timezone.now())
+    return sent, failed
@@ -0,0 +1,83 @@
+"""
+Columnar schedule payloads for calendar views.
+
+A provider's appointments, office hours and free materialized slots for a
+date range are read with one query each. The result is
+laid out column-wise (parallel lists keyed by field) with dates as indexes
+into ``days``, which keeps week payloads small and lets the front end
+render every day without further requests.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from appointments.models import Appointment, AvailabilitySlot, OfficeHours
+
+
+def _hhmm(value):
+    return value.strftime('%H:%M') if value else None
+
+
+def provider_schedule(provider_id, start, days=7, now=None):
+    """Return the columnar schedule of ``provider_id`` for ``days`` from ``start``."""
+    now = now or timezone.now()
+    dates = [start + timedelta(days=offset) for offset in range(days)]
+    index = {day: position for position, day in enumerate(dates)}
+
+    appointments = {
+        'id': [], 'day': [], 'start': [], 'end': [], 'status': [], 'type': [], 'patient': [], 'location': [],
+    }
+    rows = Appointment.objects.filter(
+        doctor_id=provider_id,
+        date__range=(dates[0], dates[-1]),
+    ).order_by('date', 'start_time').values_list(
+        'id', 'date', 'start_time', 'end_time', 'status', 'appointment_type',
+        'patient__first_name', 'patient__last_name', 'location_id',
+    )
+    for pk, day, start_time, end_time, status, appointment_type, first_name, last_name, location_id in rows:
+        appointments['id'].append(pk)
+        appointments['day'].append(index[day])
+        appointments['start'].append(_hhmm(start_time))
+        appointments['end'].append(_hhmm(end_time))
+        appointments['status'].append(status)
+        appointments['type'].append(appointment_type)
+        appointments['patient'].append(f"{first_name} {last_name}".strip())
+        appointments['location'].append(location_id)
+
+    office_hours = {
+        'id': [], 'day_of_week': [], 'start': [], 'end': [], 'break_start': [], 'break_end': [],
+        'slot_duration': [], 'location': [],
+    }
+    hours_list = OfficeHours.objects.filter(
+        doctor_id=provider_id,
+        is_active=True,
+    ).order_by('day_of_week', 'start_time')
+    for hours in hours_list:
+        office_hours['id'].append(hours.pk)
+        office_hours['day_of_week'].append(hours.day_of_week)
+        office_hours['start'].append(_hhmm(hours.start_time))
+        office_hours['end'].append(_hhmm(hours.end_time))
+        office_hours['break_start'].append(_hhmm(hours.break_start))
+        office_hours['break_end'].append(_hhmm(hours.break_end))
+        office_hours['slot_duration'].append(hours.slot_duration)
+        office_hours['location'].append(hours.location_id)
+
+    free_slots = {'day': [], 'start': [], 'end': [], 'location': []}
+    # Slots held by a waitlist offer cannot be booked by anyone else
+    slots = AvailabilitySlot.objects.free(now).unheld(now).filter(
+        doctor_id=provider_id,
+        date__range=(dates[0], dates[-1]),
+    ).values_list('date', 'start_time', 'end_time', 'location_id')
+    for day, start_time, end_time, location_id in slots:
+        free_slots['day'].append(index[day])
+        free_slots['start'].append(_hhmm(start_time))
+        free_slots['end'].append(_hhmm(end_time))
+        free_slots['location'].append(location_id)
+
+    return {
+        'doctor': provider_id,
+        'days': [day.isoformat() for day in dates],
+        'appointments': appointments,
+        'office_hours': office_hours,
+        'free_slots': free_slots,
+    }
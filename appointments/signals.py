@@ -0,0 +1,72 @@
+"""
+Signal handlers for the appointments app.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from appointments.availability import sync_booked_slots, sync_office_hours_slots
+from appointments.models import Appointment, OfficeHours, WaitList
+from appointments.waitlist import offer_office_hours, offer_slot, sync_preferences
+
+# Changing any of these on an active appointment gives its old time back
+SLOT_FIELDS = ('doctor_id', 'date', 'start_time', 'end_time', 'status')
+
+
+def _freed_slot(instance, loaded, deleted):
+    """Return the slot an appointment change released, or None."""
+    if deleted:
+        was = {field: getattr(instance, field) for field in SLOT_FIELDS}
+    elif all(field in loaded for field in SLOT_FIELDS):
+        was = loaded
+    else:
+        return None
+
+    if was['status'] not in Appointment.ACTIVE_STATUSES:
+        return None
+    if not deleted and instance.status in Appointment.ACTIVE_STATUSES and all(
+        getattr(instance, field) == was[field] for field in SLOT_FIELDS
+    ):
+        return None
+    return was['doctor_id'], was['date'], was['start_time'], was['end_time'], loaded.get('location_id', instance.location_id)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def appointment_changed(sender, instance, **kwargs):
+    """Re-flag materialized slots on every day the appointment touched.
+
+    A slot given up by a cancellation, reschedule or deletion is offered to
+    the waitlist once the change commits.
+    """
+    days = {(instance.doctor_id, instance.date)}
+    loaded = getattr(instance, '_loaded_values', {})
+    if loaded.get('doctor_id') and loaded.get('date'):
+        days.add((loaded['doctor_id'], loaded['date']))
+
+    for doctor_id, date in days:
+        sync_booked_slots(doctor_id, date)
+
+    freed = _freed_slot(instance, loaded, deleted=kwargs['signal'] is post_delete)
+    if freed:
+        transaction.on_commit(partial(offer_slot, *freed))
+
+
+@receiver(post_save, sender=OfficeHours)
+def office_hours_saved(sender, instance, **kwargs):
+    """Regenerate the slots of changed office hours and offer them to the waitlist.
+
+    Deleted office hours take their slots with them through the foreign key.
+    """
+    sync_office_hours_slots(instance)
+    transaction.on_commit(partial(offer_office_hours, instance))
+
+
+@receiver(post_save, sender=WaitList)
+def waitlist_saved(sender, instance, update_fields=None, **kwargs):
+    """Keep the expanded preference rows in step with the entry."""
+    if update_fields is not None and not {'preferred_dates', 'preferred_times', 'is_active', 'doctor'} & set(update_fields):
+        return
+    sync_preferences(instance)
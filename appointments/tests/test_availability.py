@@ -0,0 +1,248 @@
+"""
+Tests for provider availability calculations.
+"""
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from accounts.models import IndividualProviderProfile, User
+from appointments.availability import free_slots, next_available_slots, providers_available_on
+from appointments.models import Appointment, AvailabilitySlot, OfficeHours
+
+
+def next_weekday(weekday):
+    """Return the next date (after today) falling on ``weekday``."""
+    today = timezone.now().date()
+    return today + timedelta(days=(weekday - today.weekday()) % 7 or 7)
+
+
+def create_provider(email):
+    """Create and return an individual provider profile."""
+    user = User.objects.create_user(email=email, password="testpass123", user_type="INDIVIDUAL_PROVIDER")
+    return IndividualProviderProfile.objects.create(user=user)
+
+
+def create_patient(email="patient@example.com"):
+    """Create and return a patient user."""
+    return User.objects.create_user(email=email, password="testpass123")
+
+
+class FreeSlotsTests(SimpleTestCase):
+    """Test slot generation without the database."""
+
+    def setUp(self):
+        self.hours = OfficeHours(
+            day_of_week=0,
+            start_time=time(9, 0),
+            end_time=time(12, 0),
+            slot_duration=30,
+            break_start=time(10, 30),
+            break_end=time(11, 0),
+        )
+        self.monday = date(2030, 1, 7)
+        self.now = timezone.make_aware(datetime(2030, 1, 1, 8, 0))
+
+    def test_wrong_weekday_has_no_slots(self):
+        """Test that office hours only produce slots on their weekday."""
+        self.assertEqual(free_slots(self.hours, self.monday + timedelta(days=1), [], self.now), [])
+
+    def test_break_and_bookings_are_skipped(self):
+        """Test that slots overlapping the break or a booking are dropped."""
+        slots = free_slots(self.hours, self.monday, [(time(9, 30), time(10, 0))], self.now)
+
+        self.assertEqual(slots, [
+            (time(9, 0), time(9, 30)),
+            (time(10, 0), time(10, 30)),
+            (time(11, 0), time(11, 30)),
+            (time(11, 30), time(12, 0)),
+        ])
+
+    def test_started_slots_skipped_today(self):
+        """Test that slots already started today are not offered."""
+        now = timezone.make_aware(datetime.combine(self.monday, time(11, 10)))
+
+        self.assertEqual(free_slots(self.hours, self.monday, [], now), [(time(11, 30), time(12, 0))])
+
+    def test_off_grid_office_hours_keep_edge_slots(self):
+        """Test that hours and breaks off the 5-minute grid keep their first and last slots."""
+        hours = OfficeHours(
+            day_of_week=0,
+            start_time=time(9, 2),
+            end_time=time(11, 2),
+            slot_duration=30,
+            break_start=time(10, 2),
+            break_end=time(10, 32),
+        )
+
+        self.assertEqual(free_slots(hours, self.monday, [], self.now), [
+            (time(9, 2), time(9, 32)),
+            (time(9, 32), time(10, 2)),
+            (time(10, 32), time(11, 2)),
+        ])
+
+
+class ProvidersAvailableOnTests(TestCase):
+    """Test the batched availability lookup."""
+
+    def setUp(self):
+        self.day = next_weekday(2)
+        self.patient = create_patient()
+        self.providers = [create_provider(f"doc{i}@example.com") for i in range(5)]
+        for provider in self.providers:
+            OfficeHours.objects.create(
+                doctor=provider,
+                day_of_week=self.day.weekday(),
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+                slot_duration=60,
+            )
+
+    def test_fully_booked_provider_excluded(self):
+        """Test that a provider without free slots is not returned."""
+        booked = self.providers[0]
+        Appointment.objects.create(
+            patient=self.patient,
+            doctor=booked,
+            date=self.day,
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            reason_for_visit="Checkup",
+        )
+
+        available = providers_available_on([p.id for p in self.providers], self.day)
+
+        self.assertEqual(available, {p.id for p in self.providers[1:]})
+
+    def test_query_count_is_constant(self):
+        """Test that the lookup runs one query however many providers match."""
+        with self.assertNumQueries(1):
+            providers_available_on([self.providers[0].id], self.day)
+        with self.assertNumQueries(1):
+            providers_available_on(IndividualProviderProfile.objects.values('pk'), self.day)
+
+
+class AvailabilitySlotTests(TestCase):
+    """Test the materialized slot store."""
+
+    def setUp(self):
+        self.day = next_weekday(3)
+        self.patient = create_patient()
+        self.provider = create_provider("doc@example.com")
+        self.provider.advance_booking_days = 14
+        self.provider.save()
+        self.hours = OfficeHours.objects.create(
+            doctor=self.provider,
+            day_of_week=self.day.weekday(),
+            start_time=time(9, 0),
+            end_time=time(11, 0),
+            slot_duration=60,
+        )
+
+    def free_starts(self):
+        return list(
+            AvailabilitySlot.objects.free()
+            .filter(doctor=self.provider, date=self.day)
+            .values_list('start_time', flat=True)
+        )
+
+    def test_office_hours_generate_slots(self):
+        """Test that saving office hours materializes its slots."""
+        self.assertEqual(self.free_starts(), [time(9, 0), time(10, 0)])
+        self.assertEqual(AvailabilitySlot.objects.filter(doctor=self.provider).count(), 4)
+
+    def test_booking_and_cancelling_update_slots(self):
+        """Test that appointments flip the booked flag both ways."""
+        appointment = Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=self.day,
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            reason_for_visit="Checkup",
+        )
+        self.assertEqual(self.free_starts(), [time(10, 0)])
+
+        appointment.cancel()
+
+        self.assertEqual(self.free_starts(), [time(9, 0), time(10, 0)])
+
+    def test_rescheduling_frees_the_old_slot(self):
+        """Test that moving an appointment frees the day it left."""
+        appointment = Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=self.day,
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            reason_for_visit="Checkup",
+        )
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        appointment.date = self.day + timedelta(days=7)
+        appointment.save()
+
+        self.assertEqual(self.free_starts(), [time(9, 0), time(10, 0)])
+
+    def test_rebuild_command_restores_slots(self):
+        """Test that the management command regenerates the store."""
+        AvailabilitySlot.objects.all().delete()
+
+        call_command("rebuild_availability_slots", stdout=StringIO())
+
+        self.assertEqual(self.free_starts(), [time(9, 0), time(10, 0)])
+
+
+class NextAvailableSlotsTests(TestCase):
+    """Test the bulk next-available-slot lookup."""
+
+    def setUp(self):
+        self.day = next_weekday(1)
+        self.patient = create_patient()
+        self.providers = [create_provider(f"doc{i}@example.com") for i in range(3)]
+        for provider in self.providers:
+            OfficeHours.objects.create(
+                doctor=provider,
+                day_of_week=self.day.weekday(),
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+                slot_duration=30,
+            )
+
+    def test_booked_slots_are_skipped(self):
+        """Test that the earliest unbooked slot is returned."""
+        Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.providers[0],
+            date=self.day,
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            reason_for_visit="Checkup",
+        )
+
+        next_slots = next_available_slots(self.providers)
+
+        self.assertEqual(next_slots[self.providers[0].id]['time'], time(9, 30))
+        self.assertEqual(next_slots[self.providers[1].id]['date'], self.day)
+        self.assertEqual(next_slots[self.providers[1].id]['time'], time(9, 0))
+
+    def test_provider_without_hours_is_omitted(self):
+        """Test that providers with no office hours have no entry."""
+        provider = create_provider("idle@example.com")
+
+        self.assertNotIn(provider.id, next_available_slots([provider]))
+        self.assertIsNone(provider.get_next_available_slot())
+
+    def test_query_count_is_constant(self):
+        """Test that the lookup runs one query for any number of providers."""
+        with self.assertNumQueries(1):
+            next_available_slots(self.providers)
+
+    def test_lookup_reads_the_slot_store(self):
+        """Test that next slots come from the materialized slots."""
+        AvailabilitySlot.objects.filter(doctor=self.providers[0], start_time=time(9, 0)).update(is_booked=True)
+
+        next_slots = next_available_slots(self.providers)
+
+        self.assertEqual(next_slots[self.providers[0].id]['time'], time(9, 30))
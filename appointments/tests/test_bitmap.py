@@ -0,0 +1,44 @@
+"""
+Tests for the availability bitmap.
+"""
+from datetime import time
+
+from django.test import SimpleTestCase
+
+from appointments.bitmap import DayAvailability
+
+
+class DayAvailabilityTests(SimpleTestCase):
+    """Test set operations on day bitmaps."""
+
+    def setUp(self):
+        self.day = (
+            DayAvailability.free(time(9, 0), time(12, 0))
+            - DayAvailability.busy(time(10, 30), time(11, 0))
+        )
+
+    def test_subtract_break(self):
+        """Test that subtracting a break removes exactly its minutes."""
+        self.assertEqual(self.day.free_minutes(), 150)
+        self.assertFalse(self.day.covers(time(10, 15), time(10, 45)))
+        self.assertTrue(self.day.covers(time(11, 0), time(12, 0)))
+
+    def test_intersect(self):
+        """Test that intersecting keeps only shared free time."""
+        other = DayAvailability.free(time(11, 30), time(13, 0))
+
+        self.assertEqual(self.day & other, DayAvailability.free(time(11, 30), time(12, 0)))
+
+    def test_first_free_run(self):
+        """Test finding the earliest run long enough for a visit."""
+        self.assertEqual(self.day.first_free_run(90), time(9, 0))
+        self.assertIsNone(self.day.first_free_run(100))
+        self.assertEqual(self.day.first_free_run(30, after=time(10, 1)), time(11, 0))
+
+    def test_off_grid_times_are_conservative(self):
+        """Test that odd minutes shrink free time and grow busy time."""
+        day = DayAvailability.free(time(9, 2), time(9, 58)) - DayAvailability.busy(time(9, 31), time(9, 32))
+
+        self.assertTrue(day.covers(time(9, 5), time(9, 30)))
+        self.assertFalse(day.covers(time(9, 30), time(9, 35)))
+        self.assertFalse(day.covers(time(9, 50), time(9, 58)))
@@ -0,0 +1,100 @@
+"""
+Tests for database-enforced appointment booking.
+"""
+import threading
+from datetime import time
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from appointments.booking import BookingConflict, book_appointment
+from appointments.models import Appointment
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+
+
+class BookAppointmentTests(TestCase):
+    """Test the booking path against the exclusion constraint."""
+
+    def setUp(self):
+        self.day = next_weekday(0)
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+
+    def book(self, start, end, **params):
+        return book_appointment(
+            patient=self.patient,
+            doctor=self.provider,
+            date=self.day,
+            start_time=start,
+            end_time=end,
+            reason_for_visit="Checkup",
+            **params,
+        )
+
+    def test_overlapping_booking_rejected(self):
+        """Test that a partial overlap raises BookingConflict."""
+        self.book(time(9, 0), time(9, 30))
+
+        with self.assertRaises(BookingConflict):
+            self.book(time(9, 15), time(9, 45))
+
+    def test_adjacent_booking_allowed(self):
+        """Test that a booking starting when another ends is accepted."""
+        self.book(time(9, 0), time(9, 30))
+        self.book(time(9, 30), time(10, 0))
+
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_cancelled_slot_can_be_rebooked(self):
+        """Test that cancelled appointments do not hold their time."""
+        self.book(time(9, 0), time(9, 30)).cancel()
+
+        self.book(time(9, 0), time(9, 30))
+
+        self.assertEqual(Appointment.objects.filter(status='SCHEDULED').count(), 1)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Test that parallel bookings for one slot produce a single winner."""
+
+    def test_parallel_bookings_for_one_slot(self):
+        """Test that exactly one of many simultaneous bookings succeeds."""
+        day = next_weekday(0)
+        provider = create_provider("doc@example.com")
+        patients = [create_patient(f"patient{i}@example.com") for i in range(8)]
+        barrier = threading.Barrier(len(patients))
+        results = []
+
+        def book(patient, start, end):
+            try:
+                barrier.wait()
+                book_appointment(
+                    patient=patient,
+                    doctor=provider,
+                    date=day,
+                    start_time=start,
+                    end_time=end,
+                    reason_for_visit="Checkup",
+                )
+                results.append('booked')
+            except BookingConflict:
+                results.append('conflict')
+            finally:
+                connection.close()
+
+        # Half ask for 9:00-9:30, half for the overlapping 9:15-9:45
+        threads = [
+            threading.Thread(
+                target=book,
+                args=(patient, *((time(9, 0), time(9, 30)) if i % 2 else (time(9, 15), time(9, 45)))),
+            )
+            for i, patient in enumerate(patients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count('booked'), 1)
+        self.assertEqual(results.count('conflict'), len(patients) - 1)
+        self.assertEqual(Appointment.objects.filter(doctor=provider).count(), 1)
@@ -0,0 +1,75 @@
+"""
+Tests for the booking API.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, IdempotencyKey
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+
+BOOK_URL = reverse('appointments_api:book')
+
+
+class BookingApiTests(TestCase):
+    """Test booking through the API with idempotency keys."""
+
+    def setUp(self):
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+        self.payload = {
+            'doctor': self.provider.id,
+            'date': next_weekday(0).isoformat(),
+            'start_time': '09:00',
+            'end_time': '09:30',
+            'reason_for_visit': 'Checkup',
+        }
+
+    def book(self, payload, key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(BOOK_URL, payload, format='json', **headers)
+
+    def test_retry_replays_original_response(self):
+        """Test that repeating a key returns the first booking."""
+        first = self.book(self.payload, key='abc')
+        retry = self.book(self.payload, key='abc')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_key_reused_with_different_body(self):
+        """Test that a key cannot be reused for another request."""
+        self.book(self.payload, key='abc')
+
+        res = self.book({**self.payload, 'start_time': '10:00', 'end_time': '10:30'}, key='abc')
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_overlap_returns_conflict(self):
+        """Test that a taken slot is reported as 409."""
+        self.book(self.payload, key='first')
+
+        res = self.book(self.payload, key='second')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_purge_command_deletes_expired_keys(self):
+        """Test that expired keys are removed and live ones kept."""
+        self.book(self.payload, key='old')
+        self.book({**self.payload, 'start_time': '10:00', 'end_time': '10:30'}, key='new')
+        IdempotencyKey.objects.filter(key='old').update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        call_command("purge_idempotency_keys", stdout=StringIO())
+
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
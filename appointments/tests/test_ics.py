@@ -0,0 +1,85 @@
+"""
+Tests for the iCalendar feed.
+"""
+from datetime import time
+
+from django.core import signing
+from django.test import TestCase
+from django.urls import reverse
+
+from appointments.ics import FEED_SALT, feed_token
+from appointments.models import Appointment
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+
+
+class CalendarFeedTests(TestCase):
+    """Test the signed, conditional ICS feed."""
+
+    def setUp(self):
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+        self.appointment = Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=next_weekday(0),
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            reason_for_visit="Checkup",
+        )
+        self.url = reverse('appointments:calendar_feed', kwargs={'token': feed_token(self.patient)})
+
+    def test_feed_lists_appointments(self):
+        """Test that the feed streams a VEVENT per appointment."""
+        res = self.client.get(self.url)
+        body = b''.join(res.streaming_content).decode()
+
+        self.assertEqual(res['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertIn(f'UID:appointment-{self.appointment.pk}@', body)
+        self.assertIn('DTSTART:' + self.appointment.date.strftime('%Y%m%d') + 'T090000', body)
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+
+    def test_unchanged_feed_returns_304(self):
+        """Test that a matching ETag skips the feed query."""
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(3):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_cancellation_changes_etag(self):
+        """Test that cancelling an appointment produces a new version."""
+        etag = self.client.get(self.url)['ETag']
+        self.appointment.cancel()
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_tampered_token_is_rejected(self):
+        """Test that a token for another user id fails the signature."""
+        token = feed_token(self.patient).replace(str(self.patient.pk), str(self.provider.user.pk), 1)
+
+        res = self.client.get(reverse('appointments:calendar_feed', kwargs={'token': token}))
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_regenerated_link_revokes_the_old_one(self):
+        """Test that regenerating the feed link refuses the previous token."""
+        self.client.force_login(self.patient)
+
+        res = self.client.post(reverse('appointments:regenerate_calendar_feed'))
+
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.patient.refresh_from_db()
+        new_url = reverse('appointments:calendar_feed', kwargs={'token': feed_token(self.patient)})
+        self.assertEqual(self.client.get(new_url).status_code, 200)
+
+    def test_unversioned_token_is_version_zero(self):
+        """Test that links signed before versioning work until first regenerated."""
+        token = signing.Signer(salt=FEED_SALT).sign(str(self.patient.pk))
+
+        res = self.client.get(reverse('appointments:calendar_feed', kwargs={'token': token}))
+
+        self.assertEqual(res.status_code, 200)
@@ -0,0 +1,75 @@
+"""
+Tests for the appointment import command.
+"""
+import json
+import os
+import tempfile
+from datetime import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from appointments.models import Appointment
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+
+
+class ImportAppointmentsTests(TestCase):
+    """Test bulk importing appointments."""
+
+    def setUp(self):
+        self.day = next_weekday(0)
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_csv_import_rejects_conflicts(self):
+        """Test that overlaps with the database and the file are rejected."""
+        Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=self.day,
+            start_time=time(8, 0),
+            end_time=time(8, 30),
+            reason_for_visit="Checkup",
+        )
+        path = self.write("appointments.csv", "\n".join([
+            "doctor,patient,date,start_time,end_time,status",
+            f"{self.provider.id},patient@example.com,{self.day},09:00,09:30,",
+            f"{self.provider.id},patient@example.com,{self.day},09:15,09:45,",
+            f"{self.provider.id},{self.patient.id},{self.day},08:15,08:45,",
+            f"{self.provider.id},{self.patient.id},{self.day},09:00,09:30,cancelled",
+            f"{self.provider.id},nobody@example.com,{self.day},10:00,10:30,",
+        ]))
+        rejects = os.path.join(self.tmpdir.name, "rejects.ndjson")
+
+        call_command("import_appointments", path, rejects=rejects, stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(Appointment.objects.count(), 3)
+        with open(rejects) as f:
+            lines = [json.loads(line)["line"] for line in f]
+        self.assertEqual(lines, [3, 4, 6])
+
+    def test_ndjson_dry_run_writes_nothing(self):
+        """Test that a dry run validates without inserting."""
+        row = {
+            "doctor": self.provider.id,
+            "patient": self.patient.id,
+            "date": self.day.isoformat(),
+            "start_time": "09:00",
+            "end_time": "09:30",
+        }
+        path = self.write("appointments.ndjson", json.dumps(row) + "\n")
+        out = StringIO()
+
+        call_command("import_appointments", path, dry_run=True, stdout=out)
+
+        self.assertEqual(Appointment.objects.count(), 0)
+        self.assertIn("Validated 1 of 1 rows", out.getvalue())
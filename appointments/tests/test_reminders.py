@@ -0,0 +1,100 @@
+"""
+Tests for reminder dispatch.
+"""
+import threading
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from appointments.models import Appointment, AppointmentReminder
+from appointments.reminders import dispatch_due_reminders
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+
+
+def create_appointment(start=time(9, 0)):
+    """Create and return an appointment for a new doctor and patient."""
+    provider = create_provider(f"doc{start.hour}@example.com")
+    return Appointment.objects.create(
+        patient=create_patient(f"patient{start.hour}@example.com"),
+        doctor=provider,
+        date=next_weekday(0),
+        start_time=start,
+        end_time=(datetime.combine(next_weekday(0), start) + timedelta(minutes=30)).time(),
+        reason_for_visit="Checkup",
+    )
+
+
+class SendRemindersTests(TestCase):
+    """Test the reminder command."""
+
+    def setUp(self):
+        self.appointment = create_appointment()
+        self.now = timezone.now()
+
+    def test_due_reminders_sent_once(self):
+        """Test that due reminders are emailed and marked sent."""
+        due = AppointmentReminder.objects.create(
+            appointment=self.appointment, reminder_type='EMAIL', scheduled_for=self.now - timedelta(minutes=5),
+        )
+        later = AppointmentReminder.objects.create(
+            appointment=self.appointment, reminder_type='EMAIL', scheduled_for=self.now + timedelta(hours=1),
+        )
+
+        call_command("send_reminders", stdout=StringIO())
+        call_command("send_reminders", stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.appointment.patient.email])
+        due.refresh_from_db()
+        later.refresh_from_db()
+        self.assertTrue(due.is_sent)
+        self.assertFalse(later.is_sent)
+
+    def test_cancelled_appointment_not_reminded(self):
+        """Test that reminders for cancelled appointments are skipped."""
+        AppointmentReminder.objects.create(
+            appointment=self.appointment, reminder_type='SMS', scheduled_for=self.now,
+        )
+        self.appointment.cancel()
+
+        sent, failed = dispatch_due_reminders()
+
+        self.assertEqual((sent, failed), ([], []))
+
+
+class ParallelWorkerTests(TransactionTestCase):
+    """Test that workers skip reminders claimed by another worker."""
+
+    def test_locked_reminders_are_skipped(self):
+        """Test that a second worker does not wait for or resend locked rows."""
+        appointment = create_appointment()
+        reminder = AppointmentReminder.objects.create(
+            appointment=appointment, reminder_type='SMS', scheduled_for=timezone.now(),
+        )
+        claimed = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    list(AppointmentReminder.objects.select_for_update().filter(pk=reminder.pk))
+                    claimed.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        worker = threading.Thread(target=hold_lock)
+        worker.start()
+        claimed.wait(5)
+        try:
+            self.assertEqual(dispatch_due_reminders(), ([], []))
+        finally:
+            release.set()
+            worker.join()
+
+        self.assertEqual(dispatch_due_reminders(), ([reminder.pk], []))
@@ -0,0 +1,94 @@
+"""
+Tests for the provider schedule API.
+"""
+from datetime import time, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from appointments.models import Appointment, OfficeHours, WaitList, WaitListOffer
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+
+SCHEDULE_URL = reverse('appointments_api:schedule')
+
+
+class WeekScheduleApiTests(TestCase):
+    """Test the columnar week view."""
+
+    def setUp(self):
+        self.monday = next_weekday(0)
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+        for offset in range(3):
+            OfficeHours.objects.create(
+                doctor=self.provider,
+                day_of_week=offset,
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+                slot_duration=30,
+            )
+        Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=self.monday,
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            reason_for_visit="Checkup",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.provider.user)
+
+    def test_week_payload_is_columnar(self):
+        """Test that appointments, hours and free slots come back as columns."""
+        res = self.client.get(SCHEDULE_URL, {'start': self.monday.isoformat()})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['days']), 7)
+        self.assertEqual(res.data['appointments']['start'], ['09:00'])
+        self.assertEqual(res.data['appointments']['day'], [0])
+        self.assertEqual(len(res.data['office_hours']['id']), 3)
+        # Monday keeps 09:30 free; Tuesday and Wednesday have both slots
+        self.assertEqual(res.data['free_slots']['day'], [0, 1, 1, 2, 2])
+
+    def test_held_slots_are_not_free(self):
+        """Test that a slot held by a waitlist offer is not listed as free."""
+        entry = WaitList.objects.create(patient=create_patient("waiting@example.com"), doctor=self.provider)
+        WaitListOffer.objects.create(
+            waitlist=entry,
+            doctor=self.provider,
+            date=self.monday + timedelta(days=1),
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+        res = self.client.get(SCHEDULE_URL, {'start': self.monday.isoformat()})
+
+        self.assertEqual(res.data['free_slots']['day'], [0, 1, 2, 2])
+        self.assertEqual(res.data['free_slots']['start'][1], '09:30')
+
+    def test_query_count_does_not_grow_with_range(self):
+        """Test that a month costs the same queries as a week."""
+        with self.assertNumQueries(3):
+            self.client.get(SCHEDULE_URL, {'start': self.monday.isoformat()})
+        Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=self.monday + timedelta(days=8),
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            reason_for_visit="Checkup",
+        )
+        with self.assertNumQueries(3):
+            self.client.get(SCHEDULE_URL, {'start': self.monday.isoformat(), 'days': 31})
+
+    def test_patients_have_no_schedule(self):
+        """Test that a patient cannot request a schedule."""
+        self.client.force_authenticate(self.patient)
+
+        res = self.client.get(SCHEDULE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
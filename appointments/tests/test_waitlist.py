@@ -0,0 +1,126 @@
+"""
+Tests for waitlist matching.
+"""
+from datetime import date, time
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from appointments.booking import BookingConflict, book_appointment
+from appointments.models import Appointment, OfficeHours, WaitList, WaitListOffer, WaitListPreference
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+from appointments.waitlist import accept_offer, decline_offer, expand_preferences
+
+
+def join_waitlist(patient, doctor, **params):
+    """Create and return an active waitlist entry."""
+    return WaitList.objects.create(patient=patient, doctor=doctor, reason_for_visit="Checkup", **params)
+
+
+class ExpandPreferencesTests(SimpleTestCase):
+    """Test turning JSON preferences into windows."""
+
+    def test_periods_and_dates(self):
+        """Test that named periods and dates expand to every combination."""
+        windows = expand_preferences(["2030-01-07", "bad"], {"morning": True, "evening": False})
+
+        self.assertEqual(windows, [(date(2030, 1, 7), time(0, 0), time(12, 0))])
+
+    def test_no_preferences_means_anytime(self):
+        """Test that empty preferences match any date and time."""
+        self.assertEqual(expand_preferences([], {}), [(None, time(0, 0), time.max)])
+
+
+class WaitlistMatchingTests(TestCase):
+    """Test offering freed slots to waiting patients."""
+
+    def setUp(self):
+        self.day = next_weekday(0)
+        self.provider = create_provider("doc@example.com")
+        self.booked_patient = create_patient()
+        self.appointment = Appointment.objects.create(
+            patient=self.booked_patient,
+            doctor=self.provider,
+            date=self.day,
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            reason_for_visit="Checkup",
+        )
+        self.afternoon = join_waitlist(
+            create_patient("afternoon@example.com"), self.provider, preferred_times={"afternoon": True},
+        )
+        self.first = join_waitlist(create_patient("first@example.com"), self.provider)
+        self.second = join_waitlist(
+            create_patient("second@example.com"), self.provider, preferred_dates=[self.day.isoformat()],
+        )
+
+    def cancel(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.appointment.cancel()
+        return WaitListOffer.objects.get(status='PENDING')
+
+    def test_preferences_are_expanded(self):
+        """Test that saving an entry writes its preference rows."""
+        self.assertEqual(WaitListPreference.objects.filter(waitlist=self.second).get().date, self.day)
+
+    def test_cancellation_offers_oldest_matching_entry(self):
+        """Test that the oldest entry whose window fits gets the hold."""
+        offer = self.cancel()
+
+        self.assertEqual(offer.waitlist, self.first)
+
+    def test_offer_email_is_sent_by_the_worker(self):
+        """Test that cancelling only queues the offer and the command emails it once."""
+        offer = self.cancel()
+        self.assertEqual(mail.outbox, [])
+
+        call_command("send_waitlist_offers", stdout=StringIO())
+        call_command("send_waitlist_offers", stdout=StringIO())
+
+        self.assertEqual([message.to for message in mail.outbox], [["first@example.com"]])
+        offer.refresh_from_db()
+        self.assertIsNotNone(offer.notified_at)
+
+    def test_hold_blocks_other_patients(self):
+        """Test that a held slot cannot be booked by someone else."""
+        self.cancel()
+
+        with self.assertRaises(BookingConflict):
+            book_appointment(
+                patient=self.booked_patient,
+                doctor=self.provider,
+                date=self.day,
+                start_time=time(9, 0),
+                end_time=time(9, 30),
+                reason_for_visit="Checkup",
+            )
+
+    def test_decline_moves_to_next_entry(self):
+        """Test that declining passes the slot down the line."""
+        offer = decline_offer(self.cancel())
+
+        self.assertEqual(offer.waitlist, self.second)
+
+    def test_accept_books_and_closes_entry(self):
+        """Test that accepting books the slot for the waiting patient."""
+        appointment = accept_offer(self.cancel())
+
+        self.assertEqual(appointment.patient, self.first.patient)
+        self.first.refresh_from_db()
+        self.assertFalse(self.first.is_active)
+
+    def test_new_office_hours_offer_slots(self):
+        """Test that opening hours offers their slots to waiting patients."""
+        with self.captureOnCommitCallbacks(execute=True):
+            OfficeHours.objects.create(
+                doctor=self.provider,
+                day_of_week=self.day.weekday(),
+                start_time=time(13, 0),
+                end_time=time(14, 0),
+                slot_duration=30,
+            )
+
+        offers = WaitListOffer.objects.filter(status='PENDING').order_by('pk')
+        self.assertEqual([offer.waitlist for offer in offers[:2]], [self.afternoon, self.first])
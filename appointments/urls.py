@@ -7,6 +7,8 @@ urlpatterns = [
     path('appointments/', views.AppointmentsView.as_view(), name='appointments'),
     path('doctors/', views.FindDoctorView.as_view(), name='doctors'),
     path('manage/appointments/', views.ManageAppointmentsView.as_view(), name='manage_schedule'),
+    path('appointments/calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+    path('appointments/calendar/regenerate/', views.regenerate_calendar_feed, name='regenerate_calendar_feed'),
     # path('manage/appointments/<int:appointment_id>/', views.ManageAppointmentDetailView.as_view(), name='manage_appointment_detail'),
     # path('book/appointment/<int:doctor_id>/', views.BookAppointmentView.as_view(), name='book_appointment'),
     # path('cancel/appointment/<int:appointment_id>/', views.CancelAppointmentView.as_view(), name='cancel_appointment'),
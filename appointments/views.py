@@ -1,6 +1,14 @@
 from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET, require_POST
+
+from accounts.models import User
+from appointments.ics import feed_owner, feed_url, feed_version, rotate_feed, stream_feed
 
 
 @method_decorator(login_required, name='dispatch')
@@ -24,6 +32,7 @@ class AppointmentsView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["user"] = self.request.user
+        context["calendar_feed_url"] = feed_url(self.request, self.request.user)
         return context
 
 
@@ -37,3 +46,39 @@ class ManageAppointmentsView(TemplateView):
         context = super().get_context_data(**kwargs)
         context["user"] = self.request.user
         return context
+
+
+@require_GET
+def calendar_feed(request, token):
+    """Serve a user's appointments and events as an iCalendar feed.
+
+    The signed token stands in for a login so calendar apps can subscribe;
+    tokens from before the user last regenerated the link are refused.
+    Unchanged feeds are answered with 304 from the version aggregate alone.
+    """
+    owner = feed_owner(token)
+    if owner is None:
+        raise Http404
+    user_id, version = owner
+    if not User.objects.filter(pk=user_id, is_active=True, calendar_feed_version=version).exists():
+        raise Http404
+
+    etag, last_modified = feed_version(user_id)
+    last_modified = last_modified and int(last_modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = StreamingHttpResponse(stream_feed(user_id), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="urbanmd.ics"'
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+    return response
+
+
+@require_POST
+@login_required
+def regenerate_calendar_feed(request):
+    """Replace the user's calendar feed link, revoking the old one."""
+    rotate_feed(request.user)
+    return redirect('appointments:appointments')
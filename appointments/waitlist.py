@@ -0,0 +1,313 @@
+"""
+Waitlist matching.
+
+Each WaitList entry's ``preferred_dates`` and ``preferred_times`` are
+expanded into WaitListPreference rows, so finding who wants a freed slot is
+an indexed lookup on ``(doctor, date, start_time)`` rather than a scan of
+JSON on every waiting patient. Matches are offered first come, first
+served: the oldest fitting entry gets a WaitListOffer that holds the slot
+for ``WAITLIST_OFFER_HOLD``; if it expires or is declined the slot moves on
+to the next entry.
+
+Offers are only recorded where the slot is freed. Patients are emailed by
+``dispatch_offer_notifications`` (the ``send_waitlist_offers`` command),
+which claims unsent offers with ``SKIP LOCKED`` like reminder dispatch, so
+cancelling never waits on mail delivery.
+"""
+import logging
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from appointments.availability import busy_by_provider_day, dates_on_weekday, day_availability, slot_grid
+from appointments.booking import BookingConflict, book_appointment
+from appointments.models import Appointment, WaitList, WaitListOffer, WaitListPreference
+from email_campaign.functions import send_styled_email
+
+logger = logging.getLogger(__name__)
+
+# Windows for the named periods accepted in WaitList.preferred_times
+PERIODS = {
+    'morning': (time(0, 0), time(12, 0)),
+    'afternoon': (time(12, 0), time(17, 0)),
+    'evening': (time(17, 0), time.max),
+}
+WHOLE_DAY = (time(0, 0), time.max)
+
+
+def _parse_window(name, value):
+    if isinstance(value, dict):
+        try:
+            return time.fromisoformat(value['start']), time.fromisoformat(value['end'])
+        except (KeyError, TypeError, ValueError):
+            return None
+    return PERIODS.get(str(name).lower())
+
+
+def expand_preferences(preferred_dates, preferred_times):
+    """Return the ``(date, start_time, end_time)`` windows an entry accepts.
+
+    ``preferred_dates`` is a list of ISO dates; ``preferred_times`` maps
+    period names (morning, afternoon, evening) to a flag or to a
+    ``{'start', 'end'}`` range, or is a list of period names. Missing or
+    empty preferences mean any date (``None``) and the whole day.
+    """
+    dates = set()
+    for value in preferred_dates or ():
+        try:
+            dates.add(date.fromisoformat(str(value)))
+        except ValueError:
+            continue
+
+    if isinstance(preferred_times, dict):
+        named = [(name, value) for name, value in preferred_times.items() if value]
+    else:
+        named = [(name, True) for name in preferred_times or ()]
+    windows = {window for window in (_parse_window(name, value) for name, value in named) if window}
+
+    return [
+        (day, start_time, end_time)
+        for day in sorted(dates) or [None]
+        for start_time, end_time in sorted(windows) or [WHOLE_DAY]
+    ]
+
+
+def sync_preferences(entry):
+    """Rewrite the WaitListPreference rows of ``entry``."""
+    with transaction.atomic():
+        WaitListPreference.objects.filter(waitlist=entry).delete()
+        if not entry.is_active:
+            return
+        WaitListPreference.objects.bulk_create([
+            WaitListPreference(
+                waitlist=entry,
+                doctor_id=entry.doctor_id,
+                date=day,
+                start_time=start_time,
+                end_time=end_time,
+            )
+            for day, start_time, end_time in expand_preferences(entry.preferred_dates, entry.preferred_times)
+        ])
+
+
+def matching_entries(doctor_id, day, start_time, end_time):
+    """Active entries that accept the slot and have no pending offer, oldest first.
+
+    Entries that were already offered this slot are skipped.
+    """
+    fits = WaitListPreference.objects.filter(
+        Q(date=day) | Q(date__isnull=True),
+        waitlist=OuterRef('pk'),
+        doctor_id=doctor_id,
+        start_time__lte=start_time,
+        end_time__gte=end_time,
+    )
+    already_offered = WaitListOffer.objects.filter(
+        Q(status='PENDING') | Q(date=day, start_time=start_time),
+        waitlist=OuterRef('pk'),
+    )
+    return WaitList.objects.filter(
+        Exists(fits),
+        doctor_id=doctor_id,
+        is_active=True,
+    ).exclude(
+        Exists(already_offered),
+    ).order_by('created_at', 'pk')
+
+
+def _hold(entry, day, start_time, end_time, location_id, now):
+    """Create a pending offer for ``entry``, queued for notification."""
+    try:
+        with transaction.atomic():
+            return WaitListOffer.objects.create(
+                waitlist=entry,
+                doctor_id=entry.doctor_id,
+                location_id=location_id,
+                date=day,
+                start_time=start_time,
+                end_time=end_time,
+                expires_at=now + settings.WAITLIST_OFFER_HOLD,
+            )
+    except IntegrityError:
+        # Another process is already holding this slot
+        return None
+
+
+def offer_slot(doctor_id, day, start_time, end_time, location_id=None, now=None):
+    """Hold a freed slot for the first waiting patient it suits.
+
+    Returns the WaitListOffer, or None when the slot is in the past, is
+    taken or held, or nobody is waiting for it.
+    """
+    now = now or timezone.now()
+    if day < now.date():
+        return None
+
+    taken = Appointment.objects.filter(
+        doctor_id=doctor_id,
+        date=day,
+        status__in=Appointment.ACTIVE_STATUSES,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if taken.exists() or WaitListOffer.objects.holding(doctor_id, day, start_time, end_time, now).exists():
+        return None
+
+    entry = matching_entries(doctor_id, day, start_time, end_time).select_related('patient', 'doctor__user').first()
+    if entry is None:
+        return None
+    return _hold(entry, day, start_time, end_time, location_id, now)
+
+
+def offer_office_hours(office_hours, today=None):
+    """Offer the free slots of new or changed office hours to waiting patients.
+
+    The doctor's waitlist preferences are loaded once and matched against
+    every free slot in the booking window in memory, oldest entry first.
+    Returns the offers made.
+    """
+    now = timezone.now()
+    today = today or now.date()
+    preferences = list(
+        WaitListPreference.objects.filter(
+            doctor_id=office_hours.doctor_id,
+            waitlist__is_active=True,
+        ).exclude(
+            waitlist__offers__status='PENDING',
+        ).select_related(
+            'waitlist__patient', 'waitlist__doctor__user',
+        ).order_by('waitlist__created_at', 'waitlist_id')
+    )
+    if not preferences or not office_hours.is_active:
+        return []
+
+    end = today + timedelta(days=office_hours.doctor.advance_booking_days)
+    busy_by_day = busy_by_provider_day([office_hours.doctor_id], today, end)[office_hours.doctor_id]
+    waiting = {preference.waitlist_id for preference in preferences}
+    offers = []
+
+    for day in dates_on_weekday(office_hours.day_of_week, today, end):
+        free = day_availability(office_hours, day, busy_by_day[day], now)
+        if not free:
+            continue
+        for start_time, end_time in slot_grid(office_hours, day):
+            if not free.covers(start_time, end_time):
+                continue
+            preference = next(
+                (
+                    preference for preference in preferences
+                    if preference.waitlist_id in waiting
+                    and (preference.date is None or preference.date == day)
+                    and preference.start_time <= start_time
+                    and preference.end_time >= end_time
+                ),
+                None,
+            )
+            if preference is None:
+                continue
+            offer = _hold(preference.waitlist, day, start_time, end_time, office_hours.location_id, now)
+            if offer:
+                offers.append(offer)
+                waiting.discard(preference.waitlist_id)
+                if not waiting:
+                    return offers
+    return offers
+
+
+def accept_offer(offer):
+    """Book the held slot for the offered patient and close their entry."""
+    entry = offer.waitlist
+    with transaction.atomic():
+        offer = WaitListOffer.objects.select_for_update().get(pk=offer.pk)
+        if offer.status != 'PENDING' or offer.expires_at <= timezone.now():
+            raise BookingConflict("This offer is no longer available.")
+        appointment = book_appointment(
+            patient=entry.patient,
+            doctor_id=offer.doctor_id,
+            location_id=offer.location_id,
+            date=offer.date,
+            start_time=offer.start_time,
+            end_time=offer.end_time,
+            appointment_type=entry.appointment_type,
+            reason_for_visit=entry.reason_for_visit,
+        )
+        offer.status = 'ACCEPTED'
+        offer.save(update_fields=['status'])
+        entry.deactivate()
+    return appointment
+
+
+def decline_offer(offer):
+    """Release the hold and offer the slot to the next patient in line."""
+    offer.status = 'DECLINED'
+    offer.save(update_fields=['status'])
+    return offer_slot(offer.doctor_id, offer.date, offer.start_time, offer.end_time, offer.location_id)
+
+
+def expire_offers(now=None, batch_size=500):
+    """Expire lapsed holds and pass their slots on; returns how many expired."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            WaitListOffer.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', expires_at__lte=now)
+            .order_by('expires_at')[:batch_size]
+        )
+        WaitListOffer.objects.filter(pk__in=[offer.pk for offer in expired]).update(status='EXPIRED')
+
+    for offer in expired:
+        offer_slot(offer.doctor_id, offer.date, offer.start_time, offer.end_time, offer.location_id, now)
+    return len(expired)
+
+
+def dispatch_offer_notifications(batch_size=100, now=None, exclude=()):
+    """Claim, send and mark one batch of unsent offer notifications.
+
+    Offers that were taken, declined or lapsed before being sent are left
+    alone. Returns ``(sent_ids, failed_ids)``; failures stay unsent so the
+    next run retries them, and callers can pass them back as ``exclude``.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        batch = list(
+            WaitListOffer.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(status='PENDING', notified_at__isnull=True, expires_at__gt=now)
+            .exclude(pk__in=exclude)
+            .select_related('waitlist__patient', 'waitlist__doctor__user')
+            .order_by('created_at')[:batch_size]
+        )
+
+        sent, failed = [], []
+        for offer in batch:
+            try:
+                offer.waitlist.notify_availability(offer)
+            except Exception:
+                logger.exception("Failed to notify waitlist entry %s", offer.waitlist_id)
+                failed.append(offer.pk)
+            else:
+                sent.append(offer.pk)
+
+        if sent:
+            WaitListOffer.objects.filter(pk__in=sent).update(notified_at=timezone.now())
+    return sent, failed
+
+
+def send_offer_notification(entry, offer):
+    """Email the patient that a slot is being held for them."""
+    patient = entry.patient
+    send_styled_email(
+        subject="An appointment time you asked for is available",
+        context={
+            'first_name': patient.first_name or 'Valued Patient',
+            'doctor_name': entry.doctor.user.full_name,
+            'date': offer.date,
+            'start_time': offer.start_time,
+            'expires_at': offer.expires_at,
+            'portal_url': settings.PORTAL_URL,
+        },
+        recipient_list=[patient.email],
+        template='waitlist_offer.html',
+    )
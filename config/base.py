@@ -21,6 +21,8 @@ CSRF_TRUSTED_ORIGINS = os.getenv("DJANGO_CSRF_TRUSTED_ORIGINS", "").split(",") i
 
 
 INSTALLED_APPS = [
+    # serves ASGI (websockets) from runserver; must precede staticfiles
+    'daphne',
     'accounts',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -28,6 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # third party apps
     'sslserver',
@@ -35,6 +38,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "drf_spectacular",
     "rest_framework_simplejwt",
+    "channels",
 
     # user defined apps
     'core',
@@ -87,6 +91,19 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'urbanmd.wsgi.application'
+ASGI_APPLICATION = 'urbanmd.asgi.application'
+
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -146,7 +163,7 @@ AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.api.authentication.CachedJWTAuthentication',
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
@@ -156,6 +173,7 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.api.serializers.ClaimsTokenObtainPairSerializer",
 }
 
 CLOUDINARY_STORAGE = {
@@ -173,4 +191,23 @@ EMAIL_HOST_USER = 'hello@urbanmdhealthnetwork.com'
 EMAIL_HOST_PASSWORD = config("GODADDY_EMAIL_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
-PORTAL_URL = "https://www.urbanmdhealthnetwork.com"
\ No newline at end of file
+# Delivery backend per AppointmentReminder.reminder_type
+APPOINTMENT_REMINDER_BACKENDS = {
+    'EMAIL': 'appointments.reminders.EmailReminderBackend',
+    'SMS': 'appointments.reminders.LoggingReminderBackend',
+    'PUSH': 'appointments.reminders.LoggingReminderBackend',
+}
+
+# Built with `manage.py build_zip_centroids` from the Census ZCTA gazetteer
+ZIP_CENTROIDS_PATH = BASE_DIR / "accounts" / "data" / "zip_centroids.bin"
+
+PORTAL_URL = "https://www.urbanmdhealthnetwork.com"
+
+# How long a booking API Idempotency-Key is remembered
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+# How long a freed slot is held for the waitlisted patient it was offered to
+WAITLIST_OFFER_HOLD = timedelta(minutes=30)
+
+# How long a cart item keeps its units out of stock after its last change
+CART_HOLD = timedelta(minutes=30)
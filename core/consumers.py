@@ -0,0 +1,43 @@
+"""
+WebSocket consumers for the core app.
+"""
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from core.stats import ADMIN_GROUP, dashboard_group, dashboard_stats
+
+
+class DashboardConsumer(AsyncJsonWebsocketConsumer):
+    """Push dashboard stats to a signed-in user's home page.
+
+    The full stats are sent on connect; afterwards every ``stats.changed``
+    message (sent by core.stats when cached stats are invalidated) re-reads
+    them and sends only the values that differ.
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+
+        self.stats_groups = [dashboard_group(self.user.pk)]
+        if self.user.user_type == 'ADMIN':
+            self.stats_groups.append(ADMIN_GROUP)
+        for group in self.stats_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+
+        self.stats = await database_sync_to_async(dashboard_stats)(self.user)
+        await self.send_json({'type': 'stats', 'stats': self.stats})
+
+    async def disconnect(self, code):
+        for group in getattr(self, 'stats_groups', []):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def stats_changed(self, event):
+        stats = await database_sync_to_async(dashboard_stats)(self.user)
+        changed = {key: value for key, value in stats.items() if self.stats.get(key) != value}
+        self.stats = stats
+        if changed:
+            await self.send_json({'type': 'stats', 'stats': changed})
@@ -0,0 +1,164 @@
+"""
+Platform-wide counters for the admin dashboard.
+
+Every counted row contributes a set of ``(counter, day)`` keys, its
+"state". Signal handlers (see core.signals) compare a row's state before and
+after a change and apply the difference with ``UPDATE ... SET value = value
++ n``, so the admin dashboard reads all its totals in one query instead of
+counting whole tables. Writes that skip signals (``bulk_create``,
+``QuerySet.update``) are corrected by ``rebuild_counters``, which the
+``rebuild_platform_counters`` command runs on a schedule.
+"""
+from collections import Counter
+
+from django.apps import apps as django_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import PlatformCounter
+
+TOTALS = (
+    'users', 'patients', 'providers', 'organizations',
+    'pending_provider_verifications', 'pending_org_verifications',
+)
+DAILY = ('appointments', 'new_users')
+
+
+def user_state(user):
+    state = [('new_users', timezone.localdate(user.date_joined))]
+    if user.is_active:
+        state.append(('users', None))
+        if user.user_type == 'PATIENT':
+            state.append(('patients', None))
+    return state
+
+
+def provider_state(profile):
+    state = []
+    if profile.user.is_active:
+        state.append(('providers', None))
+    if not profile.is_verified:
+        state.append(('pending_provider_verifications', None))
+    return state
+
+
+def organization_state(profile):
+    state = []
+    if profile.user.is_active:
+        state.append(('organizations', None))
+    if not profile.is_verified:
+        state.append(('pending_org_verifications', None))
+    return state
+
+
+def appointment_state(values):
+    """State of an appointment from a mapping of its field values."""
+    return [('appointments', values['date'])] if values.get('date') else []
+
+
+def state_change(before, after):
+    """Return the counter deltas turning ``before`` into ``after``."""
+    deltas = Counter(after)
+    deltas.subtract(before)
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def _increment(name, day, delta):
+    counters = PlatformCounter.objects.filter(name=name, day=day)
+    if counters.update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            PlatformCounter.objects.create(name=name, day=day, value=delta)
+    except IntegrityError:
+        # Created concurrently
+        counters.update(value=F('value') + delta)
+
+
+def apply_deltas(deltas):
+    """Add ``{(name, day): delta}`` to the counters, creating missing rows."""
+    for (name, day), delta in deltas.items():
+        if delta:
+            _increment(name, day, delta)
+
+
+def count_appointments(appointments):
+    """Count appointments written without signals, e.g. by ``bulk_create``."""
+    apply_deltas(Counter(
+        key for appointment in appointments for key in appointment_state({'date': appointment.date})
+    ))
+
+
+def platform_counters(today=None):
+    """Return the totals and ``today``'s daily counters in one query."""
+    today = today or timezone.localdate()
+    values = dict.fromkeys(TOTALS + DAILY, 0)
+    rows = PlatformCounter.objects.filter(
+        Q(day__isnull=True, name__in=TOTALS) | Q(day=today, name__in=DAILY)
+    ).values_list('name', 'value')
+    values.update(rows)
+    return values
+
+
+def compute_counters(apps=django_apps):
+    """Count every counter from the source tables.
+
+    ``apps`` lets data migrations pass their historical registry.
+    """
+    User = apps.get_model('accounts', 'User')
+    IndividualProviderProfile = apps.get_model('accounts', 'IndividualProviderProfile')
+    OrganizationProfile = apps.get_model('accounts', 'OrganizationProfile')
+    Appointment = apps.get_model('appointments', 'Appointment')
+
+    totals = User.objects.aggregate(
+        users=Count('pk', filter=Q(is_active=True)),
+        patients=Count('pk', filter=Q(is_active=True, user_type='PATIENT')),
+    )
+    totals.update(IndividualProviderProfile.objects.aggregate(
+        providers=Count('pk', filter=Q(user__is_active=True)),
+        pending_provider_verifications=Count('pk', filter=Q(is_verified=False)),
+    ))
+    totals.update(OrganizationProfile.objects.aggregate(
+        organizations=Count('pk', filter=Q(user__is_active=True)),
+        pending_org_verifications=Count('pk', filter=Q(is_verified=False)),
+    ))
+
+    counters = {(name, None): value for name, value in totals.items()}
+    counters.update(
+        (('appointments', day), value)
+        for day, value in Appointment.objects.order_by().values_list('date').annotate(Count('pk'))
+    )
+    counters.update(
+        (('new_users', day), value)
+        for day, value in User.objects.order_by().annotate(
+            day=TruncDate('date_joined'),
+        ).values_list('day').annotate(Count('pk'))
+    )
+    return counters
+
+
+def rebuild_counters():
+    """Recount everything and replace the stored counters.
+
+    Returns ``{(name, day): (stored, counted)}`` for the counters that had
+    drifted.
+    """
+    with transaction.atomic():
+        # Hold off signal increments until the new rows are in place
+        stored = {
+            (name, day): value
+            for name, day, value in PlatformCounter.objects.select_for_update().values_list('name', 'day', 'value')
+        }
+        counted = compute_counters()
+        PlatformCounter.objects.all().delete()
+        PlatformCounter.objects.bulk_create(
+            [PlatformCounter(name=name, day=day, value=value) for (name, day), value in counted.items()],
+            batch_size=1000,
+        )
+    return {
+        key: (stored.get(key, 0), counted.get(key, 0))
+        for key in stored.keys() | counted.keys()
+        if stored.get(key, 0) != counted.get(key, 0)
+    }
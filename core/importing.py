@@ -0,0 +1,74 @@
+"""
+Row readers shared by the bulk import commands.
+"""
+import csv
+import json
+
+
+class RowError(ValueError):
+    """A row that cannot be imported."""
+
+
+class RejectLog:
+    """Rejected rows, streamed out as NDJSON instead of kept in memory.
+
+    Only the number of rejects and the first ``sample_size`` of them (for
+    printing) are held, however many rows an import rejects.
+    """
+
+    def __init__(self, stream=None, sample_size=20):
+        self.stream = stream
+        self.sample_size = sample_size
+        self.sample = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, line_number, row, reason):
+        self.count += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append({'line': line_number, 'error': reason})
+        if self.stream is not None:
+            row = {key: value for key, value in row.items() if key != '_error'}
+            self.stream.write(json.dumps({'line': line_number, 'error': reason, 'row': row}, default=str) + "\n")
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, row_dict)`` from a CSV or NDJSON stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield line_number, {'_error': f"Invalid JSON: {error}"}
+            continue
+        yield line_number, row if isinstance(row, dict) else {'_error': "Expected a JSON object"}
+
+
+def row_value(row, name, required=True):
+    """Return ``row[name]`` stripped, raising RowError if required and blank."""
+    value = row.get(name)
+    if isinstance(value, str):
+        value = value.strip()
+    if required and value in (None, ''):
+        raise RowError(f"Missing {name}")
+    return value
+
+
+def parse_value(row, parser, name, required=True):
+    """Return ``parser(row[name])``, or None if blank and not required."""
+    value = row_value(row, name, required)
+    if value in (None, ''):
+        return None
+    try:
+        return parser(str(value))
+    except ValueError:
+        raise RowError(f"Invalid {name}: {value!r}")
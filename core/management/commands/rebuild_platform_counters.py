@@ -0,0 +1,26 @@
+"""
+Django command to rebuild the platform counters from the source tables.
+"""
+from django.core.management.base import BaseCommand
+
+from core.counters import rebuild_counters
+from core.stats import invalidate_stats
+
+
+class Command(BaseCommand):
+    """Recount the PlatformCounter rollup and report any drift.
+
+    Meant to run from cron, e.g. nightly, to correct changes made without
+    signals (``QuerySet.update``, raw SQL).
+    """
+
+    help = "Rebuild the platform-wide counters used by the admin dashboard"
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        drift = rebuild_counters()
+        invalidate_stats([], admin=True)
+
+        for (name, day), (stored, counted) in sorted(drift.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            self.stdout.write(f"  {name}{f' {day}' if day else ''}: {stored} -> {counted}")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt platform counters ({len(drift)} corrected)."))
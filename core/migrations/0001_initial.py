@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-17 15:20
+
+from django.db import migrations, models
+
+
+def build_counters(apps, schema_editor):
+    from core.counters import compute_counters
+
+    PlatformCounter = apps.get_model('core', 'PlatformCounter')
+    PlatformCounter.objects.bulk_create(
+        [PlatformCounter(name=name, day=day, value=value) for (name, day), value in compute_counters(apps).items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0003_alter_providerlocation_location'),
+        ('appointments', '0006_waitlistpreference_waitlistoffer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('name',), name='platform_counter_total_unique'),
+                    models.UniqueConstraint(fields=('name', 'day'), name='platform_counter_daily_unique'),
+                ],
+            },
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
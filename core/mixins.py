@@ -0,0 +1,36 @@
+"""
+Model mixins shared across apps.
+"""
+from django.db import models
+
+
+class LoadedValuesMixin:
+    """Remember the field values an instance was loaded or last saved with.
+
+    ``_loaded_values`` maps attnames to stored values (file fields by name)
+    so ``save()`` overrides and signal handlers can tell what changed
+    without reading the row again. Deferred and generated fields are left
+    out rather than fetched.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _current_values(self):
+        deferred = self.get_deferred_fields()
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.generated or field.attname in deferred:
+                # Reading it would refresh the field from the database
+                continue
+            value = getattr(self, field.attname)
+            values[field.attname] = value.name if isinstance(field, models.FileField) else value
+        return values
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The saved state is what the next save's signal handlers compare to
+        self._loaded_values = self._current_values()
@@ -0,0 +1 @@
+from .counters import *
@@ -0,0 +1,32 @@
+from django.db import models
+from django.db.models import Q
+
+
+class PlatformCounter(models.Model):
+    """A running platform-wide total read by the admin dashboard.
+
+    Totals have no ``day``; daily counters (appointments on a date, users
+    joined on a date) have one row per day. Rows are adjusted by signal
+    handlers as records change and rebuilt by ``rebuild_platform_counters``
+    (see core.counters).
+    """
+
+    name = models.CharField(max_length=50)
+    day = models.DateField(null=True, blank=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name'],
+                condition=Q(day__isnull=True),
+                name='platform_counter_total_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['name', 'day'],
+                name='platform_counter_daily_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name}{f' ({self.day})' if self.day else ''}: {self.value}"
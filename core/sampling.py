@@ -0,0 +1,72 @@
+"""
+Random sampling for "featured" widgets.
+
+``order_by('?')`` sorts the whole filtered table on every request. Instead,
+a pool of candidate primary keys is drawn once and cached for a few minutes;
+each request picks from the pool in memory and loads only the rows it shows
+with a primary key lookup, so the per-request cost does not grow with the
+table. New rows join the rotation when the pool is next refreshed.
+
+A refresh does not sort the table either: it reads up to ``POOL_SIZE``
+consecutive matching keys from a random point in the (integer) primary key
+range, wrapping around at the end, which costs a min/max lookup and index
+range scans. Pools of larger tables are therefore a random window rather
+than a uniform subset, and move each time they are redrawn.
+"""
+import random
+
+from django.core.cache import cache
+from django.db.models import Max, Min
+
+# How long a candidate pool is reused before it is drawn again
+POOL_TIMEOUT = 600
+# Largest number of candidates kept per pool
+POOL_SIZE = 1000
+
+
+def _pool_cache_key(name):
+    return f"sample-pool:{name}"
+
+
+def draw_pool(queryset, size=POOL_SIZE):
+    """Return up to ``size`` primary keys of ``queryset`` from a random point."""
+    keys = queryset.order_by('pk').values_list('pk', flat=True)
+    bounds = queryset.order_by().aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    start = random.randint(bounds['low'], bounds['high'])
+    pool = list(keys.filter(pk__gte=start)[:size])
+    if len(pool) < size:
+        pool += keys.filter(pk__lt=start)[:size - len(pool)]
+    return pool
+
+
+def sample_pool(queryset, name, timeout=POOL_TIMEOUT, size=POOL_SIZE):
+    """Return the cached list of candidate primary keys for pool ``name``."""
+    key = _pool_cache_key(name)
+    pool = cache.get(key)
+    if pool is None:
+        # Only runs when the pool expires
+        pool = draw_pool(queryset, size)
+        cache.set(key, pool, timeout)
+    return pool
+
+
+def clear_pool(name):
+    """Drop pool ``name`` so the next sample draws a fresh one."""
+    cache.delete(_pool_cache_key(name))
+
+
+def random_sample(queryset, k, name, timeout=POOL_TIMEOUT, size=POOL_SIZE):
+    """Return up to ``k`` random rows of ``queryset`` in random order.
+
+    ``name`` identifies the pool and must be unique per distinct queryset.
+    Rows that stopped matching ``queryset`` since the pool was drawn are
+    skipped, so fewer than ``k`` rows may come back until it is refreshed.
+    """
+    pool = sample_pool(queryset, name, timeout, size)
+    picked = random.sample(pool, min(k, len(pool)))
+    if not picked:
+        return []
+    rows = queryset.in_bulk(picked)
+    return [rows[pk] for pk in picked if pk in rows]
@@ -0,0 +1,185 @@
+"""
+Signal handlers for the core app.
+
+Platform counters (see core.counters) are adjusted in the same transaction
+as the row that changed them. Cached dashboard stats (see core.stats) are
+dropped for every user whose numbers a saved or deleted row can change;
+invalidation waits for the transaction to commit so a concurrent poll cannot
+cache the old counts again.
+"""
+from functools import partial
+from types import SimpleNamespace
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import IndividualProviderProfile, OrganizationProfile, ProviderAffiliation, ProviderLocation, User
+from appointments.models import Appointment
+from core.counters import (
+    appointment_state, apply_deltas, organization_state, provider_state, state_change, user_state,
+)
+from core.stats import invalidate_stats
+
+# Counted model: (state function, fields the state depends on)
+COUNTED_MODELS = {
+    User: (user_state, {'is_active', 'user_type', 'date_joined'}),
+    IndividualProviderProfile: (provider_state, {'is_verified', 'user', 'user_id'}),
+    OrganizationProfile: (organization_state, {'is_verified', 'user', 'user_id'}),
+}
+
+
+def _organization_users(provider_ids):
+    return OrganizationProfile.objects.filter(
+        individual_provider_affiliations__individual_provider_id__in=provider_ids,
+    ).values_list('user_id', flat=True).distinct()
+
+
+def _invalidate_appointment(patient_ids, doctor_ids):
+    doctor_users = IndividualProviderProfile.objects.filter(pk__in=doctor_ids).values_list('user_id', flat=True)
+    invalidate_stats(
+        [('PATIENT', user_id) for user_id in patient_ids]
+        + [('INDIVIDUAL_PROVIDER', user_id) for user_id in doctor_users]
+        + [('ORGANIZATION', user_id) for user_id in _organization_users(doctor_ids)],
+        admin=True,
+    )
+
+
+def _invalidate_organization(organization_id, admin=False):
+    user_ids = OrganizationProfile.objects.filter(pk=organization_id).values_list('user_id', flat=True)
+    invalidate_stats([('ORGANIZATION', user_id) for user_id in user_ids], admin=admin)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def appointment_stats_changed(sender, instance, **kwargs):
+    """Invalidate the patient's, the provider's, their organizations' and admin stats."""
+    loaded = getattr(instance, '_loaded_values', {})
+    patient_ids = {instance.patient_id, loaded.get('patient_id')} - {None}
+    doctor_ids = {instance.doctor_id, loaded.get('doctor_id')} - {None}
+    transaction.on_commit(partial(_invalidate_appointment, patient_ids, doctor_ids))
+
+
+@receiver(post_save, sender=ProviderAffiliation)
+@receiver(post_delete, sender=ProviderAffiliation)
+def affiliation_stats_changed(sender, instance, **kwargs):
+    """An affiliation changes which providers count towards the organization."""
+    transaction.on_commit(partial(_invalidate_organization, instance.organization_id))
+
+
+@receiver(post_save, sender=ProviderLocation)
+@receiver(post_delete, sender=ProviderLocation)
+def location_stats_changed(sender, instance, **kwargs):
+    """Organization stats count the active locations."""
+    if instance.organization_id:
+        transaction.on_commit(partial(_invalidate_organization, instance.organization_id))
+
+
+@receiver(post_save, sender=OrganizationProfile)
+@receiver(post_delete, sender=OrganizationProfile)
+def organization_stats_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(
+        invalidate_stats, [('ORGANIZATION', instance.user_id)], admin=True,
+    ))
+
+
+@receiver(post_save, sender=IndividualProviderProfile)
+@receiver(post_delete, sender=IndividualProviderProfile)
+def provider_stats_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(
+        invalidate_stats, [('INDIVIDUAL_PROVIDER', instance.user_id)], admin=True,
+    ))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_stats_changed(sender, instance, **kwargs):
+    """Admin stats count users by type and activity."""
+    transaction.on_commit(partial(
+        invalidate_stats, [(instance.user_type, instance.pk)], admin=True,
+    ))
+
+
+USER_STATE_FIELDS = ('is_active', 'user_type', 'date_joined')
+
+
+def _loaded_for_user(profile):
+    loaded = getattr(profile, '_loaded_values', {})
+    return 'is_verified' in loaded and loaded.get('user_id') == profile.user_id
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=IndividualProviderProfile)
+@receiver(pre_save, sender=OrganizationProfile)
+def remember_counter_state(sender, instance, update_fields=None, **kwargs):
+    """Load what the stored row contributes to the counters before it changes."""
+    state, fields = COUNTED_MODELS[sender]
+    if update_fields is not None and not fields & set(update_fields):
+        # Saves like ``update_fields=['last_login']`` cannot move a counter
+        instance._counter_state = None
+    elif instance._state.adding:
+        instance._counter_state = []
+    elif sender is User and all(name in getattr(instance, '_loaded_values', {}) for name in USER_STATE_FIELDS):
+        # Users remember their loaded row, so the old state needs no query
+        previous = SimpleNamespace(**{name: instance._loaded_values[name] for name in USER_STATE_FIELDS})
+        instance._counter_state = state(previous)
+    elif sender is not User and _loaded_for_user(instance):
+        # Profiles remember their loaded row; only is_verified can differ
+        previous = SimpleNamespace(user=instance.user, is_verified=instance._loaded_values['is_verified'])
+        instance._counter_state = state(previous)
+    else:
+        previous = sender.objects.filter(pk=instance.pk)
+        if sender is not User:
+            previous = previous.select_related('user')
+        previous = previous.first()
+        instance._counter_state = state(previous) if previous else []
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=IndividualProviderProfile)
+@receiver(post_save, sender=OrganizationProfile)
+def count_saved(sender, instance, created, **kwargs):
+    before = getattr(instance, '_counter_state', None)
+    if before is None:
+        return
+    state, _ = COUNTED_MODELS[sender]
+    after = state(instance)
+    deltas = state_change(before, after)
+
+    was_active = ('users', None) in before
+    if sender is User and not created and was_active != instance.is_active:
+        # Provider and organization totals only count active users
+        sign = 1 if instance.is_active else -1
+        if IndividualProviderProfile.objects.filter(user=instance).exists():
+            deltas[('providers', None)] = sign
+        if OrganizationProfile.objects.filter(user=instance).exists():
+            deltas[('organizations', None)] = sign
+
+    apply_deltas(deltas)
+    instance._counter_state = after
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=IndividualProviderProfile)
+@receiver(post_delete, sender=OrganizationProfile)
+def count_deleted(sender, instance, **kwargs):
+    state, _ = COUNTED_MODELS[sender]
+    apply_deltas(state_change(state(instance), []))
+
+
+@receiver(post_save, sender=Appointment)
+def count_appointment_saved(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    if created:
+        before = []
+    elif 'date' in loaded:
+        before = appointment_state(loaded)
+    else:
+        # Previous date unknown; left to the periodic rebuild
+        return
+    apply_deltas(state_change(before, appointment_state({'date': instance.date})))
+
+
+@receiver(post_delete, sender=Appointment)
+def count_appointment_deleted(sender, instance, **kwargs):
+    apply_deltas(state_change(appointment_state({'date': instance.date}), []))
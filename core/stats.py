@@ -0,0 +1,179 @@
+"""
+Dashboard statistics with a per-user cache.
+
+Stats are cached under the user's id, role and the current date, and the
+entries are deleted by the signal handlers in core.signals whenever a row
+they count changes, so repeated dashboard reads are served from the cache.
+Connected dashboards are then told over the channel layer to pick up the
+new numbers (see core.consumers). Admin stats are platform-wide, shared by
+every admin and read from the PlatformCounter rollup (see core.counters).
+"""
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from accounts.models import IndividualProviderProfile, ProviderAffiliation, ProviderLocation
+from appointments.models import Appointment
+from core.counters import platform_counters
+
+logger = logging.getLogger(__name__)
+
+# Channel layer group of every connected admin dashboard (see core.consumers)
+ADMIN_GROUP = 'dashboard-admin'
+
+# Upper bound on staleness for anything the signals do not see
+STATS_TIMEOUT = 300
+
+
+def stats_cache_key(role, user_id=None, today=None):
+    """Cache key for a role's stats; ``user_id`` is ignored for admins."""
+    today = today or timezone.now().date()
+    owner = 'all' if role == 'ADMIN' else user_id
+    return f"dashboard-stats:{role}:{owner}:{today.isoformat()}"
+
+
+def dashboard_group(user_id):
+    """Channel layer group of ``user_id``'s connected dashboards."""
+    return f"dashboard-{user_id}"
+
+
+def patient_stats(user, today):
+    counts = Appointment.objects.filter(patient=user).aggregate(
+        total_appointments=Count('pk'),
+        upcoming_appointments_count=Count('pk', filter=Q(
+            date__gte=today,
+            status__in=['SCHEDULED', 'CONFIRMED'],
+        )),
+    )
+    return {
+        **counts,
+        'saved_doctors': 0,  # Placeholder - you might want to add a favorites model
+        'unread_messages': 0,  # Placeholder
+    }
+
+
+def provider_stats(user, today):
+    week_start = today - timedelta(days=today.weekday())
+    counts = Appointment.objects.filter(doctor__user=user).aggregate(
+        todays_appointments_count=Count('pk', filter=Q(
+            date=today,
+            status__in=['SCHEDULED', 'CONFIRMED', 'IN_PROGRESS'],
+        )),
+        weekly_appointments_count=Count('pk', filter=Q(
+            date__range=[week_start, week_start + timedelta(days=6)],
+            status__in=['SCHEDULED', 'CONFIRMED', 'COMPLETED'],
+        )),
+        total_patients=Count('patient', distinct=True),
+    )
+    return {
+        **counts,
+        'new_patients_this_month': 0,  # To be implemented
+        'monthly_revenue': 0,
+        'pending_payments': 0,
+        'rating': 4.8,  # Placeholder
+        'reviews_count': 125,  # Placeholder
+    }
+
+
+def organization_stats(user, today):
+    # Providers are picked by subquery so several affiliations with the same
+    # organization do not repeat their appointments in the join
+    affiliated = ProviderAffiliation.objects.filter(
+        organization__user=user,
+        is_active=True,
+    ).values('individual_provider')
+    counts = IndividualProviderProfile.objects.filter(pk__in=affiliated).aggregate(
+        total_providers=Count('pk', distinct=True),
+        todays_appointments=Count('doctor_appointments', filter=Q(
+            doctor_appointments__date=today,
+            doctor_appointments__status__in=['SCHEDULED', 'CONFIRMED'],
+        )),
+        monthly_appointments=Count('doctor_appointments', filter=Q(
+            doctor_appointments__date__gte=today.replace(day=1),
+            doctor_appointments__status__in=['SCHEDULED', 'CONFIRMED', 'COMPLETED'],
+        )),
+    )
+    return {
+        **counts,
+        'total_locations': ProviderLocation.objects.filter(
+            organization__user=user,
+            is_active=True
+        ).count(),
+        'monthly_revenue': 0,  # To be implemented
+        'patient_satisfaction': 4.6,  # Placeholder
+        'active_patients': 0,  # To be implemented
+        'new_patients_this_month': 0,  # To be implemented
+    }
+
+
+def admin_stats(user, today):
+    counters = platform_counters(today)
+    return {
+        'total_users': counters['users'],
+        'total_providers': counters['providers'],
+        'total_organizations': counters['organizations'],
+        'total_patients': counters['patients'],
+        'todays_appointments': counters['appointments'],
+        'new_users_today': counters['new_users'],
+        'pending_provider_verifications': counters['pending_provider_verifications'],
+        'pending_org_verifications': counters['pending_org_verifications'],
+        'system_health': 'Operational',  # Placeholder
+        'active_sessions': 0,  # To be implemented
+    }
+
+
+STATS_BY_ROLE = {
+    'PATIENT': patient_stats,
+    'INDIVIDUAL_PROVIDER': provider_stats,
+    'ORGANIZATION': organization_stats,
+    'ADMIN': admin_stats,
+}
+
+
+def dashboard_stats(user):
+    """Return the dashboard stats for ``user``'s role, from the cache if possible."""
+    compute = STATS_BY_ROLE.get(user.user_type)
+    if compute is None:
+        return {}
+    today = timezone.now().date()
+    return cache.get_or_set(
+        stats_cache_key(user.user_type, user.pk, today),
+        lambda: compute(user, today),
+        STATS_TIMEOUT,
+    )
+
+
+def invalidate_stats(entries, admin=False):
+    """Drop cached stats for ``(role, user_id)`` pairs, and admin stats if asked.
+
+    Connected dashboards of the affected users are told to refresh.
+    """
+    today = timezone.now().date()
+    keys = [stats_cache_key(role, user_id, today) for role, user_id in entries]
+    if admin:
+        keys.append(stats_cache_key('ADMIN', today=today))
+    if keys:
+        cache.delete_many(keys)
+        push_stats_changed({user_id for _, user_id in entries}, admin=admin)
+
+
+def push_stats_changed(user_ids, admin=False):
+    """Notify the dashboard consumers of ``user_ids`` (and admins) that stats changed."""
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    groups = [dashboard_group(user_id) for user_id in user_ids]
+    if admin:
+        groups.append(ADMIN_GROUP)
+    send = async_to_sync(layer.group_send)
+    for group in groups:
+        try:
+            send(group, {'type': 'stats.changed'})
+        except Exception:
+            # Dashboards still show fresh stats on the next page load
+            logger.exception("Failed to push dashboard stats to %s", group)
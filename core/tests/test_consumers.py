@@ -0,0 +1,80 @@
+"""
+Tests for the live dashboard WebSocket.
+"""
+from datetime import time
+
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from appointments.models import Appointment
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+from core.consumers import DashboardConsumer
+
+
+class DashboardConsumerTests(TransactionTestCase):
+    """Test that dashboards receive stat changes as they happen."""
+
+    def setUp(self):
+        cache.clear()
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(DashboardConsumer.as_asgi(), '/ws/dashboard/')
+        communicator.scope['user'] = user
+        return communicator
+
+    def book(self):
+        return Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=next_weekday(0),
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            reason_for_visit="Checkup",
+        )
+
+    async def test_anonymous_is_rejected(self):
+        """Test that only signed-in users can connect."""
+        connected, _ = await self.communicator(AnonymousUser()).connect()
+
+        self.assertFalse(connected)
+
+    async def test_sends_stats_on_connect(self):
+        """Test that the full stats are sent when the socket opens."""
+        communicator = self.communicator(self.patient)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        message = await communicator.receive_json_from()
+
+        self.assertEqual(message['type'], 'stats')
+        self.assertEqual(message['stats']['total_appointments'], 0)
+        await communicator.disconnect()
+
+    async def test_pushes_changed_values(self):
+        """Test that a booking pushes only the stats it changed."""
+        communicator = self.communicator(self.patient)
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await database_sync_to_async(self.book)()
+        message = await communicator.receive_json_from()
+
+        self.assertEqual(message['stats'], {'total_appointments': 1, 'upcoming_appointments_count': 1})
+        await communicator.disconnect()
+
+    async def test_other_users_are_not_notified(self):
+        """Test that changes are only pushed to the users they concern."""
+        other = await database_sync_to_async(create_patient)("other@example.com")
+        communicator = self.communicator(other)
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await database_sync_to_async(self.book)()
+
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
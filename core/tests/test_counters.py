@@ -0,0 +1,141 @@
+"""
+Tests for the platform counter rollup.
+"""
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import IndividualProviderProfile, OrganizationProfile, User
+from appointments.models import Appointment
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+from core.counters import compute_counters, platform_counters, rebuild_counters
+from core.models import PlatformCounter
+from core.stats import dashboard_stats
+
+
+class PlatformCounterTests(TestCase):
+    """Test incremental updates and rebuilds of the counters."""
+
+    def setUp(self):
+        cache.clear()
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+
+    def stored(self):
+        return {(counter.name, counter.day): counter.value for counter in PlatformCounter.objects.all()}
+
+    def assertMatchesSource(self):
+        expected = {key: value for key, value in compute_counters().items() if value}
+        self.assertEqual({key: value for key, value in self.stored().items() if value}, expected)
+
+    def test_new_users_are_counted(self):
+        """Test that creating users moves the totals and today's sign-ups."""
+        counters = platform_counters()
+
+        self.assertEqual(counters['users'], 2)
+        self.assertEqual(counters['patients'], 1)
+        self.assertEqual(counters['providers'], 1)
+        self.assertEqual(counters['pending_provider_verifications'], 1)
+        self.assertEqual(counters['new_users'], 2)
+
+    def test_deactivating_provider_user(self):
+        """Test that a deactivated user stops counting as a provider."""
+        user = self.provider.user
+        user.is_active = False
+        user.save()
+
+        counters = platform_counters()
+        self.assertEqual(counters['users'], 1)
+        self.assertEqual(counters['providers'], 0)
+        self.assertMatchesSource()
+
+    def test_verification(self):
+        """Test that verifying a profile clears it from the pending counts."""
+        org_user = User.objects.create_user(email="org@example.com", password="testpass123", user_type="ORGANIZATION")
+        organization = OrganizationProfile.objects.create(user=org_user, name="Clinic")
+        self.assertEqual(platform_counters()['pending_org_verifications'], 1)
+
+        organization.is_verified = True
+        organization.save()
+        self.provider.is_verified = True
+        self.provider.save()
+
+        counters = platform_counters()
+        self.assertEqual(counters['pending_org_verifications'], 0)
+        self.assertEqual(counters['pending_provider_verifications'], 0)
+        self.assertEqual(counters['organizations'], 1)
+        self.assertMatchesSource()
+
+    def test_appointments_by_day(self):
+        """Test that booking, rescheduling and deleting move the daily counts."""
+        day = next_weekday(0)
+        appointment = Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.provider,
+            date=day,
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+            reason_for_visit="Checkup",
+        )
+        self.assertEqual(platform_counters(day)['appointments'], 1)
+
+        appointment.date = day + timedelta(days=7)
+        appointment.save()
+        self.assertEqual(platform_counters(day)['appointments'], 0)
+        self.assertEqual(platform_counters(day + timedelta(days=7))['appointments'], 1)
+
+        appointment.delete()
+        self.assertEqual(platform_counters(day + timedelta(days=7))['appointments'], 0)
+        self.assertMatchesSource()
+
+    def test_untracked_save_skips_counters(self):
+        """Test that saves of uncounted fields skip the counters."""
+        self.patient.first_name = "Pat"
+
+        with self.assertNumQueries(1):
+            self.patient.save(update_fields=['first_name'])
+
+    def test_loaded_user_save_reads_no_previous_row(self):
+        """Test that a full save of a loaded user takes its old state from memory."""
+        patient = User.objects.get(pk=self.patient.pk)
+        patient.first_name = "Pat"
+
+        with self.assertNumQueries(1):
+            patient.save()
+
+        patient.is_active = False
+        patient.save()
+        self.assertEqual(platform_counters()['patients'], 0)
+        self.assertMatchesSource()
+
+    def test_rebuild_corrects_drift(self):
+        """Test that a rebuild fixes changes made without signals."""
+        IndividualProviderProfile.objects.update(is_verified=True)
+
+        drift = rebuild_counters()
+
+        self.assertEqual(drift, {('pending_provider_verifications', None): (1, 0)})
+        self.assertMatchesSource()
+
+    def test_rebuild_command(self):
+        """Test that the command reports what it corrected."""
+        PlatformCounter.objects.filter(name='users').update(value=40)
+        out = StringIO()
+
+        call_command('rebuild_platform_counters', stdout=out)
+
+        self.assertIn('users: 40 -> 2', out.getvalue())
+        self.assertEqual(platform_counters()['users'], 2)
+
+    def test_admin_stats_use_one_query(self):
+        """Test that uncached admin stats read the rollup only."""
+        admin = User.objects.create_user(email="admin@example.com", password="testpass123", user_type="ADMIN")
+
+        with self.assertNumQueries(1):
+            stats = dashboard_stats(admin)
+
+        self.assertEqual(stats['total_users'], 3)
+        self.assertEqual(stats['total_patients'], 1)
@@ -0,0 +1,68 @@
+"""
+Tests for cached random sampling.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import IndividualProviderProfile
+from appointments.tests.test_availability import create_provider
+from core.sampling import clear_pool, draw_pool, random_sample
+
+
+class RandomSampleTests(TestCase):
+    """Test sampling rows from a cached pool of ids."""
+
+    def setUp(self):
+        cache.clear()
+        self.providers = [create_provider(f"doc{i}@example.com") for i in range(6)]
+        self.queryset = IndividualProviderProfile.objects.select_related('user')
+
+    def test_returns_distinct_rows(self):
+        """Test that k distinct rows of the queryset are returned."""
+        rows = random_sample(self.queryset, 4, 'test')
+
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(len({row.pk for row in rows}), 4)
+
+    def test_small_table(self):
+        """Test that asking for more rows than exist returns them all."""
+        self.assertEqual(len(random_sample(self.queryset, 10, 'test')), 6)
+
+    def test_pool_is_cached(self):
+        """Test that later samples only load the picked rows."""
+        random_sample(self.queryset, 4, 'test')
+
+        with self.assertNumQueries(1):
+            random_sample(self.queryset, 4, 'test')
+
+    def test_rows_leaving_queryset_are_skipped(self):
+        """Test that rows no longer matching the filter are not returned."""
+        verified = IndividualProviderProfile.objects.filter(is_verified=True)
+        IndividualProviderProfile.objects.update(is_verified=True)
+        random_sample(verified, 6, 'verified')
+
+        IndividualProviderProfile.objects.filter(pk=self.providers[0].pk).update(is_verified=False)
+        rows = random_sample(verified, 6, 'verified')
+
+        self.assertNotIn(self.providers[0].pk, [row.pk for row in rows])
+        self.assertEqual(len(rows), 5)
+
+    def test_clear_pool(self):
+        """Test that clearing a pool picks up new rows."""
+        random_sample(self.queryset, 10, 'test')
+        create_provider("new@example.com")
+
+        clear_pool('test')
+
+        self.assertEqual(len(random_sample(self.queryset, 10, 'test')), 7)
+
+    def test_pool_is_drawn_without_sorting_randomly(self):
+        """Test that a refresh reads a wrapped key range instead of ORDER BY RANDOM()."""
+        with CaptureQueriesContext(connection) as queries:
+            pool = draw_pool(self.queryset, size=4)
+
+        self.assertEqual(len(set(pool)), 4)
+        self.assertTrue(set(pool) <= {provider.pk for provider in self.providers})
+        self.assertFalse(any('RANDOM()' in query['sql'].upper() for query in queries))
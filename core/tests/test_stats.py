@@ -0,0 +1,145 @@
+"""
+Tests for the cached dashboard stats.
+"""
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import OrganizationProfile, ProviderAffiliation, ProviderLocation, User
+from appointments.models import Appointment
+from appointments.tests.test_availability import create_patient, create_provider, next_weekday
+from core.stats import dashboard_stats
+
+
+class DashboardStatsTests(TestCase):
+    """Test caching and invalidation of per-user dashboard stats."""
+
+    def setUp(self):
+        cache.clear()
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+
+    def book(self, start=time(9, 0), end=time(9, 30)):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Appointment.objects.create(
+                patient=self.patient,
+                doctor=self.provider,
+                date=next_weekday(0),
+                start_time=start,
+                end_time=end,
+                reason_for_visit="Checkup",
+            )
+
+    def test_repeat_poll_is_served_from_cache(self):
+        """Test that a second call runs no queries."""
+        dashboard_stats(self.patient)
+
+        with self.assertNumQueries(0):
+            stats = dashboard_stats(self.patient)
+
+        self.assertEqual(stats['total_appointments'], 0)
+
+    def test_appointment_invalidates_patient_and_provider(self):
+        """Test that booking drops both sides' cached stats."""
+        dashboard_stats(self.patient)
+        dashboard_stats(self.provider.user)
+
+        self.book()
+
+        self.assertEqual(dashboard_stats(self.patient)['total_appointments'], 1)
+        self.assertEqual(dashboard_stats(self.provider.user)['total_patients'], 1)
+
+    def test_affiliation_invalidates_organization(self):
+        """Test that a new affiliation is counted by the organization."""
+        org_user = User.objects.create_user(email="org@example.com", password="testpass123", user_type="ORGANIZATION")
+        organization = OrganizationProfile.objects.create(user=org_user, name="Clinic")
+        self.assertEqual(dashboard_stats(org_user)['total_providers'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProviderAffiliation.objects.create(individual_provider=self.provider, organization=organization)
+
+        self.assertEqual(dashboard_stats(org_user)['total_providers'], 1)
+
+    def test_admin_stats_are_shared(self):
+        """Test that admins share one cache entry invalidated by new users."""
+        admin = User.objects.create_user(email="admin@example.com", password="testpass123", user_type="ADMIN")
+        before = dashboard_stats(admin)['total_patients']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_patient("second@example.com")
+
+        self.assertEqual(dashboard_stats(admin)['total_patients'], before + 1)
+
+    def test_refresh_endpoint(self):
+        """Test that the refresh endpoint returns the cached stats."""
+        self.book()
+        self.client.force_login(self.patient)
+
+        res = self.client.get(reverse('core:dashboard_stats'))
+
+        self.assertTrue(res.json()['success'])
+        self.assertEqual(res.json()['stats']['total_appointments'], 1)
+
+
+class DashboardStatsQueryTests(TestCase):
+    """Pin the number of queries each role's stats take to compute."""
+
+    def setUp(self):
+        cache.clear()
+        self.provider = create_provider("doc@example.com")
+        self.patient = create_patient()
+        self.org_user = User.objects.create_user(email="org@example.com", password="testpass123", user_type="ORGANIZATION")
+        self.organization = OrganizationProfile.objects.create(user=self.org_user, name="Clinic")
+        for name in ("North", "South"):
+            location = ProviderLocation.objects.create(
+                organization=self.organization,
+                name=name,
+                address="1 Main St",
+                city="Springfield",
+                state="IL",
+                zip_code="62701",
+            )
+            ProviderAffiliation.objects.create(
+                individual_provider=self.provider,
+                organization=self.organization,
+                location=location,
+            )
+        for start, end in ((time(9, 0), time(9, 30)), (time(10, 0), time(10, 30))):
+            Appointment.objects.create(
+                patient=self.patient,
+                doctor=self.provider,
+                date=timezone.now().date(),
+                start_time=start,
+                end_time=end,
+                reason_for_visit="Checkup",
+            )
+
+    def test_patient_stats(self):
+        """Test that patient stats are one aggregate."""
+        with self.assertNumQueries(1):
+            stats = dashboard_stats(self.patient)
+
+        self.assertEqual(stats['total_appointments'], 2)
+        self.assertEqual(stats['upcoming_appointments_count'], 2)
+
+    def test_provider_stats(self):
+        """Test that provider stats are one aggregate."""
+        with self.assertNumQueries(1):
+            stats = dashboard_stats(self.provider.user)
+
+        self.assertEqual(stats['todays_appointments_count'], 2)
+        self.assertEqual(stats['total_patients'], 1)
+
+    def test_organization_stats(self):
+        """Test that organization stats are one aggregate plus the location count."""
+        with self.assertNumQueries(2):
+            stats = dashboard_stats(self.org_user)
+
+        # Two affiliations with one provider must not double its appointments
+        self.assertEqual(stats['total_providers'], 1)
+        self.assertEqual(stats['todays_appointments'], 2)
+        self.assertEqual(stats['monthly_appointments'], 2)
+        self.assertEqual(stats['total_locations'], 2)
@@ -6,6 +6,8 @@ from django.db.models import Q
 from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
 from accounts.models import IndividualProviderProfile
+from accounts.geo import attach_distances, nearest_providers, search_origin, within_radius
+from accounts.search import search_providers
 
 
 class LandingPageView(TemplateView):
@@ -51,6 +53,7 @@ def search_doctors_v2(request):
     availability = request.GET.get('availability', '')
     sort = request.GET.get('sort', 'relevance')
     provider_type = request.GET.get('provider_type', '')
+    origin, radius_km = search_origin(request.GET, request.user)
 
     # Start with base queryset for individual providers
     doctors = IndividualProviderProfile.objects.select_related('user').prefetch_related(
@@ -62,17 +65,9 @@ def search_doctors_v2(request):
         user__user_type='INDIVIDUAL_PROVIDER'
     )
 
-    # Apply search query
+    # Apply search query against the indexed search document
     if query:
-        doctors = doctors.filter(
-            Q(user__first_name__icontains=query) |
-            Q(user__last_name__icontains=query) |
-            Q(specialty__icontains=query) |
-            Q(bio__icontains=query) |
-            Q(education__icontains=query) |
-            Q(organization_affiliations__organization__name__icontains=query) |
-            Q(organization_affiliations__department__icontains=query)
-        ).distinct()
+        doctors = search_providers(doctors, query)
 
     # Apply provider type filter (new functionality)
     if provider_type:
@@ -97,6 +92,10 @@ def search_doctors_v2(request):
     if insurance:
         doctors = doctors.filter(insurance_accepted__icontains=insurance)
 
+    if origin is not None:
+        # Radius search off the spatial index on ProviderLocation.location
+        doctors = within_radius(doctors, origin, radius_km)
+
     # Apply availability filter (placeholder logic)
     if availability:
         if availability == 'today':
@@ -114,14 +113,21 @@ def search_doctors_v2(request):
     elif sort == 'rating':
         # Implement when you have ratings
         doctors = doctors.order_by('-is_verified', '-years_of_experience')
-    elif sort == 'distance':
-        # Implement when you have location data
+    elif sort == 'distance' and origin is None:
+        # No origin to measure from
         doctors = doctors.order_by('id')
-    else:  # relevance
+    elif query:  # relevance
+        doctors = doctors.order_by('-rank', '-is_verified', '-years_of_experience')
+    else:
         doctors = doctors.order_by('-is_verified', '-years_of_experience')
 
-    # Limit to 30 results
-    doctors = doctors[:30]
+    # Limit to 30 results, nearest first when sorting by distance
+    if origin is not None and sort == 'distance':
+        doctors = nearest_providers(doctors, origin, radius_km, limit=30)
+    else:
+        doctors = list(doctors[:30])
+        if origin is not None:
+            attach_distances(doctors, origin)
 
     # Add mock data for ratings and reviews (replace with actual data later)
     import random
@@ -162,7 +168,11 @@ from datetime import datetime, timedelta, date
 from django.utils import timezone
 
 from accounts.models import User, IndividualProviderProfile, OrganizationProfile, ProviderLocation
+from accounts.geo import attach_distances, nearest_providers, search_origin, within_radius
 from appointments.models import Appointment, OfficeHours
+from appointments.availability import next_available_slots, providers_available_on
+from core.sampling import random_sample
+from core.stats import dashboard_stats
 from giftshops.models import Product
 from bulletins.models import Event
 
@@ -204,9 +214,11 @@ def get_patient_dashboard_context(user):
     ).select_related('doctor__user', 'location').order_by('date', 'start_time')[:3]
 
     # Get recommended products
-    recommended_products = Product.objects.filter(
-        is_active=True
-    ).order_by('?')[:4]  # Random selection for now
+    recommended_products = random_sample(
+        Product.objects.filter(is_active=True),
+        4,
+        'recommended-products',
+    )
 
     # Get upcoming events
     upcoming_events = Event.objects.filter(
@@ -215,33 +227,24 @@ def get_patient_dashboard_context(user):
     ).order_by('start_date', 'start_time')[:3]
 
     # Get featured doctors
-    featured_doctors = IndividualProviderProfile.objects.filter(
-        is_verified=True,
-        user__is_active=True
-    ).select_related('user').order_by('?')[:4]  # Random selection
+    featured_doctors = random_sample(
+        IndividualProviderProfile.objects.filter(
+            is_verified=True,
+            user__is_active=True
+        ).select_related('user'),
+        4,
+        'featured-doctors',
+    )
+    next_slots = next_available_slots(featured_doctors)
+    for doctor in featured_doctors:
+        doctor.next_available = next_slots.get(doctor.id)
 
     # Recent messages (placeholder)
     recent_messages = []
 
-    # Dashboard stats
-    total_appointments = Appointment.objects.filter(patient=user).count()
-    upcoming_appointments_count = Appointment.objects.filter(
-        patient=user,
-        date__gte=timezone.now().date(),
-        status__in=['SCHEDULED', 'CONFIRMED']
-    ).count()
-
-    # Saved doctors (placeholder - you might want to add a favorites model)
-    saved_doctors = 0
-
     return {
         'upcoming_appointments': upcoming_appointments,
-        'dashboard_stats': {
-            'total_appointments': total_appointments,
-            'upcoming_appointments_count': upcoming_appointments_count,
-            'saved_doctors': saved_doctors,
-            'unread_messages': 0,  # Placeholder
-        },
+        'dashboard_stats': dashboard_stats(user),
         'featured_doctors': featured_doctors,
         'recommended_products': recommended_products,
         'upcoming_events': upcoming_events,
@@ -269,37 +272,13 @@ def get_provider_dashboard_context(user):
         status__in=['SCHEDULED', 'CONFIRMED', 'IN_PROGRESS']
     ).select_related('patient', 'location').order_by('start_time')
 
-    # This week's appointments count
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    weekly_appointments = Appointment.objects.filter(
-        doctor=provider_profile,
-        date__range=[week_start, week_end],
-        status__in=['SCHEDULED', 'CONFIRMED', 'COMPLETED']
-    ).count()
-
     # Recent messages (placeholder)
     recent_messages = []
 
-    # Revenue stats (placeholder)
-    monthly_revenue = 0
-    pending_payments = 0
-
     return {
         'provider_profile': provider_profile,
         'todays_appointments': todays_appointments,
-        'dashboard_stats': {
-            'todays_appointments_count': todays_appointments.count(),
-            'weekly_appointments_count': weekly_appointments,
-            'total_patients': Appointment.objects.filter(
-                doctor=provider_profile
-            ).values('patient').distinct().count(),
-            'new_patients_this_month': 0,  # To be implemented
-            'monthly_revenue': monthly_revenue,
-            'pending_payments': pending_payments,
-            'rating': 4.8,  # Placeholder
-            'reviews_count': 125,  # Placeholder
-        },
+        'dashboard_stats': dashboard_stats(user),
         'recent_messages': recent_messages,
         'office_hours': OfficeHours.objects.filter(
             doctor=provider_profile
@@ -327,22 +306,6 @@ def get_organization_dashboard_context(user):
     # Get organization locations
     locations = org_profile.locations.filter(is_active=True)
 
-    # Today's appointments across all providers
-    today = timezone.now().date()
-    todays_appointments = Appointment.objects.filter(
-        doctor__in=affiliated_providers,
-        date=today,
-        status__in=['SCHEDULED', 'CONFIRMED']
-    ).count()
-
-    # Monthly stats
-    month_start = today.replace(day=1)
-    monthly_appointments = Appointment.objects.filter(
-        doctor__in=affiliated_providers,
-        date__gte=month_start,
-        status__in=['SCHEDULED', 'CONFIRMED', 'COMPLETED']
-    ).count()
-
     # Recent activities (placeholder)
     recent_activities = []
 
@@ -350,67 +313,15 @@ def get_organization_dashboard_context(user):
         'organization_profile': org_profile,
         'affiliated_providers': affiliated_providers[:5],  # Show top 5
         'locations': locations,
-        'dashboard_stats': {
-            'total_providers': affiliated_providers.count(),
-            'total_locations': locations.count(),
-            'todays_appointments': todays_appointments,
-            'monthly_appointments': monthly_appointments,
-            'monthly_revenue': 0,  # To be implemented
-            'patient_satisfaction': 4.6,  # Placeholder
-            'active_patients': 0,  # To be implemented
-            'new_patients_this_month': 0,  # To be implemented
-        },
+        'dashboard_stats': dashboard_stats(user),
         'recent_activities': recent_activities,
     }
 
 
 def get_admin_dashboard_context(user):
     """Get dashboard context for admin users"""
-    # System-wide stats
-    total_users = User.objects.filter(is_active=True).count()
-    total_providers = IndividualProviderProfile.objects.filter(
-        user__is_active=True
-    ).count()
-    total_organizations = OrganizationProfile.objects.filter(
-        user__is_active=True
-    ).count()
-    total_patients = User.objects.filter(
-        user_type='PATIENT',
-        is_active=True
-    ).count()
-
-    # Today's activity
-    today = timezone.now().date()
-    todays_appointments = Appointment.objects.filter(
-        date=today
-    ).count()
-
-    new_users_today = User.objects.filter(
-        date_joined__date=today
-    ).count()
-
-    # Pending verifications
-    pending_provider_verifications = IndividualProviderProfile.objects.filter(
-        is_verified=False
-    ).count()
-
-    pending_org_verifications = OrganizationProfile.objects.filter(
-        is_verified=False
-    ).count()
-
     return {
-        'dashboard_stats': {
-            'total_users': total_users,
-            'total_providers': total_providers,
-            'total_organizations': total_organizations,
-            'total_patients': total_patients,
-            'todays_appointments': todays_appointments,
-            'new_users_today': new_users_today,
-            'pending_provider_verifications': pending_provider_verifications,
-            'pending_org_verifications': pending_org_verifications,
-            'system_health': 'Operational',  # Placeholder
-            'active_sessions': 0,  # To be implemented
-        },
+        'dashboard_stats': dashboard_stats(user),
         'recent_activities': [],  # To be implemented
         'system_alerts': [],  # To be implemented
     }
@@ -426,6 +337,7 @@ def search_doctors(request):
     availability = request.GET.get('availability', '')
     experience = request.GET.get('experience', '')
     sort = request.GET.get('sort', 'relevance')
+    origin, radius_km = search_origin(request.GET, request.user)
 
     # Base queryset
     doctors = IndividualProviderProfile.objects.filter(
@@ -438,20 +350,18 @@ def search_doctors(request):
         )
     )
 
-    # Apply search query
+    # Apply search query against the indexed search document
     if query:
-        doctors = doctors.filter(
-            Q(user__first_name__icontains=query) |
-            Q(user__last_name__icontains=query) |
-            Q(specialty__icontains=query) |
-            Q(sub_specialty__icontains=query)
-        )
+        doctors = search_providers(doctors, query)
 
     # Apply filters
     if specialty:
         doctors = doctors.filter(specialty__icontains=specialty)
 
-    if location:
+    if origin is not None:
+        # Radius search off the spatial index on ProviderLocation.location
+        doctors = within_radius(doctors, origin, radius_km)
+    elif location:
         # Search by city, state, or zip
         doctors = doctors.filter(
             Q(locations__city__icontains=location) |
@@ -473,29 +383,12 @@ def search_doctors(request):
             doctors = doctors.filter(years_of_experience__gte=15)
 
     # Apply availability filter based on actual office hours
+    today = timezone.now().date()
     if availability:
-        today = timezone.now().date()
-
         if availability == 'today':
-            # Filter doctors who have office hours today and available slots
-            weekday = today.weekday()
-            doctors = doctors.filter(
-                office_hours__day_of_week=weekday,
-                office_hours__is_active=True
-            ).distinct()
-
-            # Further filter by those who have available slots
-            available_doctors = []
-            for doctor in doctors:
-                has_availability = False
-                for office_hour in doctor.office_hours.filter(day_of_week=weekday, is_active=True):
-                    if office_hour.get_available_slots(today):
-                        has_availability = True
-                        break
-                if has_availability:
-                    available_doctors.append(doctor.id)
-
-            doctors = doctors.filter(id__in=available_doctors)
+            # Doctors with at least one free slot today, read from the
+            # materialized slots for the whole candidate set in one query
+            doctors = doctors.filter(id__in=providers_available_on(doctors.values('pk'), today))
 
         elif availability == 'this-week':
             # Filter doctors who have office hours this week
@@ -524,27 +417,32 @@ def search_doctors(request):
     elif sort == 'rating':
         # TODO: Implement when ratings are available
         doctors = doctors.order_by('-is_verified', '-years_of_experience')
-    elif sort == 'distance':
-        # TODO: Implement when location-based sorting is available
+    elif sort == 'distance' and origin is None:
+        # No origin to measure from
         doctors = doctors.order_by('id')
-    else:  # relevance
+    elif query:  # relevance
+        doctors = doctors.order_by('-rank', '-is_verified', '-years_of_experience')
+    else:
         doctors = doctors.order_by('-is_verified', '-years_of_experience')
 
     # Limit results
-    doctors = list(doctors[:30])
+    if origin is not None and sort == 'distance':
+        doctors = nearest_providers(doctors, origin, radius_km, limit=30)
+    else:
+        doctors = list(doctors[:30])
+        if origin is not None:
+            attach_distances(doctors, origin)
+
+    # Next free slot for the whole page at once; it also answers "available today"
+    next_slots = next_available_slots(doctors, today=today)
 
     # Add computed fields for display
     import random
     for doctor in doctors:
         doctor.rating = round(random.uniform(4.5, 5.0), 1)
         doctor.reviews_count = random.randint(50, 300)
-
-        # Check actual availability for today
-        today_weekday = today.weekday()
-        doctor.available_today = doctor.office_hours.filter(
-            day_of_week=today_weekday,
-            is_active=True
-        ).exists()
+        doctor.next_available = next_slots.get(doctor.id)
+        doctor.available_today = bool(doctor.next_available) and doctor.next_available['date'] == today
 
         # Check if doctor offers video consultations
         doctor.accepts_video = doctor.appointment_types and 'VIDEO' in doctor.appointment_types
@@ -555,11 +453,17 @@ def search_doctors(request):
             'doctors': doctors,
             'count': len(doctors)
         })
-        return JsonResponse({
+        response = {
             'success': True,
             'html': html,
             'count': len(doctors)
-        })
+        }
+        if origin is not None:
+            response['distances'] = {
+                doctor.id: round(doctor.distance_km, 1) if doctor.distance_km is not None else None
+                for doctor in doctors
+            }
+        return JsonResponse(response)
     else:
         return JsonResponse({
             'success': False,
@@ -571,19 +475,7 @@ def search_doctors(request):
 @login_required
 def refresh_dashboard_stats(request):
     """AJAX endpoint to refresh dashboard statistics"""
-    user = request.user
-    stats = {}
-
-    if user.user_type == 'PATIENT':
-        stats = get_patient_dashboard_context(user)['dashboard_stats']
-    elif user.user_type == 'INDIVIDUAL_PROVIDER':
-        stats = get_provider_dashboard_context(user)['dashboard_stats']
-    elif user.user_type == 'ORGANIZATION':
-        stats = get_organization_dashboard_context(user)['dashboard_stats']
-    elif user.user_type == 'ADMIN':
-        stats = get_admin_dashboard_context(user)['dashboard_stats']
-
-    return JsonResponse({'success': True, 'stats': stats})
+    return JsonResponse({'success': True, 'stats': dashboard_stats(request.user)})
 
 
 @login_required
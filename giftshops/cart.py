@@ -0,0 +1,40 @@
+"""
+Cart contents and totals computed by the database.
+
+``cart_summary`` reads a user's line items with their products joined and
+each line's price, plus the cart's item count and total as window
+aggregates over the same rows, so the cart page and the header badge cost
+one query however many items the cart holds.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Sum, Value, Window
+from django.db.models.functions import Coalesce, NullIf
+
+from giftshops.models import CartItem
+
+PRICE = DecimalField(max_digits=12, decimal_places=2)
+
+
+def cart_items(user):
+    """The user's CartItems with ``unit_price`` and ``line_total`` annotated.
+
+    ``unit_price`` is the discount price when one is set, like
+    ``CartItem.total_price``.
+    """
+    return CartItem.objects.filter(user=user).select_related('product', 'product__category').annotate(
+        unit_price=Coalesce(NullIf('product__discount_price', Value(0)), 'product__price', output_field=PRICE),
+        line_total=F('unit_price') * F('quantity'),
+        cart_count=Window(Sum('quantity')),
+        cart_total=Window(Sum(F('unit_price') * F('quantity'), output_field=PRICE)),
+    ).order_by('added_at', 'pk')
+
+
+def cart_summary(user):
+    """Return ``{'items', 'count', 'total'}`` for the user's cart in one query."""
+    items = list(cart_items(user))
+    return {
+        'items': items,
+        'count': items[0].cart_count if items else 0,
+        'total': items[0].cart_total if items else Decimal('0.00'),
+    }
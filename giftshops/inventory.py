@@ -0,0 +1,126 @@
+"""
+Stock reservation for the gift shop cart.
+
+Stock moves with conditional updates (``UPDATE ... SET stock_quantity =
+stock_quantity - n WHERE stock_quantity >= n``), so the check and the
+decrement are one statement: concurrent shoppers queue on the product row
+and the database never lets stock go below zero. Each change runs in one
+transaction with the CartItem write, always touching the cart row before
+the product row so two requests cannot deadlock on each other.
+
+A cart item holds its units until ``hold_expires_at``, pushed back by
+``CART_HOLD`` on every change. ``release_expired_holds`` then deletes
+abandoned items and puts their units back on sale.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from giftshops.models import CartItem, Product
+from giftshops.models.giftshops import cart_hold_deadline
+
+
+class OutOfStock(Exception):
+    """Not enough stock to reserve the requested quantity."""
+
+    def __init__(self, available):
+        self.available = available
+        super().__init__(f"Only {available} units available.")
+
+
+def _take(product_id, quantity):
+    """Reserve ``quantity`` units; returns False if there are not enough."""
+    return Product.objects.filter(pk=product_id, stock_quantity__gte=quantity).update(
+        stock_quantity=F('stock_quantity') - quantity,
+    ) == 1
+
+
+def _give_back(product_id, quantity):
+    Product.objects.filter(pk=product_id).update(stock_quantity=F('stock_quantity') + quantity)
+
+
+def _available(product_id):
+    return Product.objects.filter(pk=product_id).values_list('stock_quantity', flat=True).first() or 0
+
+
+def _reserve(product_id, quantity):
+    if not _take(product_id, quantity):
+        raise OutOfStock(_available(product_id))
+
+
+def add_to_cart(user, product_id, quantity=1):
+    """Add ``quantity`` units to the user's cart, reserving them from stock.
+
+    Raises OutOfStock, leaving the cart unchanged, if fewer units remain.
+    """
+    with transaction.atomic():
+        items = CartItem.objects.filter(user=user, product_id=product_id)
+        if not items.update(quantity=F('quantity') + quantity, hold_expires_at=cart_hold_deadline()):
+            try:
+                with transaction.atomic():
+                    CartItem.objects.create(user=user, product_id=product_id, quantity=quantity)
+            except IntegrityError:
+                # Another request created the row first
+                items.update(quantity=F('quantity') + quantity, hold_expires_at=cart_hold_deadline())
+        _reserve(product_id, quantity)
+
+
+def set_cart_quantity(user, item_id, quantity):
+    """Change a cart item's quantity, moving the difference to or from stock.
+
+    A quantity of zero or less removes the item. Returns the item, or None
+    once removed. Raises CartItem.DoesNotExist for another user's item and
+    OutOfStock if an increase cannot be reserved.
+    """
+    with transaction.atomic():
+        item = CartItem.objects.select_for_update().get(pk=item_id, user=user)
+        if quantity <= 0:
+            item.delete()
+            _give_back(item.product_id, item.quantity)
+            return None
+
+        difference = quantity - item.quantity
+        if difference > 0:
+            _reserve(item.product_id, difference)
+        elif difference < 0:
+            _give_back(item.product_id, -difference)
+        item.quantity = quantity
+        item.hold_expires_at = cart_hold_deadline()
+        item.save(update_fields=['quantity', 'hold_expires_at'])
+        return item
+
+
+def remove_from_cart(user, item_id):
+    """Remove a cart item and return its units to stock."""
+    return set_cart_quantity(user, item_id, 0)
+
+
+def release_expired_holds(now=None, batch_size=1000):
+    """Delete lapsed cart items and restock their units; returns how many.
+
+    Items being changed by their owner are skipped rather than waited on,
+    and each product is restocked once per batch by a single UPDATE.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            CartItem.objects.select_for_update(skip_locked=True)
+            .filter(hold_expires_at__lte=now)
+            .order_by('hold_expires_at')
+            .values_list('pk', 'product_id', 'quantity')[:batch_size]
+        )
+        if not expired:
+            return 0
+        CartItem.objects.filter(pk__in=[pk for pk, _, _ in expired]).delete()
+
+        returned = Counter()
+        for _, product_id, quantity in expired:
+            returned[product_id] += quantity
+        Product.objects.filter(pk__in=returned).update(
+            stock_quantity=F('stock_quantity') + Case(
+                *(When(pk=product_id, then=Value(quantity)) for product_id, quantity in returned.items()),
+            ),
+        )
+    return len(expired)
@@ -0,0 +1,55 @@
+"""
+Django command to release lapsed cart reservations.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from giftshops.inventory import release_expired_holds
+
+
+class Command(BaseCommand):
+    """Drop cart items past their hold and return their units to stock.
+
+    Works through the backlog in bounded transactions, so it can clear
+    millions of abandoned items without long locks. Without --loop it runs
+    until nothing has expired and exits, for use from cron.
+    """
+
+    help = "Return stock held by abandoned cart items"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Cart items released per transaction",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling for lapsed holds",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds to sleep between polls when idle (with --loop)",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        total = 0
+        try:
+            while True:
+                released = release_expired_holds(batch_size=options["batch_size"])
+                total += released
+                if released:
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Released {total} cart items."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-17 14:20
+
+import giftshops.models.giftshops
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('giftshops', '0007_cartitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartitem',
+            name='hold_expires_at',
+            field=models.DateTimeField(db_index=True, default=giftshops.models.giftshops.cart_hold_deadline),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Brand(models.Model):
@@ -154,6 +155,11 @@ class OrderItem(models.Model):
     def total_price(self):
         return self.quantity * self.price
 
+def cart_hold_deadline():
+    """When stock reserved by a cart change now goes back on sale."""
+    return timezone.now() + settings.CART_HOLD
+
+
 class CartItem(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -166,6 +172,8 @@ class CartItem(models.Model):
     )
     quantity = models.PositiveIntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
+    # Past this, release_cart_holds drops the item and returns its stock
+    hold_expires_at = models.DateTimeField(default=cart_hold_deadline, db_index=True)
 
     class Meta:
         unique_together = ('user', 'product')
@@ -0,0 +1,64 @@
+"""
+Tests for the cart summary.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from giftshops.cart import cart_summary
+from giftshops.inventory import add_to_cart
+from giftshops.tests.test_inventory import create_product
+
+CART_SUMMARY_URL = reverse('giftshops:cart_summary')
+
+
+class CartSummaryTests(TestCase):
+    """Test line items and totals computed in the database."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="pat@example.com", password="testpass123")
+        self.thermometer = create_product(stock=10)
+        self.bandages = create_product(stock=10, name="Bandages")
+        self.bandages.price = Decimal('4.50')
+        self.bandages.discount_price = Decimal('3.25')
+        self.bandages.save()
+        add_to_cart(self.user, self.thermometer.pk, quantity=2)
+        add_to_cart(self.user, self.bandages.pk, quantity=3)
+
+    def test_one_query(self):
+        """Test that items, products and totals come from a single query."""
+        with self.assertNumQueries(1):
+            summary = cart_summary(self.user)
+            names = [item.product.category.name for item in summary['items']]
+
+        self.assertEqual(len(names), 2)
+        self.assertEqual(summary['count'], 5)
+        self.assertEqual(summary['total'], Decimal('29.75'))
+
+    def test_discount_price_fallback(self):
+        """Test that lines use the discount price only when one is set."""
+        lines = {item.product.name: item for item in cart_summary(self.user)['items']}
+
+        self.assertEqual(lines['Thermometer'].unit_price, Decimal('10.00'))
+        self.assertEqual(lines['Bandages'].unit_price, Decimal('3.25'))
+        self.assertEqual(lines['Bandages'].line_total, lines['Bandages'].total_price)
+
+    def test_empty_cart(self):
+        """Test that an empty cart has zero totals."""
+        other = User.objects.create_user(email="other@example.com", password="testpass123")
+
+        self.assertEqual(cart_summary(other), {'items': [], 'count': 0, 'total': Decimal('0.00')})
+
+    def test_json_endpoint(self):
+        """Test that the badge endpoint returns the count and total."""
+        self.client.force_login(self.user)
+
+        res = self.client.get(CART_SUMMARY_URL)
+
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(data['total'], '29.75')
+        self.assertEqual([item['name'] for item in data['items']], ['Thermometer', 'Bandages'])
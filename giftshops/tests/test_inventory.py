@@ -0,0 +1,177 @@
+"""
+Tests for gift shop stock reservation.
+"""
+import sys
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from accounts.models import User
+from giftshops.inventory import OutOfStock, add_to_cart, release_expired_holds, remove_from_cart, set_cart_quantity
+from giftshops.models import AddCategory, CartItem, Product
+
+
+def create_product(stock, name="Thermometer"):
+    category = AddCategory.objects.create(name="Supplies")
+    return Product.objects.create(
+        category=category,
+        name=name,
+        description="Digital thermometer",
+        price=10,
+        image='product_images/thermometer.jpg',
+        stock_quantity=stock,
+    )
+
+
+def stock(product):
+    return Product.objects.values_list('stock_quantity', flat=True).get(pk=product.pk)
+
+
+class StockReservationTests(TestCase):
+    """Test moving stock between products and carts."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="pat@example.com", password="testpass123")
+        self.product = create_product(stock=3)
+
+    def test_add_reserves_stock(self):
+        """Test that adding twice keeps one cart row and reserves two units."""
+        add_to_cart(self.user, self.product.pk)
+        add_to_cart(self.user, self.product.pk)
+
+        self.assertEqual(CartItem.objects.get().quantity, 2)
+        self.assertEqual(stock(self.product), 1)
+
+    def test_add_beyond_stock_changes_nothing(self):
+        """Test that a failed reservation leaves the cart and stock alone."""
+        add_to_cart(self.user, self.product.pk, quantity=2)
+
+        with self.assertRaises(OutOfStock) as raised:
+            add_to_cart(self.user, self.product.pk, quantity=2)
+
+        self.assertEqual(raised.exception.available, 1)
+        self.assertEqual(CartItem.objects.get().quantity, 2)
+        self.assertEqual(stock(self.product), 1)
+
+    def test_set_quantity_moves_difference(self):
+        """Test that changing the quantity reserves or returns the difference."""
+        add_to_cart(self.user, self.product.pk)
+        item = CartItem.objects.get()
+
+        set_cart_quantity(self.user, item.pk, 3)
+        self.assertEqual(stock(self.product), 0)
+        set_cart_quantity(self.user, item.pk, 1)
+        self.assertEqual(stock(self.product), 2)
+        with self.assertRaises(OutOfStock):
+            set_cart_quantity(self.user, item.pk, 4)
+        self.assertEqual(CartItem.objects.get().quantity, 1)
+
+    def test_remove_returns_stock(self):
+        """Test that removing an item puts its units back."""
+        add_to_cart(self.user, self.product.pk, quantity=3)
+
+        remove_from_cart(self.user, CartItem.objects.get().pk)
+
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(stock(self.product), 3)
+
+    def test_other_users_item(self):
+        """Test that users cannot change each other's cart."""
+        add_to_cart(self.user, self.product.pk)
+        other = User.objects.create_user(email="other@example.com", password="testpass123")
+
+        with self.assertRaises(CartItem.DoesNotExist):
+            remove_from_cart(other, CartItem.objects.get().pk)
+
+
+class ReleaseExpiredHoldsTests(TestCase):
+    """Test returning abandoned cart stock."""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(email=f"pat{i}@example.com", password="testpass123") for i in range(3)]
+        self.product = create_product(stock=10)
+        self.other = create_product(stock=10, name="Bandages")
+
+    def test_add_sets_hold(self):
+        """Test that adding to the cart pushes the hold back."""
+        add_to_cart(self.users[0], self.product.pk)
+        item = CartItem.objects.get()
+        CartItem.objects.update(hold_expires_at=timezone.now())
+
+        add_to_cart(self.users[0], self.product.pk)
+
+        item.refresh_from_db()
+        self.assertGreater(item.hold_expires_at, timezone.now() + timedelta(minutes=20))
+
+    def test_expired_items_are_released_in_batches(self):
+        """Test that only lapsed items are dropped and their units restocked."""
+        for user in self.users:
+            add_to_cart(user, self.product.pk, quantity=2)
+            add_to_cart(user, self.other.pk)
+        CartItem.objects.exclude(user=self.users[2]).update(hold_expires_at=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(release_expired_holds(batch_size=3), 3)
+        self.assertEqual(release_expired_holds(batch_size=3), 1)
+        self.assertEqual(release_expired_holds(batch_size=3), 0)
+
+        self.assertEqual(list(CartItem.objects.values_list('user', flat=True).distinct()), [self.users[2].pk])
+        self.assertEqual(stock(self.product), 8)
+        self.assertEqual(stock(self.other), 9)
+
+    def test_command(self):
+        """Test that the command drains every lapsed item."""
+        for user in self.users:
+            add_to_cart(user, self.product.pk)
+        CartItem.objects.update(hold_expires_at=timezone.now() - timedelta(minutes=1))
+
+        call_command("release_cart_holds", batch_size=2, stdout=StringIO())
+
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(stock(self.product), 10)
+
+
+class StockContentionTests(TransactionTestCase):
+    """Benchmark parallel shoppers competing for the last units."""
+
+    def test_parallel_adds_never_oversell(self):
+        """Test that concurrent reservations stop exactly at zero stock."""
+        initial, shoppers, attempts = 50, 8, 20
+        product = create_product(stock=initial)
+        users = [User.objects.create_user(email=f"shopper{i}@example.com", password="testpass123") for i in range(shoppers)]
+        barrier = threading.Barrier(shoppers)
+        results = []
+
+        def shop(user):
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    try:
+                        add_to_cart(user, product.pk)
+                        results.append('reserved')
+                    except OutOfStock:
+                        results.append('out_of_stock')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=shop, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        in_carts = sum(CartItem.objects.values_list('quantity', flat=True))
+        self.assertEqual(results.count('reserved'), initial)
+        self.assertEqual(in_carts, initial)
+        self.assertEqual(stock(product), 0)
+        sys.stderr.write(
+            f"\n{len(results)} cart adds by {shoppers} threads in {elapsed:.2f}s "
+            f"({len(results) / elapsed:.0f}/s), {in_carts} reserved of {initial}\n"
+        )
@@ -1,12 +1,14 @@
 from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden, HttpResponseRedirect
+from django.http import HttpResponseForbidden, HttpResponseRedirect, JsonResponse
 from django.utils.decorators import method_decorator
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from django.core.paginator import Paginator
 from django.urls import reverse
 from django.db.models import Q
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from giftshops import inventory
+from giftshops.cart import cart_summary
 from giftshops.models.giftshops import AddCategory, Product, CartItem, Order, OrderItem
 from giftshops.serializers import AddCategorySerializer, ProductSerializer
 from rest_framework.response import Response
@@ -472,80 +474,71 @@ def add_to_cart(request, product_id):
 
     product = get_object_or_404(Product, pk=product_id)
 
-    # Check if product is in stock
-    if product.stock_quantity <= 0:
-        messages.error(request, f"'{product.name}' is out of stock.")
+    try:
+        inventory.add_to_cart(request.user, product.pk)
+    except inventory.OutOfStock as error:
+        if error.available:
+            messages.error(request, f"Only {error.available} more units of '{product.name}' are available.")
+        else:
+            messages.error(request, f"'{product.name}' is out of stock.")
         return redirect(request.META.get('HTTP_REFERER', 'giftshops:giftshop'))
 
-    cart_item, created = CartItem.objects.get_or_create(user=request.user, product=product)
-
-    if not created:
-        # Check if adding one more would exceed available stock
-        if cart_item.quantity >= product.stock_quantity:
-            messages.error(request, f"Only {product.stock_quantity} units of '{product.name}' are available.")
-            return redirect(request.META.get('HTTP_REFERER', 'giftshops:giftshop'))
-        cart_item.quantity += 1
-        cart_item.save()
-    else:
-        # For new cart items, set quantity to 1
-        cart_item.quantity = 1
-        cart_item.save()
-
-    # Reduce stock quantity
-    product.stock_quantity -= 1
-    product.save()
-
     messages.success(request, f"Added '{product.name}' to your cart.")
     return redirect(request.META.get('HTTP_REFERER', 'giftshops:giftshop'))
 @login_required
 def view_cart(request):
-    cart_items = CartItem.objects.filter(user=request.user)
-    total = sum(item.total_price for item in cart_items)
-    return render(request, 'cart.html', {'cart_items': cart_items, 'total': total})
+    summary = cart_summary(request.user)
+    return render(request, 'cart.html', {'cart_items': summary['items'], 'total': summary['total']})
+
+@login_required
+def cart_summary_json(request):
+    """JSON cart contents and totals, for refreshing the header badge"""
+    summary = cart_summary(request.user)
+    return JsonResponse({
+        'count': summary['count'],
+        'total': str(summary['total']),
+        'items': [
+            {
+                'id': item.id,
+                'product_id': item.product_id,
+                'name': item.product.name,
+                'quantity': item.quantity,
+                'unit_price': str(item.unit_price),
+                'line_total': str(item.line_total),
+            }
+            for item in summary['items']
+        ],
+    })
 
 @login_required
 def remove_from_cart(request, item_id):
     cart_item = get_object_or_404(CartItem, pk=item_id, user=request.user)
     if request.method == "POST":
-        # Restore stock quantity when removing from cart
-        product = cart_item.product
-        product.stock_quantity += cart_item.quantity
-        product.save()
-
-        cart_item.delete()
+        # Returns the item's units to stock
+        try:
+            inventory.remove_from_cart(request.user, item_id)
+        except CartItem.DoesNotExist:
+            pass
         messages.success(request, "Item removed from cart.")
         return redirect('giftshops:view_cart')
     return render(request, 'confirm_remove.html', {'cart_item': cart_item})
 
 @login_required
 def update_cart_item(request, item_id):
-    cart_item = get_object_or_404(CartItem, pk=item_id, user=request.user)
+    cart_item = get_object_or_404(CartItem.objects.select_related('product'), pk=item_id, user=request.user)
     if request.method == "POST":
         new_quantity = int(request.POST.get('quantity', 1))
-        old_quantity = cart_item.quantity
-        product = cart_item.product
-
-        if new_quantity > 0:
-            quantity_difference = new_quantity - old_quantity
-
-            # Check if we have enough stock for the increase
-            if quantity_difference > 0 and quantity_difference > product.stock_quantity:
-                messages.error(request, f"Only {product.stock_quantity + old_quantity} units of '{product.name}' are available.")
-                return redirect('giftshops:view_cart')
-
-            # Update stock quantity
-            product.stock_quantity -= quantity_difference
-            product.save()
-
-            cart_item.quantity = new_quantity
-            cart_item.save()
+        try:
+            updated = inventory.set_cart_quantity(request.user, item_id, new_quantity)
+        except CartItem.DoesNotExist:
+            return redirect('giftshops:view_cart')
+        except inventory.OutOfStock as error:
+            messages.error(request, f"Only {error.available + cart_item.quantity} units of '{cart_item.product.name}' are available.")
+            return redirect('giftshops:view_cart')
+
+        if updated:
             messages.success(request, f"Updated quantity for '{cart_item.product.name}'.")
         else:
-            # Remove item and restore stock
-            product.stock_quantity += old_quantity
-            product.save()
-
-            cart_item.delete()
             messages.success(request, f"Removed '{cart_item.product.name}' from your cart.")
         return redirect('giftshops:view_cart')
     return render(request, 'update_cart_item.html', {'cart_item': cart_item})
@@ -3,6 +3,7 @@
 class HomePage {
     constructor() {
         this.userType = document.querySelector('[data-user-type]')?.dataset.userType;
+        this.liveStats = false;
         this.init();
     }
 
@@ -10,6 +11,7 @@ class HomePage {
         // Initialize common functionality
         this.initProgressBars();
         this.initTaskCheckboxes();
+        this.initLiveStats();
 
         // Initialize user-type specific functionality
         switch (this.userType) {
@@ -511,7 +513,7 @@ class HomePage {
     // Refresh organization stats
     async refreshOrganizationStats() {
         try {
-            const response = await fetch('/api/organization/stats/', {
+            const response = await fetch('/home/stats/', {
                 headers: {
                     'X-CSRFToken': window.csrfToken,
                     'X-Requested-With': 'XMLHttpRequest'
@@ -537,6 +539,46 @@ class HomePage {
         }
     }
 
+    // Live stat updates pushed by the server
+    initLiveStats() {
+        if (!this.userType || !('WebSocket' in window)) {
+            return;
+        }
+        this.connectLiveStats(1000);
+    }
+
+    connectLiveStats(retryDelay) {
+        const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${protocol}://${window.location.host}/ws/dashboard/`);
+
+        socket.addEventListener('open', () => {
+            // Pushed updates replace polling only while the socket is up
+            this.liveStats = true;
+            retryDelay = 1000;
+        });
+
+        socket.addEventListener('message', (event) => {
+            const data = JSON.parse(event.data);
+            if (data.type === 'stats') {
+                this.updateStats(data.stats);
+            }
+        });
+
+        socket.addEventListener('close', () => {
+            // Poll until reconnected, retrying with backoff capped at a minute
+            this.liveStats = false;
+            setTimeout(() => this.connectLiveStats(Math.min(retryDelay * 2, 60000)), retryDelay);
+        });
+    }
+
+    updateStats(stats) {
+        Object.keys(stats).forEach(key => {
+            document.querySelectorAll(`[data-stat="${key}"], [data-system-stat="${key}"]`).forEach(element => {
+                element.textContent = stats[key];
+            });
+        });
+    }
+
     // Admin Dashboard Initialization
     initAdminDashboard() {
         this.initSystemMonitoring();
@@ -546,11 +588,12 @@ class HomePage {
 
     // Initialize system monitoring
     initSystemMonitoring() {
-        // Real-time monitoring would be implemented here
-        // For now, just refresh every minute
+        // Stats are pushed over the dashboard socket; poll whenever it is not connected
         if (document.querySelector('.system-stats')) {
             setInterval(() => {
-                this.refreshSystemStats();
+                if (!this.liveStats) {
+                    this.refreshSystemStats();
+                }
             }, 60000);
         }
     }
@@ -558,7 +601,7 @@ class HomePage {
     // Refresh system stats
     async refreshSystemStats() {
         try {
-            const response = await fetch('/api/admin/system-stats/', {
+            const response = await fetch('/home/stats/', {
                 headers: {
                     'X-CSRFToken': window.csrfToken,
                     'X-Requested-With': 'XMLHttpRequest'
@@ -35,6 +35,7 @@ urlpatterns = [
 
     # API URLs
     path("api/accounts/", include("accounts.api.urls")),
+    path("api/appointments/", include("appointments.api.urls")),
 ]
 
 